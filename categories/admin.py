@@ -1,6 +1,7 @@
 '''Developer-only commands.'''
 
 import datetime as dt
+import json
 
 import hikari
 import lightbulb
@@ -136,6 +137,8 @@ async def force_sync_cache(ctx: lightbulb.Context):
             users = await psql.User.fetch_all(conn)
             for user in users:
                 bot.user_cache.update_local(user)
+            
+            await bot.equipment_cache.update_all_from_db(conn)
     
     await ctx.respond("Cache is now sync to the database.", reply = True)
 
@@ -149,6 +152,7 @@ async def force_sync_cache_user(ctx: lightbulb.Context):
 
     async with bot.pool.acquire() as conn:
         await bot.user_cache.update_from_db(conn, user_id)
+        await bot.equipment_cache.update_from_db(conn, user_id)
     
     await ctx.respond(f"User cache for {ctx.options.user_id} synced.", reply = True)
 
@@ -274,6 +278,201 @@ async def drop_all_concurrencies(ctx: lightbulb.Context):
     bot.custom_command_concurrency_session.clear_all_sessions()
     await ctx.respond("Done!", reply = True)
 
+@plugin.command()
+@lightbulb.command("view-concurrencies", "Display active concurrency sessions per command.", hidden = True)
+@lightbulb.implements(lightbulb.PrefixCommand)
+async def view_concurrencies(ctx: lightbulb.Context):
+    bot: models.MichaelBot = ctx.bot
+
+    gauges = bot.custom_command_concurrency_session.gauges()
+    if not gauges:
+        await ctx.respond("No concurrency-limited command has been invoked yet.", reply = True)
+        return
+
+    display = f"{'command':<30} {'active':>6} {'peak':>6} {'limit':>6}\n"
+    for qualname, (active, peak, uses) in sorted(gauges.items(), key = lambda pair: pair[1][1], reverse = True):
+        display += f"{qualname:<30} {active:>6} {peak:>6} {uses:>6}\n"
+
+    await ctx.respond(f"```{display}```", reply = True)
+
+@plugin.command()
+@lightbulb.option("command", "Only display queries run under this command. Use '<background>' for non-command queries.", default = None, modifier = helpers.CONSUME_REST_OPTION)
+@lightbulb.option("sort_by", "What to sort by. One of total, calls, mean, p95, rows.", default = "total")
+@lightbulb.command("query-stats", "Display the most expensive database queries.", hidden = True)
+@lightbulb.implements(lightbulb.PrefixCommandGroup)
+async def query_stats(ctx: lightbulb.Context):
+    bot: models.MichaelBot = ctx.bot
+
+    stats = bot.query_stats.top(10, command = ctx.options.command, sort_by = ctx.options.sort_by)
+    if not stats:
+        await ctx.respond("No query recorded.", reply = True)
+        return
+    
+    embed = helpers.get_default_embed(
+        title = "Query Statistics",
+        description = f"Since {bot.query_stats.started_at.strftime('%Y-%m-%d %H:%M:%S %Z')}, sorted by `{ctx.options.sort_by}`.",
+        author = ctx.author,
+        timestamp = dt.datetime.now().astimezone()
+    )
+    for stat in stats:
+        latency = stat.latency
+        embed.add_field(
+            name = f"{stat.command}: {stat.shape[:200]}",
+            value = f"```calls: {latency.count}, rows/call: {stat.rows / latency.count:.1f}\n"
+                    f"total: {latency.total:.1f}ms, mean: {latency.mean:.2f}ms, p95: {latency.percentile(95)}ms, max: {latency.max:.1f}ms```"
+        )
+    await ctx.respond(embed = embed, reply = True)
+
+@query_stats.child
+@lightbulb.command("json", "Export all query statistics as JSON.", hidden = True)
+@lightbulb.implements(lightbulb.PrefixSubCommand)
+async def query_stats_json(ctx: lightbulb.Context):
+    bot: models.MichaelBot = ctx.bot
+
+    data = json.dumps(bot.query_stats.to_dict(), indent = 4)
+    await ctx.respond(attachment = hikari.Bytes(data.encode("utf-8"), "query_stats.json"), reply = True)
+
+@query_stats.child
+@lightbulb.command("reset", "Drop all query statistics.", hidden = True)
+@lightbulb.implements(lightbulb.PrefixSubCommand)
+async def query_stats_reset(ctx: lightbulb.Context):
+    bot: models.MichaelBot = ctx.bot
+
+    bot.query_stats.reset()
+    await ctx.respond("Query statistics cleared.", reply = True)
+
+@plugin.command()
+@lightbulb.option("command", "Display the breakdown of this command instead.", default = None, modifier = helpers.CONSUME_REST_OPTION)
+@lightbulb.command("command-stats", "Display the slowest commands and their latency breakdown.", hidden = True)
+@lightbulb.implements(lightbulb.PrefixCommandGroup)
+async def command_stats(ctx: lightbulb.Context):
+    bot: models.MichaelBot = ctx.bot
+    profiler = bot.command_profiler
+
+    embed = helpers.get_default_embed(
+        title = "Command Latency",
+        description = f"Since {profiler.started_at.strftime('%Y-%m-%d %H:%M:%S %Z')}. All values are in ms.",
+        author = ctx.author,
+        timestamp = dt.datetime.now().astimezone()
+    )
+
+    if ctx.options.command is not None:
+        profile = profiler.get(ctx.options.command)
+        if profile is None:
+            await ctx.respond("This command has no recorded invocation.", reply = True, mentions_reply = True)
+            return
+        
+        embed.title = f"Command Latency: {profile.qualname}"
+        display = f"calls: {profile.calls}, failures: {profile.failures}, window: {len(profile.samples)}\n\n"
+        display += f"{'':<10} {'mean':>8} {'p50':>8} {'p95':>8} {'p99':>8}\n"
+        for name in models.CommandProfile.FIELDS:
+            display += f"{name:<10} {profile.mean(name):>8.1f} {profile.percentile(50, name):>8.1f} {profile.percentile(95, name):>8.1f} {profile.percentile(99, name):>8.1f}\n"
+        embed.description += f"\n```{display}```"
+        await ctx.respond(embed = embed, reply = True)
+        return
+    
+    profiles = profiler.slowest(10)
+    if not profiles:
+        await ctx.respond("No command recorded.", reply = True)
+        return
+    
+    for profile in profiles:
+        embed.add_field(
+            name = profile.qualname,
+            value = f"```calls: {profile.calls}, failures: {profile.failures}\n"
+                    f"p50: {profile.percentile(50):.1f}, p95: {profile.percentile(95):.1f}, p99: {profile.percentile(99):.1f}\n"
+                    f"mean pool: {profile.mean('pool_wait'):.1f}, db: {profile.mean('db'):.1f}, rest: {profile.mean('rest'):.1f}, "
+                    f"lag: {profile.mean('lag'):.1f}, other: {profile.mean('other'):.1f}```"
+        )
+    await ctx.respond(embed = embed, reply = True)
+
+@command_stats.child
+@lightbulb.command("json", "Export all command latency statistics as JSON.", hidden = True)
+@lightbulb.implements(lightbulb.PrefixSubCommand)
+async def command_stats_json(ctx: lightbulb.Context):
+    bot: models.MichaelBot = ctx.bot
+
+    data = json.dumps(bot.command_profiler.to_dict(), indent = 4)
+    await ctx.respond(attachment = hikari.Bytes(data.encode("utf-8"), "command_stats.json"), reply = True)
+
+@command_stats.child
+@lightbulb.command("reset", "Drop all command latency statistics.", hidden = True)
+@lightbulb.implements(lightbulb.PrefixSubCommand)
+async def command_stats_reset(ctx: lightbulb.Context):
+    bot: models.MichaelBot = ctx.bot
+
+    bot.command_profiler.reset()
+    await ctx.respond("Command statistics cleared.", reply = True)
+
+@plugin.command()
+@lightbulb.command("loop-lag", "Display the event loop lag and the code caught blocking it.", hidden = True)
+@lightbulb.implements(lightbulb.PrefixCommandGroup)
+async def loop_lag(ctx: lightbulb.Context):
+    bot: models.MichaelBot = ctx.bot
+    monitor = bot.loop_monitor
+
+    embed = helpers.get_default_embed(
+        title = "Event Loop Lag",
+        description = f"Current: `{monitor.current_lag * 1000:.1f}ms`, mean: `{monitor.mean_lag * 1000:.1f}ms`, max: `{monitor.max_lag * 1000:.1f}ms` "
+                      f"over the last {len(monitor.lag_samples)} samples.\n"
+                      f"Caught {monitor.stalls} stall(s) longer than `{monitor.threshold * 1000:.0f}ms`.",
+        author = ctx.author,
+        timestamp = dt.datetime.now().astimezone()
+    )
+    for report in monitor.offenders(5):
+        embed.add_field(
+            name = report.location[:256],
+            value = f"Caught {report.count} time(s), up to `{report.max_stall * 1000:.0f}ms`. "
+                    f"Last seen {report.last_seen.strftime('%Y-%m-%d %H:%M:%S %Z')}.\n"
+                    f"```{report.last_stack[-700:]}```"
+        )
+    await ctx.respond(embed = embed, reply = True)
+
+@loop_lag.child
+@lightbulb.command("reset", "Drop all event loop lag reports.", hidden = True)
+@lightbulb.implements(lightbulb.PrefixSubCommand)
+async def loop_lag_reset(ctx: lightbulb.Context):
+    bot: models.MichaelBot = ctx.bot
+
+    bot.loop_monitor.reset()
+    await ctx.respond("Event loop lag reports cleared.", reply = True)
+
+@plugin.command()
+@lightbulb.command("metrics", "Dump the sampled host metrics as JSON.", hidden = True)
+@lightbulb.implements(lightbulb.PrefixCommand)
+async def metrics(ctx: lightbulb.Context):
+    bot: models.MichaelBot = ctx.bot
+
+    dump = json.dumps(bot.host_metrics.to_dict(), indent = 4)
+    await ctx.respond(f"{len(bot.host_metrics.samples)} sample(s).", attachment = hikari.Bytes(dump, "metrics.json"), reply = True)
+
+@plugin.command()
+@lightbulb.command("track-cache", "Display the hit rate of the music track cache.", hidden = True)
+@lightbulb.implements(lightbulb.PrefixCommandGroup)
+async def track_cache(ctx: lightbulb.Context):
+    bot: models.MichaelBot = ctx.bot
+    stats = bot.track_cache.to_dict()
+
+    embed = helpers.get_default_embed(
+        title = "Track Cache",
+        description = f"Hit rate: `{stats['hit_rate'] * 100:.1f}%` ({stats['hits']} hits, {stats['coalesced']} coalesced, {stats['misses']} misses).\n"
+                      f"Holding {stats['entries']} queries, `{stats['bytes'] / 1024:.1f}`/`{stats['max_bytes'] / 1024:.0f}` KiB of encoded tracks. "
+                      f"Evicted {stats['evictions']} queries.",
+        author = ctx.author,
+        timestamp = dt.datetime.now().astimezone()
+    )
+    await ctx.respond(embed = embed, reply = True)
+
+@track_cache.child
+@lightbulb.command("reset", "Drop all cached tracks and reset the statistics.", hidden = True)
+@lightbulb.implements(lightbulb.PrefixSubCommand)
+async def track_cache_reset(ctx: lightbulb.Context):
+    bot: models.MichaelBot = ctx.bot
+
+    bot.track_cache.clear()
+    bot.track_cache.reset_stats()
+    await ctx.respond("Track cache cleared.", reply = True)
+
 @plugin.command()
 @lightbulb.option("value_name", "The value's exact name. This should exist in either loot.py or trader.py")
 @lightbulb.command("get-econ-value", "Display secret values of economy setting.", hidden = True)
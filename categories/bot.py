@@ -1,5 +1,6 @@
 '''Bot-related Commands.'''
 
+import copy
 import datetime as dt
 import platform
 from textwrap import dedent
@@ -8,7 +9,6 @@ import hikari
 import humanize
 import lightbulb
 import miru
-import psutil
 
 from categories.economy import CURRENCY_ICON, item_autocomplete
 from utils import checks, converters, helpers, models
@@ -22,6 +22,33 @@ plugin.add_checks(
     lightbulb.bot_has_guild_permissions(*helpers.COMMAND_STANDARD_PERMISSIONS),
 )
 
+CHANGELOG_CHANNELS = {
+    "stable": 644393721512722432,
+    "dev": 759288597500788766,
+    "development": 759288597500788766,
+    "balance-changes": 1010230928381067285,
+}
+plugin.d.changelog = models.ChangelogFeed(set(CHANGELOG_CHANNELS.values()))
+
+@plugin.listener(hikari.StartedEvent)
+async def preload_changelog(event: hikari.StartedEvent):
+    await plugin.d.changelog.preload(event.app.rest)
+
+@plugin.listener(hikari.GuildMessageCreateEvent)
+async def on_changelog_create(event: hikari.GuildMessageCreateEvent):
+    if event.channel_id in plugin.d.changelog:
+        plugin.d.changelog.add(event.message)
+
+@plugin.listener(hikari.GuildMessageUpdateEvent)
+async def on_changelog_update(event: hikari.GuildMessageUpdateEvent):
+    if event.channel_id in plugin.d.changelog:
+        plugin.d.changelog.edit(event.message)
+
+@plugin.listener(hikari.GuildMessageDeleteEvent)
+async def on_changelog_delete(event: hikari.GuildMessageDeleteEvent):
+    if event.channel_id in plugin.d.changelog:
+        plugin.d.changelog.remove(event.app.rest, event.channel_id, event.message_id)
+
 class ReportModal(miru.Modal):
     reason = miru.TextInput(label = "Reason", placeholder = "Enter the report.", style = hikari.TextInputStyle.PARAGRAPH, required = True)
 
@@ -84,41 +111,13 @@ def get_memory_size(byte: int, /, suffix: str = "B") -> str:
         byte /= factor
 
 async def help_name_autocomplete(option: hikari.AutocompleteInteractionOption, interaction: hikari.AutocompleteInteraction):
-    # Use dictionary to ensure unique values.
-    valid_match = {}
     bot: models.MichaelBot = interaction.app
 
-    def match_algorithm(name: str, input_value: str):
-        return input_value in name
-        #return name.startswith(input_value)
-
-    for plg_name, _ in bot.plugins.items():
-        if match_algorithm(plg_name.lower(), option.value) and not plg_name.startswith('.'):
-            # Just dummy value.
-            valid_match[plg_name] = True
-    
-    # Return categories by default.
-    if option.value == '':
-        return tuple(valid_match.keys())[:25]
-    
-    for cmd_name, p_cmd in bot.prefix_commands.items():
-        if match_algorithm(cmd_name.lower(), option.value) and not p_cmd.hidden:
-            valid_match[cmd_name] = True
-    for cmd_name, s_cmd in bot.slash_commands.items():
-        if match_algorithm(cmd_name.lower(), option.value) and not s_cmd.hidden:
-            valid_match[cmd_name] = True
-    for cmd_name, m_cmd in bot.message_commands.items():
-        if match_algorithm(cmd_name.lower(), option.value) and not m_cmd.hidden:
-            valid_match[cmd_name] = True
-    for cmd_name, u_cmd in bot.user_commands.items():
-        if match_algorithm(cmd_name.lower(), option.value) and not u_cmd.hidden:
-            valid_match[cmd_name] = True
-    
-    # dict.keys() is not subscriptable.
-    if len(valid_match.keys()) > 0:
-        return tuple(valid_match.keys())[:25]
-    
-    return []
+    # The help command compiles a name index along with its embeds.
+    index = getattr(bot.help_command, "index", None)
+    if index is None:
+        return []
+    return index.complete(option.value)
 
 @plugin.command()
 @lightbulb.set_help(dedent('''
@@ -140,24 +139,24 @@ async def changelog(ctx: lightbulb.Context):
     if isinstance(ctx, lightbulb.PrefixContext):
         await ctx.event.message.delete()
 
-    if log_option.lower() == "stable":
-        CHANNEL_ID = 644393721512722432
-    elif log_option.lower() in ("dev", "development"):
-        CHANNEL_ID = 759288597500788766
-    elif log_option.lower() == "balance-changes":
-        CHANNEL_ID = 1010230928381067285
-    
-    channel: hikari.GuildTextChannel = bot.cache.get_guild_channel(CHANNEL_ID)
-    if channel is None:
-        return await ctx.respond("Seems like I can't retrieve the change logs. You might wanna report this to the developers.", reply = True, mentions_reply = True)
+    feed: models.ChangelogFeed = plugin.d.changelog
+    channel_id = CHANGELOG_CHANNELS[log_option.lower()]
+    if not feed.is_loaded(channel_id):
+        # Only happens if preloading failed.
+        try:
+            await feed.refresh(bot.rest, channel_id)
+        except hikari.HTTPError:
+            return await ctx.respond("Seems like I can't retrieve the change logs. You might wanna report this to the developers.", reply = True, mentions_reply = True)
     
+    now = dt.datetime.now().astimezone()
     embeds = []
-    async for message in channel.fetch_history().limit(10):
-        embeds.append(helpers.get_default_embed(
-            description = message.content,
-            timestamp = dt.datetime.now().astimezone(),
-            author = ctx.author
-        ))
+    for embed in feed.get_embeds(channel_id):
+        # Shallow copy is enough since only the footer and timestamp are replaced.
+        embed = copy.copy(embed)
+        embed.timestamp = now
+        embeds.append(embed.set_footer(text = f"Requested by {ctx.author.username}", icon = ctx.author.avatar_url))
+    if not embeds:
+        return await ctx.respond("There's no change log yet.", reply = True)
     page_nav = ButtonNavigator(pages = embeds, authors = (ctx.author.id, ))
     await run_view(page_nav, ctx)
 
@@ -231,10 +230,13 @@ async def info_host(ctx: lightbulb.Context):
         processor = "Intel Core i3-10100 @ 3.60GHz"
     elif system == "Windows":
         processor = "Intel Core i7-1165G7 @ 2.80GHz"
-    boot_duration = dt.datetime.now().astimezone() - dt.datetime.fromtimestamp(psutil.boot_time()).astimezone()
+    metrics = bot.host_metrics
+    boot_duration = dt.datetime.now().astimezone() - dt.datetime.fromtimestamp(metrics.boot_time).astimezone()
     up_time = dt.datetime.now().astimezone() - bot.online_at
-    ram = psutil.virtual_memory()
-    swap = psutil.swap_memory()
+    cpu_freq = metrics.cpu_freq
+    latest = metrics.latest
+    # About 5 minutes with the default interval.
+    window = 30
 
     embed = helpers.get_default_embed(
         title = bot.get_me().username,
@@ -258,19 +260,38 @@ async def info_host(ctx: lightbulb.Context):
     ).add_field(
         name = "CPU Information",
         value = dedent(f'''
-            > **Physical Cores:** {psutil.cpu_count(logical = False)}
-            > **Total Cores:** {psutil.cpu_count(logical = True)}
-            > **Max Frequency:** {psutil.cpu_freq().max / 1000 :.2f}GHz
-            > **Min Frequency:** {psutil.cpu_freq().min / 1000 :.2f}GHz
-            > **Total CPU Usage:** {psutil.cpu_percent()}%
-        ''')
-    ).add_field(
-        name = "Memory Information",
-        value = dedent(f'''
-            > **RAM Usage:** {get_memory_size(ram.used)}/{get_memory_size(ram.total)} ({ram.percent}%)
-            > **Swap Usage:** {get_memory_size(swap.used)}/{get_memory_size(swap.free)} ({swap.percent}%)
+            > **Physical Cores:** {metrics.physical_cores}
+            > **Total Cores:** {metrics.logical_cores}
+            > **Max Frequency:** {f"{cpu_freq.max / 1000 :.2f}GHz" if cpu_freq else "Unknown"}
+            > **Min Frequency:** {f"{cpu_freq.min / 1000 :.2f}GHz" if cpu_freq else "Unknown"}
         ''')
-    ).set_thumbnail(bot.get_me().avatar_url)
+    )
+
+    if latest is None:
+        embed.add_field(
+            name = "Usage",
+            value = "No sample collected yet. Try again in a bit."
+        )
+    else:
+        embed.add_field(
+            name = "Memory Information",
+            value = dedent(f'''
+                > **RAM Usage:** {get_memory_size(latest.ram_used)}/{get_memory_size(latest.ram_total)} ({latest.ram_used / latest.ram_total * 100:.1f}%)
+                > **Swap Usage:** {get_memory_size(latest.swap_used)}/{get_memory_size(latest.swap_total)}
+                > **Bot Memory:** {get_memory_size(latest.rss)}
+            ''')
+        ).add_field(
+            name = f"Usage (average of the last {min(window, len(metrics.samples))} samples)",
+            value = dedent(f'''
+                > **CPU:** {metrics.average("cpu_percent", window):.1f}% `{metrics.sparkline("cpu_percent")}`
+                > **Bot Memory:** {get_memory_size(metrics.average("rss", window))} `{metrics.sparkline("rss")}`
+                > **Connections:** {metrics.average("connections", window):.0f} `{metrics.sparkline("connections")}`
+                > **Event Loop Lag:** {metrics.average("loop_lag", window) * 1000:.1f}ms `{metrics.sparkline("loop_lag")}`
+                > **Database Pool:** {metrics.average("pool_used", window):.1f}/{latest.pool_size} `{metrics.sparkline("pool_used")}`
+                > **Gateway Latency:** {metrics.average("gateway_latency", window) * 1000:.0f}ms `{metrics.sparkline("gateway_latency")}`
+            ''')
+        )
+    embed.set_thumbnail(bot.get_me().avatar_url)
 
     await ctx.respond(embed = embed, reply = True)
 
@@ -433,11 +454,13 @@ async def info_role(ctx: lightbulb.Context):
             value = ", ".join(special)
         )
     
-    count = 0
-    members = ctx.get_guild().get_members()
-    for member_id in members:
-        if role in members[member_id].get_roles():
-            count += 1
+    bot: models.MichaelBot = ctx.bot
+    stats = bot.guild_stats.get(ctx.get_guild())
+    if role.id == ctx.guild_id:
+        # @everyone
+        count = stats.member_count
+    else:
+        count = len(stats.get_role_members(role.id))
     
     embed.add_field(
         name = "Members",
@@ -477,49 +500,26 @@ async def info_server(ctx: lightbulb.Context):
         inline = True
     )
 
-    guild_channel_count = {
-        "text": 0,
-        "voice": 0,
-        "stage": 0,
-        "category": 0,
-        "news": 0,
-    }
-    channels = guild.get_channels()
-    for channel_id in channels:
-        if channels[channel_id].type == hikari.ChannelType.GUILD_TEXT:
-            guild_channel_count["text"] += 1
-        elif channels[channel_id].type == hikari.ChannelType.GUILD_VOICE:
-            guild_channel_count["voice"] += 1
-        elif channels[channel_id].type == hikari.ChannelType.GUILD_STAGE:
-            guild_channel_count["stage"] += 1
-        elif channels[channel_id].type == hikari.ChannelType.GUILD_CATEGORY:
-            guild_channel_count["category"] += 1
-        elif channels[channel_id].type == hikari.ChannelType.GUILD_NEWS:
-            guild_channel_count["news"] += 1
+    bot: models.MichaelBot = ctx.bot
+    stats = bot.guild_stats.get(guild)
     embed.add_field(
         name = "Channels",
         value = dedent(f'''
-                Text Channels: {guild_channel_count["text"]}
-                Voice Channels: {guild_channel_count["voice"]}
-                Categories: {guild_channel_count["category"]}
-                Stage Channels: {guild_channel_count["stage"]}
-                News Channels: {guild_channel_count["news"]}
+                Text Channels: {stats.channel_counts[hikari.ChannelType.GUILD_TEXT]}
+                Voice Channels: {stats.channel_counts[hikari.ChannelType.GUILD_VOICE]}
+                Categories: {stats.channel_counts[hikari.ChannelType.GUILD_CATEGORY]}
+                Stage Channels: {stats.channel_counts[hikari.ChannelType.GUILD_STAGE]}
+                News Channels: {stats.channel_counts[hikari.ChannelType.GUILD_NEWS]}
                 '''),
         inline = True
     )
 
-    bot_count = 0
-    members = guild.get_members()
-    for member_id in members:
-        if members[member_id].is_bot:
-            bot_count += 1
-    
     embed.add_field(
         name = "Members Count",
         value = dedent(f'''
-                Total: {len(members)}
-                Humans: {len(members) - bot_count}
-                Bots: {bot_count}
+                Total: {stats.member_count}
+                Humans: {stats.human_count}
+                Bots: {stats.bot_count}
                 '''),
         inline = True
     )
@@ -1841,6 +1841,16 @@ def get_brew_recipe(potion_id: str) -> dict[str, int] | None:
 
     return copy.deepcopy(__BREW_RECIPE.get(potion_id))
 
+def has_craft_recipe(item_id: str) -> bool:
+    '''Return whether the item has a crafting recipe. Unlike `get_craft_recipe()`, this doesn't copy the recipe.'''
+
+    return item_id in __CRAFT_RECIPE
+
+def has_brew_recipe(potion_id: str) -> bool:
+    '''Return whether the potion has a brewing recipe. Unlike `get_brew_recipe()`, this doesn't copy the recipe.'''
+
+    return potion_id in __BREW_RECIPE
+
 def roll_potion_activate(potion_id: str) -> bool:
     '''Try to roll and see if the potion activated.
 
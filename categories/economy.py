@@ -32,6 +32,9 @@ class PotionActivation(IntFlag):
         if any_flag:
             return bool(self & flags)
         return self & flags == flags
+    def item_ids(self) -> list[str]:
+        '''Return the id of every activated potion.'''
+        return [flag.name.lower() for flag in PotionActivation if flag in self]
 
 def get_final_damage(raw_damage: int, reductions: int) -> int:
     # Check sudden death
@@ -130,39 +133,6 @@ def multiply_reward(loot_table: dict[str, int], multiplier: int | float):
         if key not in loot.PREVENT_MULTIPLY:
             loot_table[key] = round(loot_table[key] * multiplier)
 
-def filter_equipment_types(equipments: list[psql.Equipment], eq_types_or_ids: tuple[str]) -> tuple[psql.Equipment | None]:
-    '''Filter equipments based on their types (like for tools) or their ids (like for potions).
-
-    Warnings
-    --------
-    This is intended to work for equipments that belongs to only one user.
-
-    Parameters
-    ----------
-    equipments : list[psql.Equipment]
-        A list of equipment to filter.
-    eq_types_or_ids : tuple[str]
-        A tuple of the equipment's type or id.
-
-    Returns
-    -------
-    tuple[psql.Equipment | None]
-        The resultant equipment or `None` if none was found. The order of these equipments (including `None`) matches the order of `eq_types_or_ids`.
-    '''
-
-    results = []
-    for eq_type_or_id in eq_types_or_ids:
-        is_break = False
-        for equipment in equipments:
-            if equipment.eq_type == eq_type_or_id or equipment.item_id == eq_type_or_id:
-                results.append(equipment)
-                is_break = True
-                break
-        
-        if not is_break:
-            results.append(None)
-    return tuple(results)
-
 async def add_reward_to_user(conn, bot: models.MichaelBot, user_id: int, loot_table: dict[str, int]):
     '''A shortcut to add rewards to the user.
 
@@ -235,11 +205,14 @@ async def process_death(conn, bot: models.MichaelBot, user: psql.User):
         The user to process.
     '''
 
-    equipments: list[psql.Equipment] = await psql.Equipment.fetch_user_equipments(conn, user.id)
-    inventories: list[psql.Inventory] = await psql.Inventory.get_user_inventory(conn, user.id)
     back_to_overworld = True
+    # The equipments that survive death only depend on the catalog and the user's world, so there's no need to read what the user has.
+    kept_equipments = [
+        item.id for item in bot.item_cache.values()
+        if item.rarity.lower() == "legendary" or ("nether_" in item.id and user.world == "nether")
+    ]
     
-    async with conn.transaction():
+    async with bot.equipment_cache.transaction(conn, user.id):
         await psql.UserBadge.add_progress(conn, user.id, "death0")
         await psql.UserBadge.add_progress(conn, user.id, "death1")
         await psql.UserBadge.add_progress(conn, user.id, "death2")
@@ -247,14 +220,7 @@ async def process_death(conn, bot: models.MichaelBot, user: psql.User):
 
         death2_badge = await psql.UserBadge.fetch_one(conn, user_id = user.id, badge_id = "death2")
 
-        for equipment in equipments:
-            item = bot.item_cache[equipment.item_id]
-            if item.rarity.lower() == "legendary":
-                continue
-            if "nether_" in equipment.item_id and user.world == "nether":
-                continue
-
-            await psql.Equipment.delete(conn, user_id = user.id, item_id = equipment.item_id)
+        await bot.equipment_cache.delete_user_equipments(conn, user.id, exclude = kept_equipments)
         
         strict_penalty = False # Round up or down, default to down.
         death_penalty = 0.05
@@ -264,23 +230,15 @@ async def process_death(conn, bot: models.MichaelBot, user: psql.User):
         if death2_badge.completed():
             death_penalty *= 0.5
         
-        for inv in inventories:
-            if inv.item_id in loot.NON_REMOVABLE_ON_DEATH:
-                continue
-            
-            if user.world == "nether" and inv.item_id == "nether_respawner":
-                inv.amount -= 1
+        untouched_items = list(loot.NON_REMOVABLE_ON_DEATH)
+        if user.world == "nether":
+            # The respawner is consumed instead of being penalized.
+            untouched_items.append("nether_respawner")
+            if await psql.Inventory.remove(conn, user.id, "nether_respawner"):
                 back_to_overworld = False
-            else:
-                if not strict_penalty:
-                    inv.amount -= int(inv.amount * death_penalty)
-                else:
-                    # Round up.
-                    inv.amount -= int(inv.amount * death_penalty) + 1
-                
-                inv.amount = max(0, inv.amount)
-                
-            await psql.Inventory.update(conn, inv)
+        
+        # Round up is the same as removing 1 more item after rounding down.
+        await psql.Inventory.remove_portion(conn, user.id, death_penalty, extra = 1 if strict_penalty else 0, exclude = untouched_items)
         
         user.balance -= user.balance * 20 // 100
         if back_to_overworld:
@@ -356,7 +314,7 @@ async def craftable_autocomplete(option: hikari.AutocompleteInteractionOption, i
 
     valid_match = []
     for item in bot.item_cache.values():
-        if loot.get_craft_recipe(item.id):
+        if psql.Equipment.get_item_traits(item.id).craftable:
             valid_match.append(item.name)
     
     if option.value == '':
@@ -371,7 +329,8 @@ async def brewable_autocomplete(option: hikari.AutocompleteInteractionOption, in
 
     valid_match = []
     for item in bot.item_cache.values():
-        if loot.get_brew_recipe(item.id) and psql.Equipment.is_potion(item.id):
+        traits = psql.Equipment.get_item_traits(item.id)
+        if traits.brewable and traits.is_potion:
             valid_match.append(item.name)
     
     if option.value == '':
@@ -406,36 +365,37 @@ async def badges(ctx: lightbulb.Context):
                 if ubadge.badge_id == badge.id and (ubadge.completed() or ubadge.badge_progress / badge.requirement >= 0.90):
                     available_badges.append(badge)
                     break
-        page = nav.ItemListBuilder(available_badges, 6)
-        @page.set_page_start_formatter
-        def start_format(_: int, __: psql.UserBadge) -> hikari.Embed:
-            return helpers.get_default_embed(
-                datetime = dt.datetime.now().astimezone(),
-                author = ctx.author
-            ).set_author(
-                name = f"{ctx.author.username}'s Badges",
-                icon = ctx.author.avatar_url
-            ).set_thumbnail(
-                ctx.author.avatar_url
-            )
-        @page.set_entry_formatter
-        def entry_format(embed: hikari.Embed, _: int, badge: psql.Badge):
-            _ubadge = None
-            for ubadge in ubadges:
-                if ubadge.badge_id == badge.id:
-                    _ubadge = ubadge
-                    break
-            
-            embed_name = f"{badge.emoji} {badge.name}"
-            if not _ubadge.completed():
-                embed_name += f" [{_ubadge.badge_progress}/{badge.requirement}]"
-            
-            embed.add_field(
-                name = embed_name,
-                value = f"*{badge.description}*"
-            )
+
+    page = nav.ItemListBuilder(available_badges, 6)
+    @page.set_page_start_formatter
+    def start_format(_: int, __: psql.UserBadge) -> hikari.Embed:
+        return helpers.get_default_embed(
+            datetime = dt.datetime.now().astimezone(),
+            author = ctx.author
+        ).set_author(
+            name = f"{ctx.author.username}'s Badges",
+            icon = ctx.author.avatar_url
+        ).set_thumbnail(
+            ctx.author.avatar_url
+        )
+    @page.set_entry_formatter
+    def entry_format(embed: hikari.Embed, _: int, badge: psql.Badge):
+        _ubadge = None
+        for ubadge in ubadges:
+            if ubadge.badge_id == badge.id:
+                _ubadge = ubadge
+                break
+        
+        embed_name = f"{badge.emoji} {badge.name}"
+        if not _ubadge.completed():
+            embed_name += f" [{_ubadge.badge_progress}/{badge.requirement}]"
         
-        await nav.run_view(page.build(authors = (ctx.author.id,)), ctx)
+        embed.add_field(
+            name = embed_name,
+            value = f"*{badge.description}*"
+        )
+    
+    await nav.run_view(page.build(authors = (ctx.author.id,), lazy = True), ctx)
 
 @plugin.command()
 @lightbulb.command("balance", f"[{plugin.name}] View your balance.", aliases = ["bal"])
@@ -551,43 +511,38 @@ async def blackjack(ctx: lightbulb.Context):
     proxy = await ctx.respond(embed = embed, components = view.build())
     msg = await proxy
 
-    def is_valid_interaction(event: hikari.InteractionCreateEvent) -> bool:
-        if not isinstance(event.interaction, hikari.ComponentInteraction):
-            return False
-        
-        return event.interaction.message.id == msg.id and event.interaction.member.id == ctx.author.id
-    while session.is_ongoing():
-        try:
-            event: hikari.InteractionCreateEvent = await bot.wait_for(hikari.InteractionCreateEvent, timeout = 120, predicate = is_valid_interaction)
-            interaction: hikari.ComponentInteraction = event.interaction
-            if interaction.custom_id == "draw":
-                state.player_choice = game.blackjack.PlayerChoice.DRAW
-            else:
-                state.player_choice = game.blackjack.PlayerChoice.STAND
+    with bot.interaction_router.listen(msg, user_id = ctx.author.id) as menu:
+        while session.is_ongoing():
+            try:
+                interaction = await menu.wait(timeout = 120)
+                if interaction.custom_id == "draw":
+                    state.player_choice = game.blackjack.PlayerChoice.DRAW
+                else:
+                    state.player_choice = game.blackjack.PlayerChoice.STAND
             
-            session.next(state)
+                session.next(state)
             
-            player_field = ', '.join([str(card) for card in state.player_hand])
-            dealer_field = ', '.join([str(card) for card in state.dealer_hand])
-            player_field += f"\n**Total:** {game.blackjack.sum_hand(state.player_hand)}"
-            dealer_field += f"\n**Total:** {game.blackjack.sum_hand(state.dealer_hand, filter = lambda c: c.is_revealed)}"
-            embed.edit_field(0,
-                "Your Hand:",
-                player_field,
-                inline = True
-            ).edit_field(1,
-                "Dealer Hand:",
-                dealer_field,
-                inline = True
-            )
+                player_field = ', '.join([str(card) for card in state.player_hand])
+                dealer_field = ', '.join([str(card) for card in state.dealer_hand])
+                player_field += f"\n**Total:** {game.blackjack.sum_hand(state.player_hand)}"
+                dealer_field += f"\n**Total:** {game.blackjack.sum_hand(state.dealer_hand, filter = lambda c: c.is_revealed)}"
+                embed.edit_field(0,
+                    "Your Hand:",
+                    player_field,
+                    inline = True
+                ).edit_field(1,
+                    "Dealer Hand:",
+                    dealer_field,
+                    inline = True
+                )
 
-            await interaction.create_initial_response(
-                hikari.ResponseType.MESSAGE_UPDATE,
-                embed = embed,
-            )
-        except asyncio.TimeoutError:
-            await msg.edit("Game aborted. I'll just take your money then, k thks!", components = None)
-            return
+                await interaction.create_initial_response(
+                    hikari.ResponseType.MESSAGE_UPDATE,
+                    embed = embed,
+                )
+            except asyncio.TimeoutError:
+                await msg.edit("Game aborted. I'll just take your money then, k thks!", components = None)
+                return
     
     for i in range(len(state.dealer_hand)):
         state.dealer_hand[i].reveal()
@@ -927,14 +882,14 @@ async def use_tool(ctx: lightbulb.Context):
             return
         
         # Check for equipment type conflict.
-        existed: psql.Equipment = await psql.Equipment.fetch_equipment(conn, user_id = ctx.author.id, eq_type = psql.Equipment.get_equipment_type(item.id))
+        existed: psql.Equipment = bot.equipment_cache.get(ctx.author.id, psql.Equipment.get_equipment_type(item.id))
         response_str = ""
 
         if existed:
             # Refund if possible.
             existed_item = bot.item_cache.get(existed.item_id)
             response_str += f"You unequipped *{existed_item.name}* "
-            async with conn.transaction():
+            async with bot.equipment_cache.transaction(conn, ctx.author.id):
                 craftable = loot.get_craft_recipe(existed.item_id)
                 if not craftable:
                     response_str += "and it disappeared like magic.\n"
@@ -957,10 +912,10 @@ async def use_tool(ctx: lightbulb.Context):
                     else:
                         response_str += f"and got back the following items: {reward_str}\n"
                 
-                await psql.Equipment.delete(conn, user_id = ctx.author.id, item_id = existed.item_id)
-                await psql.Equipment.transfer_from_inventory(conn, inv)
+                await bot.equipment_cache.delete(conn, ctx.author.id, existed.item_id)
+                await bot.equipment_cache.transfer_from_inventory(conn, inv)
         else:
-            await psql.Equipment.transfer_from_inventory(conn, inv)
+            await bot.equipment_cache.transfer_from_inventory(conn, inv)
         response_str += f"Equipped {item.emoji} *{item.name}*."
         
         await ctx.respond(response_str, reply = True)
@@ -996,12 +951,12 @@ async def use_potion(ctx: lightbulb.Context):
             await ctx.respond("You don't have this potion in your inventory!", reply = True, mentions_reply = True)
             return
 
-        potions = await psql.Equipment.fetch_user_potions(conn, ctx.author.id)
+        potions = bot.equipment_cache.get_user_potions(ctx.author.id)
         
         potions_cap = loot.POTIONS_CAP
         if (brew3_badge := await psql.UserBadge.fetch_one(conn, user_id = ctx.author.id, badge_id = "brew3")) and brew3_badge.completed():
             potions_cap += 1
-        if await psql.Equipment.fetch_one(conn, user_id = ctx.author.id, item_id = "undying_potion"):
+        if bot.equipment_cache.get(ctx.author.id, "undying_potion"):
             potions_cap += 1
         
         if len(potions) >= potions_cap:
@@ -1009,13 +964,13 @@ async def use_potion(ctx: lightbulb.Context):
             await ctx.respond(f"You currently have {len(potions)} potions equipped. You'll need to wait for one of them to expire before using another.", reply = True, mentions_reply = True)
             return
         
-        existed = await psql.Equipment.fetch_one(conn, user_id = ctx.author.id, item_id = potion.id)
+        existed = bot.equipment_cache.get(ctx.author.id, potion.id)
         if existed:
             await bot.reset_cooldown(ctx)
             await ctx.respond("You're already using this potion.", reply = True, mentions_reply = True)
             return
         
-        await psql.Equipment.transfer_from_inventory(conn, inv)
+        await bot.equipment_cache.transfer_from_inventory(conn, inv)
         
     await ctx.respond(f"Equipped {potion.emoji} *{potion.name}*", reply = True)
 
@@ -1095,26 +1050,25 @@ async def _equipments(ctx: lightbulb.Context):
         value = f"{bot.user_cache[ctx.author.id].health}"
     )
 
-    async with bot.pool.acquire() as conn:
-        equipments = await psql.Equipment.fetch_user_equipments(conn, ctx.author.id)
-        if not equipments:
-            embed.description = "*Cricket noises*"
-        else:
-            def _equipment_order(e: psql.Equipment):
-                if e.eq_type == "_sword": return 0
-                if e.eq_type == "_pickaxe": return 1
-                if e.eq_type == "_axe": return 2
-                return bot.item_cache[e.item_id].sort_id
-            
-            equipments.sort(key = _equipment_order)
-            for equipment in equipments:
-                item_form = bot.item_cache[equipment.item_id]
-                embed.add_field(
-                    name = f"{item_form.emoji} {item_form.name} [{equipment.remain_durability}/{item_form.durability}]",
-                    value = f"*{item_form.description}*"
-                )
-            embed.set_thumbnail(ctx.author.avatar_url)
-    
+    equipments = bot.equipment_cache.get_user_equipments(ctx.author.id)
+    if not equipments:
+        embed.description = "*Cricket noises*"
+    else:
+        def _equipment_order(e: psql.Equipment):
+            if e.eq_type == "_sword": return 0
+            if e.eq_type == "_pickaxe": return 1
+            if e.eq_type == "_axe": return 2
+            return bot.item_cache[e.item_id].sort_id
+        
+        equipments.sort(key = _equipment_order)
+        for equipment in equipments:
+            item_form = bot.item_cache[equipment.item_id]
+            embed.add_field(
+                name = f"{item_form.emoji} {item_form.name} [{equipment.remain_durability}/{item_form.durability}]",
+                value = f"*{item_form.description}*"
+            )
+        embed.set_thumbnail(ctx.author.avatar_url)
+
     await ctx.respond(embed = embed, reply = True)
 
 @plugin.command()
@@ -1134,52 +1088,7 @@ async def inv_view(ctx: lightbulb.Context):
     bot: models.MichaelBot = ctx.bot
     
     async with bot.pool.acquire() as conn:
-        if view_option == "compact":
-            inventories = await psql.Inventory.get_user_inventory(conn, ctx.author.id)
-            if not inventories:
-                await ctx.respond("*Cricket noises*", reply = True)
-                return
-            
-            inv_dict: dict[str, int] = {}
-            for inv in inventories:
-                inv_dict[inv.item_id] = inv.amount
-            await ctx.respond(f"**{ctx.author.username}'s Inventory**\n{get_reward_str(bot, inv_dict, option = 'emote')}", reply = True)
-        elif view_option == "full":
-            inventories = await psql.Inventory.get_user_inventory(conn, ctx.author.id)
-            if not inventories:
-                await ctx.respond("*Cricket noises*", reply = True)
-                return
-            
-            page = nav.ItemListBuilder(inventories, 5)
-            @page.set_page_start_formatter
-            def start_format(_index: int, _inv: psql.Inventory) -> hikari.Embed:
-                return helpers.get_default_embed(
-                    title = f"**{ctx.author.username}'s Inventory**",
-                    description = "",
-                    timestamp = dt.datetime.now().astimezone()
-                ).set_author(
-                    name = ctx.author.username,
-                    icon = ctx.author.avatar_url
-                ).set_thumbnail(
-                    ctx.author.avatar_url
-                )
-            @page.set_entry_formatter
-            def entry_format(embed: hikari.Embed, _index: int, inv: psql.Inventory):
-                item = bot.item_cache[inv.item_id]
-                embed.add_field(
-                    name = f"{inv.amount}x {item.emoji} {item.name}",
-                    value = f"*{item.description}*\nTotal value: {CURRENCY_ICON}{item.sell_price * inv.amount}"
-                )
-            
-            await nav.run_view(page.build(authors = (ctx.author.id,)), ctx)
-        elif view_option == "value":
-            inventories = await psql.Inventory.get_user_inventory(conn, ctx.author.id)
-            value = 0
-            for inv in inventories:
-                item = bot.item_cache[inv.item_id]
-                value += item.sell_price * inv.amount
-            await ctx.respond(f"If you sell all your items in your inventory, you'll get: {CURRENCY_ICON}{value}.", reply = True)
-        elif view_option == "safe":
+        if view_option == "safe":
             # Basically just compact + shulker_inventories
             inventories = await psql.ExtraInventory.get_user_inventory(conn, ctx.author.id)
             if not inventories:
@@ -1190,6 +1099,51 @@ async def inv_view(ctx: lightbulb.Context):
             for inv in inventories:
                 inv_dict[inv.item_id] = inv.amount
             await ctx.respond(f"**{ctx.author.username}'s Inventory (Safe)**\n{get_reward_str(bot, inv_dict, option = 'emote')}", reply = True)
+            return
+        
+        inventories = await bot.inventory_cache.get_user_inventory(conn, ctx.author.id)
+    
+    if view_option == "value":
+        value = 0
+        for inv in inventories:
+            item = bot.item_cache[inv.item_id]
+            value += item.sell_price * inv.amount
+        await ctx.respond(f"If you sell all your items in your inventory, you'll get: {CURRENCY_ICON}{value}.", reply = True)
+        return
+    
+    if not inventories:
+        await ctx.respond("*Cricket noises*", reply = True)
+        return
+    
+    if view_option == "compact":
+        inv_dict: dict[str, int] = {}
+        for inv in inventories:
+            inv_dict[inv.item_id] = inv.amount
+        await ctx.respond(f"**{ctx.author.username}'s Inventory**\n{get_reward_str(bot, inv_dict, option = 'emote')}", reply = True)
+    elif view_option == "full":
+        page = nav.ItemListBuilder(inventories, 5)
+        @page.set_page_start_formatter
+        def start_format(_index: int, _inv: psql.Inventory) -> hikari.Embed:
+            return helpers.get_default_embed(
+                title = f"**{ctx.author.username}'s Inventory**",
+                description = "",
+                timestamp = dt.datetime.now().astimezone()
+            ).set_author(
+                name = ctx.author.username,
+                icon = ctx.author.avatar_url
+            ).set_thumbnail(
+                ctx.author.avatar_url
+            )
+        @page.set_entry_formatter
+        def entry_format(embed: hikari.Embed, _index: int, inv: psql.Inventory):
+            item = bot.item_cache[inv.item_id]
+            embed.add_field(
+                name = f"{inv.amount}x {item.emoji} {item.name}",
+                value = f"*{item.description}*\nTotal value: {CURRENCY_ICON}{item.sell_price * inv.amount}"
+            )
+        
+        # Only the pages that are actually viewed get formatted.
+        await nav.run_view(page.build(authors = (ctx.author.id,), lazy = True), ctx)
 
 @inventory.child
 @lightbulb.add_cooldown(length = 10, uses = 1, bucket = lightbulb.UserBucket)
@@ -1326,7 +1280,7 @@ async def market_view(ctx: lightbulb.Context):
             ''')
         )
     
-    await nav.run_view(builder.build(authors = (ctx.author.id, )), ctx)
+    await nav.run_view(builder.build(authors = (ctx.author.id, ), lazy = True), ctx)
 
 @market.child
 @lightbulb.option("amount", "The amount to purchase. Default to 1.", type = int, min_value = 1, default = 1)
@@ -1442,8 +1396,7 @@ async def mine(ctx: lightbulb.Context):
     response_str = ""
 
     async with bot.pool.acquire() as conn:
-        equipments = await psql.Equipment.fetch_user_equipments(conn, ctx.author.id)
-        relevant_equipments = filter_equipment_types(equipments, (
+        relevant_equipments = bot.equipment_cache.filter(ctx.author.id, (
             "_pickaxe", 
             "luck_potion", 
             "fire_potion", 
@@ -1499,9 +1452,9 @@ async def mine(ctx: lightbulb.Context):
         
         # Check for badges.
         if (death1_badge := await psql.UserBadge.fetch_one(conn, user_id = ctx.author.id, badge_id = "death1")) and death1_badge.completed():
-            dmg_reductions += loot.DMG_REDUCTIONS["death1"] * len(equipments)
+            dmg_reductions += loot.DMG_REDUCTIONS["death1"] * bot.equipment_cache.count(ctx.author.id)
         if (death3_badge := await psql.UserBadge.fetch_one(conn, user_id = ctx.author.id, badge_id = "death3")) and death3_badge.completed():
-            dmg_reductions += loot.DMG_REDUCTIONS["death3"] * len(equipments)
+            dmg_reductions += loot.DMG_REDUCTIONS["death3"] * bot.equipment_cache.count(ctx.author.id)
         if (iron2_badge := await psql.UserBadge.fetch_one(conn, user_id = ctx.author.id, badge_id = "iron2")) and iron2_badge.completed():
             external_buffs.append("iron2")
         if (diamond1_badge := await psql.UserBadge.fetch_one(conn, user_id = ctx.author.id, badge_id = "diamond1")) and diamond1_badge.completed():
@@ -1537,50 +1490,48 @@ async def mine(ctx: lightbulb.Context):
                 # Undying Potion activated and negated the damage, so we don't need to do anything.
                 pass
         
-        async with conn.transaction():
+        async with bot.equipment_cache.transaction(conn, ctx.author.id):
             await add_reward_to_user(conn, bot, ctx.author.id, loot_table)
-            await psql.Equipment.update_durability(conn, ctx.author.id, pickaxe_existed.item_id, pickaxe_existed.remain_durability - 1)
             # Update health.
             await bot.user_cache.update(conn, user)
 
+            # Because we do take damage even if there's no drop, we need to check if the drop is empty before decreasing the potions that affect drops.
+            empty_table = True
+            for item, amount in loot_table.items():
+                if not item == "raw_damage" and amount != 0:
+                    empty_table = False
+                    break
+            
+            # Process durability. The tool and every activated potion are used up in one go.
+            used_potions = potion_activated if not empty_table else potion_activated & (PotionActivation.FIRE_POTION | PotionActivation.UNDYING_POTION)
+            remaining = await bot.equipment_cache.consume_durability(conn, ctx.author.id, [pickaxe_existed.item_id, *used_potions.item_ids()])
+
             # Process potions.
             if potion_activated.has_flag(PotionActivation.FIRE_POTION):
-                await psql.Equipment.update_durability(conn, ctx.author.id, "fire_potion", has_fire_potion.remain_durability - 1)
                 response_str += "*Fire Potion* activated, saving you from death!\n"
-                if has_fire_potion.remain_durability - 1 == 0:
+                if remaining.get("fire_potion") == 0:
                     response_str += "*Fire Potion* expired!\n"
             if potion_activated.has_flag(PotionActivation.UNDYING_POTION):
-                await psql.Equipment.update_durability(conn, ctx.author.id, "undying_potion", has_undead_potion.remain_durability - 1)
                 response_str += "*Undying Potion* activated, negating the most recent damage!\n"
-                if has_undead_potion.remain_durability - 1 == 0:
+                if remaining.get("undying_potion") == 0:
                     response_str += "*Undying Potion* expired!\n"
             
-            # Because we do take damage even if there's no drop, we need to check if the drop is empty before decreasing the potions that affect drops.
-            empty_table = True
-            for item, amount in loot_table.items():
-                if not item == "raw_damage" and amount != 0:
-                    empty_table = False
-                    break
-            
             if empty_table:
                 response_str += "After a long exploring session, you came back with only dust and regret."
                 await ctx.respond(response_str, reply = True, mentions_reply = True)
                 return
 
             if potion_activated.has_flag(PotionActivation.LUCK_POTION):
-                await psql.Equipment.update_durability(conn, ctx.author.id, "luck_potion", has_luck_potion.remain_durability - 1)
                 response_str += "*Luck Potion* activated, giving you more rare drops!\n"
-                if has_luck_potion.remain_durability - 1 == 0:
+                if remaining.get("luck_potion") == 0:
                     response_str += "*Luck Potion* expired!\n"
             if potion_activated.has_flag(PotionActivation.HASTE_POTION):
-                await psql.Equipment.update_durability(conn, ctx.author.id, "haste_potion", has_haste_potion.remain_durability - 1)
                 response_str += "*Haste Potion* activated, giving you a reward boost!\n"
-                if has_haste_potion.remain_durability - 1 == 0:
+                if remaining.get("haste_potion") == 0:
                     response_str += "*Haste Potion* expired!\n"
             if potion_activated.has_flag(PotionActivation.FORTUNE_POTION):
-                await psql.Equipment.update_durability(conn, ctx.author.id, "fortune_potion", has_fortune_potion.remain_durability - 1)
                 response_str += "*Fortune Potion* activated, giving you a reward boost!\n"
-                if has_fortune_potion.remain_durability - 1 == 0:
+                if remaining.get("fortune_potion") == 0:
                     response_str += "*Fortune Potion* expired!\n"
             
             # Process badges.
@@ -1595,7 +1546,7 @@ async def mine(ctx: lightbulb.Context):
                 await psql.UserBadge.add_progress(conn, ctx.author.id, "debris2", loot_table["debris"])
     
     response_str += f"You mined and received {get_reward_str(bot, loot_table, option = 'emote')}\n"
-    if pickaxe_existed.remain_durability - 1 == 0:
+    if remaining.get(pickaxe_existed.item_id) == 0:
         pickaxe_item = bot.item_cache[pickaxe_existed.item_id]
         response_str += f"Your {pickaxe_item.emoji} *{pickaxe_item.name}* broke after the last mining session!"
     
@@ -1622,8 +1573,7 @@ async def explore(ctx: lightbulb.Context):
     response_str = ""
 
     async with bot.pool.acquire() as conn:
-        equipments = await psql.Equipment.fetch_user_equipments(conn, ctx.author.id)
-        relevant_equipments = filter_equipment_types(equipments, (
+        relevant_equipments = bot.equipment_cache.filter(ctx.author.id, (
             "_sword",
             "luck_potion",
             "fire_potion",
@@ -1674,9 +1624,9 @@ async def explore(ctx: lightbulb.Context):
         
         # Check for badges.
         if (death1_badge := await psql.UserBadge.fetch_one(conn, user_id = ctx.author.id, badge_id = "death1")) and death1_badge.completed():
-            dmg_reductions += loot.DMG_REDUCTIONS["death1"] * len(equipments)
+            dmg_reductions += loot.DMG_REDUCTIONS["death1"] * bot.equipment_cache.count(ctx.author.id)
         if (death3_badge := await psql.UserBadge.fetch_one(conn, user_id = ctx.author.id, badge_id = "death3")) and death3_badge.completed():
-            dmg_reductions += loot.DMG_REDUCTIONS["death3"] * len(equipments)
+            dmg_reductions += loot.DMG_REDUCTIONS["death3"] * bot.equipment_cache.count(ctx.author.id)
         if (blaze1_badge := await psql.UserBadge.fetch_one(conn, user_id = ctx.author.id, badge_id = "blaze1")) and blaze1_badge.completed():
             external_buffs.append("blaze1")
         
@@ -1707,50 +1657,48 @@ async def explore(ctx: lightbulb.Context):
                 # Undying Potion activated and negated the damage, so we don't need to do anything.
                 pass
         
-        async with conn.transaction():
+        async with bot.equipment_cache.transaction(conn, ctx.author.id):
             await add_reward_to_user(conn, bot, ctx.author.id, loot_table)
-            await psql.Equipment.update_durability(conn, ctx.author.id, sword_existed.item_id, sword_existed.remain_durability - 1)
             # Update health.
             await bot.user_cache.update(conn, user)
             
+            # Because we do take damage even if there's no drop, we need to check if the drop is empty before decreasing the potions that affect drops.
+            empty_table = True
+            for item, amount in loot_table.items():
+                if not item == "raw_damage" and amount != 0:
+                    empty_table = False
+                    break
+            
+            # Process durability. The tool and every activated potion are used up in one go.
+            used_potions = potion_activated if not empty_table else potion_activated & (PotionActivation.FIRE_POTION | PotionActivation.UNDYING_POTION)
+            remaining = await bot.equipment_cache.consume_durability(conn, ctx.author.id, [sword_existed.item_id, *used_potions.item_ids()])
+
             # Process potions.
             if potion_activated.has_flag(PotionActivation.FIRE_POTION):
-                await psql.Equipment.update_durability(conn, ctx.author.id, "fire_potion", has_fire_potion.remain_durability - 1)
                 response_str += "*Fire Potion* activated, saving you from death!\n"
-                if has_fire_potion.remain_durability - 1 == 0:
+                if remaining.get("fire_potion") == 0:
                     response_str += "*Fire Potion* expired!\n"
             if potion_activated.has_flag(PotionActivation.UNDYING_POTION):
-                await psql.Equipment.update_durability(conn, ctx.author.id, "undying_potion", has_undead_potion.remain_durability - 1)
                 response_str += "*Undying Potion* activated, negating the most recent damage!\n"
-                if has_undead_potion.remain_durability - 1 == 0:
+                if remaining.get("undying_potion") == 0:
                     response_str += "*Undying Potion* expired!\n"
             
-            # Because we do take damage even if there's no drop, we need to check if the drop is empty before decreasing the potions that affect drops.
-            empty_table = True
-            for item, amount in loot_table.items():
-                if not item == "raw_damage" and amount != 0:
-                    empty_table = False
-                    break
-            
             if empty_table:
                 response_str += "After a long exploring session, you came back with only dust and regret."
                 await ctx.respond(response_str, reply = True, mentions_reply = True)
                 return
 
             if potion_activated.has_flag(PotionActivation.LUCK_POTION):
-                await psql.Equipment.update_durability(conn, ctx.author.id, "luck_potion", has_luck_potion.remain_durability - 1)
                 response_str += "*Luck Potion* activated, giving you more rare drops!\n"
-                if has_luck_potion.remain_durability - 1 == 0:
+                if remaining.get("luck_potion") == 0:
                     response_str += "*Luck Potion* expired!\n"
             if potion_activated.has_flag(PotionActivation.STRENGTH_POTION):
-                await psql.Equipment.update_durability(conn, ctx.author.id, "strength_potion", has_strength_potion.remain_durability - 1)
                 response_str += "*Strength Potion* activated, giving you a reward boost!\n"
-                if has_strength_potion.remain_durability - 1 == 0:
+                if remaining.get("strength_potion") == 0:
                     response_str += "*Strength Potion* expired!\n"
             if potion_activated.has_flag(PotionActivation.LOOTING_POTION):
-                await psql.Equipment.update_durability(conn, ctx.author.id, "looting_potion", has_looting_potion.remain_durability - 1)
                 response_str += "*Looting Potion* activated, giving you a reward boost!\n"
-                if has_looting_potion.remain_durability - 1 == 0:
+                if remaining.get("looting_potion") == 0:
                     response_str += "*Looting Potion* expired!\n"
             
             # Process badges.
@@ -1758,7 +1706,7 @@ async def explore(ctx: lightbulb.Context):
                 await psql.UserBadge.add_progress(conn, ctx.author.id, "blaze1", loot_table["blaze_rod"])
     
     response_str += f"You explored and obtained {get_reward_str(bot, loot_table, option = 'emote')}\n"
-    if sword_existed.remain_durability - 1 == 0:
+    if remaining.get(sword_existed.item_id) == 0:
         sword_item = bot.item_cache[sword_existed.item_id]
         response_str += f"Your {sword_item.emoji} *{sword_item.name}* broke after the last exploring session!"
     
@@ -1785,8 +1733,7 @@ async def chop(ctx: lightbulb.Context):
     response_str = ""
 
     async with bot.pool.acquire() as conn:
-        equipments = await psql.Equipment.fetch_user_equipments(conn, ctx.author.id)
-        relevant_equipments = filter_equipment_types(equipments, (
+        relevant_equipments = bot.equipment_cache.filter(ctx.author.id, (
             "_axe",
             "luck_potion",
             "fire_potion",
@@ -1837,9 +1784,9 @@ async def chop(ctx: lightbulb.Context):
         
         # Check for badges.
         if (death1_badge := await psql.UserBadge.fetch_one(conn, user_id = ctx.author.id, badge_id = "death1")) and death1_badge.completed():
-            dmg_reductions += loot.DMG_REDUCTIONS["death1"] * len(equipments)
+            dmg_reductions += loot.DMG_REDUCTIONS["death1"] * bot.equipment_cache.count(ctx.author.id)
         if (death3_badge := await psql.UserBadge.fetch_one(conn, user_id = ctx.author.id, badge_id = "death3")) and death3_badge.completed():
-            dmg_reductions += loot.DMG_REDUCTIONS["death3"] * len(equipments)
+            dmg_reductions += loot.DMG_REDUCTIONS["death3"] * bot.equipment_cache.count(ctx.author.id)
         if (wood2_badge := await psql.UserBadge.fetch_one(conn, user_id = ctx.author.id, badge_id = "wood2")) and wood2_badge.completed():
             external_buffs.append("wood2")
         
@@ -1871,50 +1818,48 @@ async def chop(ctx: lightbulb.Context):
                 # Undying Potion activated and negated the damage, so we don't need to do anything.
                 pass
         
-        async with conn.transaction():
+        async with bot.equipment_cache.transaction(conn, ctx.author.id):
             await add_reward_to_user(conn, bot, ctx.author.id, loot_table)
-            await psql.Equipment.update_durability(conn, ctx.author.id, axe_existed.item_id, axe_existed.remain_durability - 1)
             # Update health.
             await bot.user_cache.update(conn, user)
             
+            # Because we do take damage even if there's no drop, we need to check if the drop is empty before decreasing the potions that affect drops.
+            empty_table = True
+            for item, amount in loot_table.items():
+                if not item == "raw_damage" and amount != 0:
+                    empty_table = False
+                    break
+            
+            # Process durability. The tool and every activated potion are used up in one go.
+            used_potions = potion_activated if not empty_table else potion_activated & (PotionActivation.FIRE_POTION | PotionActivation.UNDYING_POTION)
+            remaining = await bot.equipment_cache.consume_durability(conn, ctx.author.id, [axe_existed.item_id, *used_potions.item_ids()])
+
             # Process potions.
             if potion_activated.has_flag(PotionActivation.FIRE_POTION):
-                await psql.Equipment.update_durability(conn, ctx.author.id, "fire_potion", has_fire_potion.remain_durability - 1)
                 response_str += "*Fire Potion* activated, saving you from death!\n"
-                if has_fire_potion.remain_durability - 1 == 0:
+                if remaining.get("fire_potion") == 0:
                     response_str += "*Fire Potion* expired!\n"
             if potion_activated.has_flag(PotionActivation.UNDYING_POTION):
-                await psql.Equipment.update_durability(conn, ctx.author.id, "undying_potion", has_undead_potion.remain_durability - 1)
                 response_str += "*Undying Potion* activated, negating the most recent damage!\n"
-                if has_undead_potion.remain_durability - 1 == 0:
+                if remaining.get("undying_potion") == 0:
                     response_str += "*Undying Potion* expired!\n"
             
-            # Because we do take damage even if there's no drop, we need to check if the drop is empty before decreasing the potions that affect drops.
-            empty_table = True
-            for item, amount in loot_table.items():
-                if not item == "raw_damage" and amount != 0:
-                    empty_table = False
-                    break
-            
             if empty_table:
                 response_str += "After a long exploring session, you came back with only dust and regret."
                 await ctx.respond(response_str, reply = True, mentions_reply = True)
                 return
 
             if potion_activated.has_flag(PotionActivation.LUCK_POTION):
-                await psql.Equipment.update_durability(conn, ctx.author.id, "luck_potion", has_luck_potion.remain_durability - 1)
                 response_str += "*Luck Potion* activated, giving you more rare drops!\n"
-                if has_luck_potion.remain_durability - 1 == 0:
+                if remaining.get("luck_potion") == 0:
                     response_str += "*Luck Potion* expired!\n"
             if potion_activated.has_flag(PotionActivation.HASTE_POTION):
-                await psql.Equipment.update_durability(conn, ctx.author.id, "haste_potion", has_haste_potion.remain_durability - 1)
                 response_str += "*Haste Potion* activated, giving you a reward boost!\n"
-                if has_haste_potion.remain_durability - 1 == 0:
+                if remaining.get("haste_potion") == 0:
                     response_str += "*Haste Potion* expired!\n"
             if potion_activated.has_flag(PotionActivation.NATURE_POTION):
-                await psql.Equipment.update_durability(conn, ctx.author.id, "nature_potion", has_nature_potion.remain_durability - 1)
                 response_str += "*Nature Potion* activated, giving you a reward boost!\n"
-                if has_nature_potion.remain_durability - 1 == 0:
+                if remaining.get("nature_potion") == 0:
                     response_str += "*Nature Potion* expired!\n"
             
             # Process badges.
@@ -1923,7 +1868,7 @@ async def chop(ctx: lightbulb.Context):
                 await psql.UserBadge.add_progress(conn, ctx.author.id, "wood2", loot_table["wood"])
     
     response_str += f"You chopped and collected {get_reward_str(bot, loot_table, option = 'emote')}\n"
-    if axe_existed.remain_durability - 1 == 0:
+    if remaining.get(axe_existed.item_id) == 0:
         axe_item = bot.item_cache[axe_existed.item_id]
         response_str += f"Your {axe_item.emoji} *{axe_item.name}* broke after the last chopping session!"
     
@@ -1969,15 +1914,18 @@ async def refresh_trade(bot: models.MichaelBot):
             # Since all trades has virtually the same refresh time, check one is enough.
             # If trade is not yet reset, create a task to reset.
             if trades[0].next_reset > current:
-                bot.create_task(do_refresh_trade(bot, trades[0].next_reset))
+                # Spawned through the coordinator so it's dropped if another process takes over the refresh.
+                bot.task_coordinator.create_task("refresh_trade", do_refresh_trade(bot, trades[0].next_reset))
             else:
                 await do_refresh_trade(bot)
         else:
             await do_refresh_trade(bot)
 
 @plugin.listener(hikari.ShardReadyEvent)
-async def on_shard_ready(_: hikari.ShardReadyEvent):
-    refresh_trade.start()
+async def on_shard_ready(event: hikari.ShardReadyEvent):
+    bot: models.MichaelBot = event.app
+    # Trades are shared through the db, so only one process should refresh them.
+    bot.task_coordinator.register("refresh_trade", refresh_trade)
 
 @plugin.command()
 @lightbulb.set_help(dedent(f'''
@@ -2070,123 +2018,117 @@ async def _trade(ctx: lightbulb.Context):
     msg = await resp.message()
     await view.start(msg)
 
-    def is_select_interaction(event: hikari.InteractionCreateEvent):
-        if not isinstance(event.interaction, hikari.ComponentInteraction):
-            return False
-        
-        return event.interaction.message.id == msg.id and event.interaction.member.id == ctx.author.id
-    
-    # Maybe change this to while options cuz we only need to listen if there's trade available?
-    while True:
-        try:
-            event = await bot.wait_for(hikari.InteractionCreateEvent, timeout = 120, predicate = is_select_interaction)
-            interaction: hikari.ComponentInteraction = event.interaction
-            selected = int(interaction.values[0])
-            selected_trade: psql.ActiveTrade = None
-            for trade in trades:
-                if trade.id == selected:
-                    selected_trade = trade
-                    break
+    with bot.interaction_router.listen(msg, user_id = ctx.author.id) as menu:
+        # Maybe change this to while options cuz we only need to listen if there's trade available?
+        while True:
+            try:
+                interaction = await menu.wait(timeout = 120)
+                selected = int(interaction.values[0])
+                selected_trade: psql.ActiveTrade = None
+                for trade in trades:
+                    if trade.id == selected:
+                        selected_trade = trade
+                        break
             
-            # Refetch for latest info.
-            user = bot.user_cache[ctx.author.id]
-            if user.world != "overworld":
-                await ctx.respond("You need to be in the Overworld to use this command!", reply = True, mentions_reply = True)
-                return
+                # Refetch for latest info.
+                user = bot.user_cache[ctx.author.id]
+                if user.world != "overworld":
+                    await ctx.respond("You need to be in the Overworld to use this command!", reply = True, mentions_reply = True)
+                    return
             
-            if selected_trade is None:
-                print(trades)
-                print(selected)
-                await ctx.respond("Something is wrong, report this to the dev.", reply = True, mentions_reply = True)
-                return
-
-            if selected_trade.next_reset < dt.datetime.now().astimezone():
-                # Maybe edit into an updated trade?
-                await msg.edit("This trade menu is expired. Invoke this command again for a list of updated trades.", embed = None, components = None)
-                break
+                if selected_trade is None:
+                    print(trades)
+                    print(selected)
+                    await ctx.respond("Something is wrong, report this to the dev.", reply = True, mentions_reply = True)
+                    return
+
+                if selected_trade.next_reset < dt.datetime.now().astimezone():
+                    # Maybe edit into an updated trade?
+                    await msg.edit("This trade menu is expired. Invoke this command again for a list of updated trades.", embed = None, components = None)
+                    break
             
-            # Process trade here.
-            async with bot.pool.acquire() as conn:
-                user_trade = await psql.UserTrade.fetch_one(conn, user_id = ctx.author.id, trade_id = selected, trade_type = "trade")
-                if user_trade is None:
-                    user_trade = psql.UserTrade(ctx.author.id, selected_trade.id, selected_trade.type, selected_trade.hard_limit, 0)
-
-                if user_trade.count + 1 > user_trade.hard_limit:
-                    await ctx.respond("You can't make this trade anymore!", reply = True, mentions_reply = True, 
-                        flags = hikari.MessageFlag.EPHEMERAL
-                    )
-                elif selected_trade.item_src == "money":
-                    inv = await psql.Inventory.fetch_one(conn, user_id = ctx.author.id, item_id = selected_trade.item_dest)
-
-                    if user.balance < selected_trade.amount_src:
-                        await ctx.respond("You don't have enough money to make this trade!", reply = True, mentions_reply = True, 
+                # Process trade here.
+                async with bot.pool.acquire() as conn:
+                    user_trade = await psql.UserTrade.fetch_one(conn, user_id = ctx.author.id, trade_id = selected, trade_type = "trade")
+                    if user_trade is None:
+                        user_trade = psql.UserTrade(ctx.author.id, selected_trade.id, selected_trade.type, selected_trade.hard_limit, 0)
+
+                    if user_trade.count + 1 > user_trade.hard_limit:
+                        await ctx.respond("You can't make this trade anymore!", reply = True, mentions_reply = True, 
                             flags = hikari.MessageFlag.EPHEMERAL
                         )
+                    elif selected_trade.item_src == "money":
+                        inv = await psql.Inventory.fetch_one(conn, user_id = ctx.author.id, item_id = selected_trade.item_dest)
+
+                        if user.balance < selected_trade.amount_src:
+                            await ctx.respond("You don't have enough money to make this trade!", reply = True, mentions_reply = True, 
+                                flags = hikari.MessageFlag.EPHEMERAL
+                            )
+                        else:
+                            async with conn.transaction():
+                                await add_reward_to_user(conn, bot, ctx.author.id, {selected_trade.item_dest: selected_trade.amount_dest})
+                                user.balance -= selected_trade.amount_src
+                                await bot.user_cache.update(conn, user)
+                                user_trade.count += 1
+                                await psql.UserTrade.update(conn, user_trade)
+                    elif selected_trade.item_dest == "money":
+                        inv = await psql.Inventory.fetch_one(conn, user_id = ctx.author.id, item_id = selected_trade.item_src)
+
+                        if inv is None or inv.amount < selected_trade.amount_src:
+                            await ctx.respond("You don't have enough items to make this trade!", reply = True, mentions_reply = True,
+                                flags = hikari.MessageFlag.EPHEMERAL
+                            )
+                        else:
+                            async with conn.transaction():
+                                await psql.Inventory.remove(conn, ctx.author.id, selected_trade.item_src, selected_trade.amount_src)
+                                user.balance += selected_trade.amount_dest
+                                await bot.user_cache.update(conn, user)
+                                user_trade.count += 1
+                                await psql.UserTrade.update(conn, user_trade)
                     else:
-                        async with conn.transaction():
-                            await add_reward_to_user(conn, bot, ctx.author.id, {selected_trade.item_dest: selected_trade.amount_dest})
-                            user.balance -= selected_trade.amount_src
-                            await bot.user_cache.update(conn, user)
-                            user_trade.count += 1
-                            await psql.UserTrade.update(conn, user_trade)
-                elif selected_trade.item_dest == "money":
-                    inv = await psql.Inventory.fetch_one(conn, user_id = ctx.author.id, item_id = selected_trade.item_src)
-
-                    if inv is None or inv.amount < selected_trade.amount_src:
-                        await ctx.respond("You don't have enough items to make this trade!", reply = True, mentions_reply = True,
-                            flags = hikari.MessageFlag.EPHEMERAL
-                        )
-                    else:
-                        async with conn.transaction():
-                            await psql.Inventory.remove(conn, ctx.author.id, selected_trade.item_src, selected_trade.amount_src)
-                            user.balance += selected_trade.amount_dest
-                            await bot.user_cache.update(conn, user)
-                            user_trade.count += 1
-                            await psql.UserTrade.update(conn, user_trade)
-                else:
-                    inv = await psql.Inventory.fetch_one(conn, user_id = ctx.author.id, item_id = selected_trade.item_src)
-
-                    if inv is None or inv.amount < selected_trade.amount_src:
-                        await ctx.respond("You don't have enough items to make this trade!", reply = True, mentions_reply = True,
-                            flags = hikari.MessageFlag.EPHEMERAL
-                        )
+                        inv = await psql.Inventory.fetch_one(conn, user_id = ctx.author.id, item_id = selected_trade.item_src)
+
+                        if inv is None or inv.amount < selected_trade.amount_src:
+                            await ctx.respond("You don't have enough items to make this trade!", reply = True, mentions_reply = True,
+                                flags = hikari.MessageFlag.EPHEMERAL
+                            )
+                        else:
+                            async with conn.transaction():
+                                await psql.Inventory.remove(conn, ctx.author.id, selected_trade.item_src, selected_trade.amount_src)
+                                await add_reward_to_user(conn, bot, ctx.author.id, {selected_trade.item_dest: selected_trade.amount_dest})
+                                user_trade.count += 1
+                                await psql.UserTrade.update(conn, user_trade)
+
+                # Update the menu.
+                embed.fields[selected - 1].name = f"Trade {selected} ({user_trade.count}/{selected_trade.hard_limit})"
+                if user_trade.count == selected_trade.hard_limit:
+                    # Remove the select option based on the selected id.
+                    for i, option in enumerate(options):
+                        if int(option.value) == selected_trade.id:
+                            del options[i]
+                            break
+                
+                    view.clear_items()
+                    if options:
+                        view.add_item(miru.Select(
+                            options = options,
+                            placeholder = "Select a trade to perform"
+                        ))
                     else:
-                        async with conn.transaction():
-                            await psql.Inventory.remove(conn, ctx.author.id, selected_trade.item_src, selected_trade.amount_src)
-                            await add_reward_to_user(conn, bot, ctx.author.id, {selected_trade.item_dest: selected_trade.amount_dest})
-                            user_trade.count += 1
-                            await psql.UserTrade.update(conn, user_trade)
-
-            # Update the menu.
-            embed.fields[selected - 1].name = f"Trade {selected} ({user_trade.count}/{selected_trade.hard_limit})"
-            if user_trade.count == selected_trade.hard_limit:
-                # Remove the select option based on the selected id.
-                for i, option in enumerate(options):
-                    if int(option.value) == selected_trade.id:
-                        del options[i]
                         break
-                
-                view.clear_items()
-                if options:
-                    view.add_item(miru.Select(
-                        options = options,
-                        placeholder = "Select a trade to perform"
-                    ))
-                else:
-                    break
             
-            try:
-                await msg.edit(embed = embed, components = view.build())
-            except hikari.NotFoundError:
-                # Message is deleted most likely.
-                return
-        except asyncio.TimeoutError:
-            try:
-                await msg.edit(components = None)
-            except hikari.NotFoundError:
-                # Message is deleted most likely.
-                return
-            break
+                try:
+                    await msg.edit(embed = embed, components = view.build())
+                except hikari.NotFoundError:
+                    # Message is deleted most likely.
+                    return
+            except asyncio.TimeoutError:
+                try:
+                    await msg.edit(components = None)
+                except hikari.NotFoundError:
+                    # Message is deleted most likely.
+                    return
+                break
 
 @plugin.command()
 @lightbulb.set_help(dedent(f'''
@@ -2268,93 +2210,87 @@ async def _barter(ctx: lightbulb.Context):
     msg = await resp.message()
     await view.start(msg)
 
-    def is_select_interaction(event: hikari.InteractionCreateEvent):
-        if not isinstance(event.interaction, hikari.ComponentInteraction):
-            return False
-        
-        return event.interaction.message.id == msg.id and event.interaction.member.id == ctx.author.id
-    
-    while True:
-        try:
-            event = await bot.wait_for(hikari.InteractionCreateEvent, timeout = 120, predicate = is_select_interaction)
-            interaction: hikari.ComponentInteraction = event.interaction
-            selected = int(interaction.values[0])
-            selected_barter: psql.ActiveTrade = None
-            for barter in barters:
-                if barter.id == selected:
-                    selected_barter = barter
-                    break
+    with bot.interaction_router.listen(msg, user_id = ctx.author.id) as menu:
+        while True:
+            try:
+                interaction = await menu.wait(timeout = 120)
+                selected = int(interaction.values[0])
+                selected_barter: psql.ActiveTrade = None
+                for barter in barters:
+                    if barter.id == selected:
+                        selected_barter = barter
+                        break
             
-            # Refetch for latest info.
-            user = bot.user_cache[ctx.author.id]
-            if user.world != "nether":
-                await ctx.respond("You need to be in the Nether to use this command!", reply = True, mentions_reply = True)
-                return
+                # Refetch for latest info.
+                user = bot.user_cache[ctx.author.id]
+                if user.world != "nether":
+                    await ctx.respond("You need to be in the Nether to use this command!", reply = True, mentions_reply = True)
+                    return
             
-            if selected_barter is None:
-                print(barters)
-                print(selected)
-                await ctx.respond("Something is wrong, report this to the dev.", reply = True, mentions_reply = True)
-                return
-
-            if selected_barter.next_reset < dt.datetime.now().astimezone():
-                # Maybe edit into an updated barter?
-                await msg.edit("This barter menu is expired. Invoke this command again for a list of updated barters.", embed = None, components = None)
-                break
+                if selected_barter is None:
+                    print(barters)
+                    print(selected)
+                    await ctx.respond("Something is wrong, report this to the dev.", reply = True, mentions_reply = True)
+                    return
+
+                if selected_barter.next_reset < dt.datetime.now().astimezone():
+                    # Maybe edit into an updated barter?
+                    await msg.edit("This barter menu is expired. Invoke this command again for a list of updated barters.", embed = None, components = None)
+                    break
             
-            # Process trade here.
-            async with bot.pool.acquire() as conn:
-                user_trade = await psql.UserTrade.fetch_one(conn, user_id = ctx.author.id, trade_id = selected, trade_type = "barter")
-                if user_trade is None:
-                    user_trade = psql.UserTrade(ctx.author.id, selected_barter.id, selected_barter.type, selected_barter.hard_limit, 0)
-
-                if user_trade.count + 1 > user_trade.hard_limit:
-                    await ctx.respond("You can't make this barter anymore!", reply = True, mentions_reply = True, 
-                        flags = hikari.MessageFlag.EPHEMERAL
-                    )
-                else:
-                    inv = await psql.Inventory.fetch_one(conn, user_id = ctx.author.id, item_id = selected_barter.item_src)
-
-                    if inv is None or inv.amount < selected_barter.amount_src:
-                        await ctx.respond("You don't have enough items to make this barter!", reply = True, mentions_reply = True,
+                # Process trade here.
+                async with bot.pool.acquire() as conn:
+                    user_trade = await psql.UserTrade.fetch_one(conn, user_id = ctx.author.id, trade_id = selected, trade_type = "barter")
+                    if user_trade is None:
+                        user_trade = psql.UserTrade(ctx.author.id, selected_barter.id, selected_barter.type, selected_barter.hard_limit, 0)
+
+                    if user_trade.count + 1 > user_trade.hard_limit:
+                        await ctx.respond("You can't make this barter anymore!", reply = True, mentions_reply = True, 
                             flags = hikari.MessageFlag.EPHEMERAL
                         )
                     else:
-                        async with conn.transaction():
-                            await psql.Inventory.remove(conn, ctx.author.id, selected_barter.item_src, selected_barter.amount_src)
-                            await add_reward_to_user(conn, bot, ctx.author.id, {selected_barter.item_dest: selected_barter.amount_dest})
-                            user_trade.count += 1
-                            await psql.UserTrade.update(conn, user_trade)
-
-            # Update the menu.
-            embed.fields[selected - 1].name = f"Barter {selected} ({user_trade.count}/{selected_barter.hard_limit})"
-            if user_trade.count == selected_barter.hard_limit:
-                # Remove the select option based on the selected id.
-                for i, option in enumerate(options):
-                    if int(option.value) == selected_barter.id:
-                        del options[i]
-                        break
+                        inv = await psql.Inventory.fetch_one(conn, user_id = ctx.author.id, item_id = selected_barter.item_src)
+
+                        if inv is None or inv.amount < selected_barter.amount_src:
+                            await ctx.respond("You don't have enough items to make this barter!", reply = True, mentions_reply = True,
+                                flags = hikari.MessageFlag.EPHEMERAL
+                            )
+                        else:
+                            async with conn.transaction():
+                                await psql.Inventory.remove(conn, ctx.author.id, selected_barter.item_src, selected_barter.amount_src)
+                                await add_reward_to_user(conn, bot, ctx.author.id, {selected_barter.item_dest: selected_barter.amount_dest})
+                                user_trade.count += 1
+                                await psql.UserTrade.update(conn, user_trade)
+
+                # Update the menu.
+                embed.fields[selected - 1].name = f"Barter {selected} ({user_trade.count}/{selected_barter.hard_limit})"
+                if user_trade.count == selected_barter.hard_limit:
+                    # Remove the select option based on the selected id.
+                    for i, option in enumerate(options):
+                        if int(option.value) == selected_barter.id:
+                            del options[i]
+                            break
                 
-                view.clear_items()
-                if options:
-                    view.add_item(miru.Select(
-                        options = options,
-                        placeholder = "Select a barter to perform"
-                    ))
-                else:
-                    break
-            try:
-                await msg.edit(embed = embed, components = view.build())
-            except hikari.NotFoundError:
-                # Message is deleted most likely.
-                return
-        except asyncio.TimeoutError:
-            try:
-                await msg.edit(components = None)
-            except hikari.NotFoundError:
-                # Message is deleted most likely.
-                return
-            break
+                    view.clear_items()
+                    if options:
+                        view.add_item(miru.Select(
+                            options = options,
+                            placeholder = "Select a barter to perform"
+                        ))
+                    else:
+                        break
+                try:
+                    await msg.edit(embed = embed, components = view.build())
+                except hikari.NotFoundError:
+                    # Message is deleted most likely.
+                    return
+            except asyncio.TimeoutError:
+                try:
+                    await msg.edit(components = None)
+                except hikari.NotFoundError:
+                    # Message is deleted most likely.
+                    return
+                break
 
 @plugin.command()
 @lightbulb.set_help(dedent('''
@@ -18,6 +18,40 @@ plugin.add_checks(
     lightbulb.bot_has_guild_permissions(*helpers.COMMAND_STANDARD_PERMISSIONS)
 )
 
+DADJOKE_URL = "https://icanhazdadjoke.com/"
+# Used when icanhazdadjoke can't be reached and the buffer runs dry.
+OFFLINE_DADJOKES = (
+    "I'm reading a book about anti-gravity. It's impossible to put down.",
+    "Why don't skeletons fight each other? They don't have the guts.",
+    "I used to hate facial hair, but then it grew on me.",
+    "What do you call a fake noodle? An impasta.",
+    "I only know 25 letters of the alphabet. I don't know y.",
+    "Why couldn't the bicycle stand up by itself? It was two tired.",
+    "I would tell you a joke about construction, but I'm still working on it.",
+    "What do you call a fish wearing a bowtie? Sofishticated.",
+)
+
+async def fetch_dadjoke() -> str:
+    bot: models.MichaelBot = plugin.bot
+    if bot.aio_session is None:
+        raise errors.NoHTTPClient
+
+    header = {
+        "Accept": "application/json",
+        "User-Agent": "MichaelBot (Discord Bot) - https://github.com/MikeJollie2707/"
+    }
+    async with bot.aio_session.get(DADJOKE_URL, headers = header) as resp:
+        if resp.status == 200:
+            resp_json = await resp.json()
+            return resp_json["joke"]
+        raise errors.CustomAPIFailed(f"Endpoint {DADJOKE_URL} returned with status {resp.status}. Raw response: {await resp.text()}")
+
+plugin.d.dadjokes = models.PrefetchBuffer(fetch_dadjoke, capacity = 20, low_water = 5)
+
+@plugin.listener(hikari.StartedEvent)
+async def prefetch_dadjokes(_: hikari.StartedEvent):
+    plugin.d.dadjokes.refill()
+
 @plugin.command()
 @lightbulb.add_cooldown(length = 10.0, uses = 1, bucket = lightbulb.UserBucket)
 @lightbulb.option("type", "Which copypasta to show. Dig into the bot's code to see available options ;)", modifier = helpers.CONSUME_REST_OPTION)
@@ -75,25 +109,15 @@ async def copypasta(ctx: lightbulb.Context):
 @lightbulb.set_help(dedent('''
     r/FoundTheInaAlt
 '''))
-@lightbulb.add_checks(checks.is_aiohttp_existed)
 @lightbulb.add_cooldown(length = 3.0, uses = 1, bucket = lightbulb.UserBucket)
 @lightbulb.command("dadjoke", f"[{plugin.name}] Give you a dad joke.", aliases = ["ina-of-the-mountain-what-is-your-wisdom"])
 @lightbulb.implements(lightbulb.PrefixCommand, lightbulb.SlashCommand)
 async def dadjoke(ctx: lightbulb.Context):
-    bot: models.MichaelBot = ctx.bot
-
-    BASE_URL = "https://icanhazdadjoke.com/"
-    header = {
-        "Accept": "application/json",
-        "User-Agent": "MichaelBot (Discord Bot) - https://github.com/MikeJollie2707/"
-    }
-
-    async with bot.aio_session.get(BASE_URL, headers = header) as resp:
-        if resp.status == 200:
-            resp_json = await resp.json()
-            await ctx.respond(resp_json["joke"], reply = True)
-        else:
-            raise errors.CustomAPIFailed(f"Endpoint {BASE_URL} returned with status {resp.status}. Raw response: {await resp.text()}")
+    # Jokes are prefetched in the background, so this never waits on the API.
+    joke: str | None = plugin.d.dadjokes.take()
+    if joke is None:
+        joke = random.choice(OFFLINE_DADJOKES)
+    await ctx.respond(joke, reply = True)
 
 @plugin.command()
 @lightbulb.command("dice", f"[{plugin.name}] Roll a 6-face dice for you.")
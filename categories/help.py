@@ -1,5 +1,7 @@
 '''Define the behavior of the 'help' command for the bot. Includes help-specific utilities.'''
 
+import bisect
+import copy
 import datetime as dt
 import typing as t
 from textwrap import dedent
@@ -54,82 +56,80 @@ def filter_command_type(commands: t.Sequence[lightbulb.Command], types: t.Sequen
                 l.append(command)
     return l
 
-def plugin_help_format(ctx: lightbulb.Context, plugin: lightbulb.Plugin) -> list[hikari.Embed]:
-    '''Return a list of formatted embed for a plugin help.
-    This list can be passed into a paginator to display.
+def plugin_help_format(bot: models.MichaelBot, plugin: lightbulb.Plugin, types: t.Sequence[type]) -> list[hikari.Embed]:
+    '''Return the embeds for a plugin help.
+
+    The embeds don't have the requester and timestamp. Use `personalize()` before sending them.
 
     Parameters
     ----------
-    ctx : lightbulb.Context
-        The context.
+    bot : models.MichaelBot
+        The bot instance.
     plugin : lightbulb.Plugin
         The plugin to display the help.
+    types : t.Sequence[type]
+        The command types to display. Should be either `__PREFIX_COMMAND_TYPES__` or `__SLASH_COMMAND_TYPES__`.
 
     Returns
     -------
-    t.List[hikari.Embed]
-        A list of formatted embed for a plugin help.
+    list[hikari.Embed]
+        A list of embeds for a plugin help.
     '''
     
     MAX_COMMANDS = 10
-    display = ""
-    plugins = []
 
-    types = __PREFIX_COMMAND_TYPES__
-    if isinstance(ctx, lightbulb.SlashContext):
-        types = __SLASH_COMMAND_TYPES__
-    
     commands: list[lightbulb.Command] = filter_command_type(plugin.all_commands, types, True)
     commands.sort(key = lambda command: command.name)
-    for index, command in enumerate(commands):
-        # Signature includes command name.
-        command_title = command.signature.replace('=', ' = ')
-        
-        display += f"**{command_title}:**\n"
-        # Strip the first word of the description, which is the category's name.
-        description = ' '.join(command.description.split()[1:])
-        if not description:
-            description = "*No help provided*"    
-        display += f"- {description}\n\n"
-
-        if index == MAX_COMMANDS - 1 or index == len(commands) - 1:
-            title = f"{plugin.name} ({len(commands)} commands):"
-
-            embed = helpers.get_default_embed(
-                title = title,
-                description = display,
-                timestamp = dt.datetime.now().astimezone(),
-                author = ctx.author
-            ).set_thumbnail(
-                ctx.bot.get_me().avatar_url
-            )
-            plugins.append(embed)
-            display = ""
+
+    embeds = []
+    for page_start in range(0, len(commands), MAX_COMMANDS):
+        display = ""
+        for command in commands[page_start:page_start + MAX_COMMANDS]:
+            # Signature includes command name.
+            command_title = command.signature.replace('=', ' = ')
+            
+            display += f"**{command_title}:**\n"
+            # Strip the first word of the description, which is the category's name.
+            description = ' '.join(command.description.split()[1:])
+            if not description:
+                description = "*No help provided*"    
+            display += f"- {description}\n\n"
+
+        title = f"{plugin.name} ({len(commands)} commands):"
+
+        embeds.append(helpers.get_default_embed(
+            title = title,
+            description = display,
+        ).set_thumbnail(
+            bot.get_me().avatar_url
+        ))
     
-    return plugins
+    return embeds
 
-def command_help_format(ctx: lightbulb.Context, command: lightbulb.Command) -> hikari.Embed:
-    '''Return a formatted embed for a command help.
+def command_help_format(bot: models.MichaelBot, command: lightbulb.Command) -> hikari.Embed:
+    '''Return an embed for a command help.
+
+    The embed doesn't have the requester and timestamp. Use `personalize()` before sending it.
 
     Notes
     -----
     For command group, the embed will also include all subcommands.
 
+    The command's help text is obtained without a context, so it must be set with `lightbulb.set_help()` using a string.
+
     Parameters
     ----------
-    ctx : lightbulb.Context
-        The context.
+    bot : models.MichaelBot
+        The bot instance.
     command : lightbulb.Command
         The command to display the help. Can also be a command group/subcommand/...
 
     Returns
     -------
     hikari.Embed
-        The formatted embed for a command help.
+        The embed for a command help.
     '''
 
-    bot: models.MichaelBot = ctx.bot
-
     # Signature includes full command name.
     embed_title = command.signature.replace('=', ' = ')
     embed_description = "*No help provided*"
@@ -140,8 +140,6 @@ def command_help_format(ctx: lightbulb.Context, command: lightbulb.Command) -> h
     embed = helpers.get_default_embed(
         title = embed_title,
         description = embed_description,
-        timestamp = dt.datetime.now().astimezone(),
-        author = ctx.author
     )
 
     command_type = []
@@ -178,10 +176,11 @@ def command_help_format(ctx: lightbulb.Context, command: lightbulb.Command) -> h
             value = "- " + ', '.join(f"`{alias}`" for alias in command.aliases)
         )
     
-    if bool(command.get_help(ctx)):
+    command_help = command.get_help(None)
+    if bool(command_help):
         embed.add_field(
             name = "Note",
-            value = dedent(command.get_help(ctx))
+            value = dedent(command_help)
         )
 
     if isinstance(command, __COMMAND_GROUPS_TYPES__):
@@ -205,10 +204,184 @@ def command_help_format(ctx: lightbulb.Context, command: lightbulb.Command) -> h
     
     return embed
 
+def personalize(embed: hikari.Embed, ctx: lightbulb.Context) -> hikari.Embed:
+    '''Return a copy of a pre-rendered help embed with the requester and the current time.
+
+    Parameters
+    ----------
+    embed : hikari.Embed
+        The embed from `HelpIndex`. This is not modified.
+    ctx : lightbulb.Context
+        The context.
+
+    Returns
+    -------
+    hikari.Embed
+        The embed to send.
+    '''
+
+    # Shallow copy is enough since only the footer and timestamp are replaced.
+    embed = copy.copy(embed)
+    embed.timestamp = dt.datetime.now().astimezone()
+    return embed.set_footer(
+        text = f"Requested by {ctx.author.username}",
+        icon = ctx.author.avatar_url,
+    )
+
+class HelpIndex:
+    '''The help of every plugin and command, rendered once from the loaded commands.
+
+    The index is compiled on first use (the bot's avatar is needed, so it can't be done before the bot starts)
+    and must be invalidated whenever the commands change, which `MichaelBot` does when extensions are (re)loaded.
+    '''
+
+    def __init__(self, bot: models.MichaelBot) -> None:
+        self.bot = bot
+        self.__compiled = False
+
+        # The keys are "prefix" or "slash".
+        # [(plugin name, command count)]
+        self.__plugin_summaries: dict[str, list[tuple[str, int]]] = {}
+        # {plugin name: [embeds]}
+        self.__plugin_pages: dict[str, dict[str, list[hikari.Embed]]] = {}
+        # [command sorted by name]
+        self.__plugin_commands: dict[str, dict[str, list[lightbulb.Command]]] = {}
+
+        # {id(command): embed}
+        self.__command_embeds: dict[int, hikari.Embed] = {}
+
+        # For autocomplete.
+        self.__plugin_names: list[str] = []
+        self.__names: list[str] = []
+        # [(lowered name, name)] sorted by lowered name.
+        self.__sorted_names: list[tuple[str, str]] = []
+    
+    def invalidate(self) -> None:
+        '''Drop everything. The index will be compiled again on the next use.'''
+
+        self.__compiled = False
+        self.__plugin_summaries.clear()
+        self.__plugin_pages.clear()
+        self.__plugin_commands.clear()
+        self.__command_embeds.clear()
+        self.__plugin_names.clear()
+        self.__names.clear()
+        self.__sorted_names.clear()
+
+    def __compile(self) -> None:
+        if self.__compiled:
+            return
+        
+        bot = self.bot
+        for kind, types in (("prefix", __PREFIX_COMMAND_TYPES__), ("slash", __SLASH_COMMAND_TYPES__)):
+            summaries = self.__plugin_summaries[kind] = []
+            pages = self.__plugin_pages[kind] = {}
+            plugin_commands = self.__plugin_commands[kind] = {}
+            for plugin in bot.plugins.values():
+                public_commands = sorted(filter_command_type(plugin.all_commands, types, True), key = lambda cmd: cmd.name)
+                if len(public_commands) > 0:
+                    summaries.append((plugin.name, len(public_commands)))
+                
+                pages[plugin.name] = plugin_help_format(bot, plugin, types)
+                plugin_commands[plugin.name] = public_commands
+        
+        for plugin in bot.plugins.values():
+            for command in plugin.all_commands:
+                self.__command_embeds[id(command)] = command_help_format(bot, command)
+        
+        # Use dictionary to ensure unique values.
+        names: dict[str, None] = {}
+        for plg_name in bot.plugins:
+            if not plg_name.startswith('.'):
+                names[plg_name] = None
+        self.__plugin_names.extend(names)
+        for command_mapping in (bot.prefix_commands, bot.slash_commands, bot.message_commands, bot.user_commands):
+            for cmd_name, cmd in command_mapping.items():
+                if not cmd.hidden:
+                    names[cmd_name] = None
+        self.__names.extend(names)
+        self.__sorted_names.extend(sorted((name.lower(), name) for name in names))
+
+        self.__compiled = True
+    
+    def get_plugin_summaries(self, kind: str) -> list[tuple[str, int]]:
+        '''Return `(plugin name, public command count)` of plugins with at least one public command of this kind ("prefix" or "slash").'''
+
+        self.__compile()
+        return self.__plugin_summaries[kind]
+    def get_plugin_pages(self, kind: str, plugin_name: str) -> list[hikari.Embed]:
+        '''Return the pre-rendered plugin help. The embeds are shared, so pass them through `personalize()`.'''
+
+        self.__compile()
+        return self.__plugin_pages[kind][plugin_name]
+    def get_plugin_commands(self, kind: str, plugin_name: str) -> list[lightbulb.Command]:
+        '''Return the public commands of this kind in a plugin, sorted by name.'''
+
+        self.__compile()
+        return self.__plugin_commands[kind][plugin_name]
+    def get_command_embed(self, command: lightbulb.Command) -> hikari.Embed:
+        '''Return the pre-rendered command help. The embed is shared, so pass it through `personalize()`.'''
+
+        self.__compile()
+        embed = self.__command_embeds.get(id(command))
+        if embed is None:
+            # Commands added outside of an extension.
+            embed = self.__command_embeds[id(command)] = command_help_format(self.bot, command)
+        return embed
+    def complete(self, value: str, limit: int = 25) -> list[str]:
+        '''Return the plugin and command names for the help autocomplete.
+
+        Names starting with `value` come first, followed by names containing it. An empty value returns the plugin names.
+
+        Parameters
+        ----------
+        value : str
+            The user's input. Case-insensitive.
+        limit : int, optional
+            The max amount of names to return. Default to 25, which is Discord's limit.
+
+        Returns
+        -------
+        list[str]
+            The matching names.
+        '''
+
+        self.__compile()
+        if value == '':
+            return self.__plugin_names[:limit]
+        
+        value = value.lower()
+        matches: dict[str, None] = {}
+        index = bisect.bisect_left(self.__sorted_names, (value, ""))
+        while index < len(self.__sorted_names) and len(matches) < limit:
+            lowered, name = self.__sorted_names[index]
+            if not lowered.startswith(value):
+                break
+            matches[name] = None
+            index += 1
+        
+        if len(matches) < limit:
+            for lowered, name in self.__sorted_names:
+                if value in lowered:
+                    matches[name] = None
+                    if len(matches) >= limit:
+                        break
+        return list(matches)
+
 class MenuLikeHelp(lightbulb.DefaultHelpCommand):
     '''
     A custom help command that's tailored for `MichaelBot`.
+
+    The help is served from a `HelpIndex`, so nothing is rendered per invocation.
     '''
+
+    def __init__(self, bot: models.MichaelBot) -> None:
+        super().__init__(bot)
+        self.index = HelpIndex(bot)
+    
+    def invalidate(self) -> None:
+        '''Called by `MichaelBot` whenever extensions are (re)loaded.'''
+        self.index.invalidate()
     
     async def send_help(self, ctx: lightbulb.Context, obj: str | None) -> None:
         '''
@@ -251,47 +424,37 @@ class MenuLikeHelp(lightbulb.DefaultHelpCommand):
         if isinstance(ctx, lightbulb.PrefixContext):
             await ctx.event.message.delete()
 
+        kind = "slash" if isinstance(ctx, lightbulb.SlashContext) else "prefix"
+        plugins = ctx.bot.plugins
+
         main_page = helpers.get_default_embed(
             title = "Help",
             description = "",
             timestamp = dt.datetime.now().astimezone(),
             author = ctx.author
         )
-
-        plugins = ctx.bot.plugins
-        # {plugin_name: command_count}
-        plugin_info: dict[str, int] = {}
-        for plugin in plugins.values():
-            public_commands = []
-            if isinstance(ctx, lightbulb.PrefixContext):
-                public_commands = filter_command_type(plugin.all_commands, __PREFIX_COMMAND_TYPES__, True)
-            else:
-                public_commands = filter_command_type(plugin.all_commands, __SLASH_COMMAND_TYPES__, True)
-            public_commands_len = len(public_commands)
-
-            if public_commands_len > 0:
-                embed_name = f"{plugin.d.emote} {plugin.name} ({public_commands_len} commands)"
-                
-                embed_description = "*No description provided*"
-                if bool(plugin.description):
-                    embed_description = plugin.description
-                
-                main_page.add_field(
-                    name = embed_name,
-                    value = embed_description,
-                    inline = False
-                )
-                
-                plugin_info[plugin.name] = public_commands_len
+        for name, public_commands_len in self.index.get_plugin_summaries(kind):
+            embed_name = f"{plugins[name].d.emote} {name} ({public_commands_len} commands)"
+            
+            embed_description = "*No description provided*"
+            if bool(plugins[name].description):
+                embed_description = plugins[name].description
+            
+            main_page.add_field(
+                name = embed_name,
+                value = embed_description,
+                inline = False
+            )
         
         menu_root = nav.MenuComponent(main_page)
-        for name in plugin_info:
+        for name, _ in self.index.get_plugin_summaries(kind):
+            pages = self.index.get_plugin_pages(kind, name)
             menu_root.add_list_options(
                 nav.MenuButton(
                     label = name,
                     emoji = plugins[name].d.emote,
                 ),
-                plugin_help_format(ctx, plugins[name])
+                nav.PageSource(len(pages), lambda index, pages = pages: personalize(pages[index], ctx))
             )
         
         await nav.ComplexView(menu_root, authors = (ctx.author.id,)).run(ctx)
@@ -301,18 +464,11 @@ class MenuLikeHelp(lightbulb.DefaultHelpCommand):
         Send a plugin help that contains all commands.
         '''
         
-        embeds = []
-        types = __PREFIX_COMMAND_TYPES__
-        if isinstance(ctx, lightbulb.SlashContext):
-            types = __SLASH_COMMAND_TYPES__
-        
-        public_commands = filter_command_type(plugin.all_commands, types, True)
-        for command in sorted(public_commands, key = lambda cmd: cmd.name):
-            page = command_help_format(ctx, command)
-            if page is not None:
-                embeds.append(page)
+        kind = "slash" if isinstance(ctx, lightbulb.SlashContext) else "prefix"
+        public_commands = self.index.get_plugin_commands(kind, plugin.name)
+        pages = nav.PageSource(len(public_commands), lambda index: personalize(self.index.get_command_embed(public_commands[index]), ctx))
         
-        page_nav = nav.ButtonNavigator(pages = embeds, authors = (ctx.author.id,))
+        page_nav = nav.ButtonNavigator(pages = pages, authors = (ctx.author.id,))
         await nav.run_view(page_nav, ctx)
         
     
@@ -320,14 +476,14 @@ class MenuLikeHelp(lightbulb.DefaultHelpCommand):
         '''
         Send a command help.
         '''
-        await ctx.respond(embed = command_help_format(ctx, command))
+        await ctx.respond(embed = personalize(self.index.get_command_embed(command), ctx))
     async def send_group_help(self, ctx: lightbulb.Context, group: lightbulb.commands.PrefixCommandGroup | lightbulb.commands.PrefixSubGroup) -> None:
         '''
         Send a group help.
 
         Internally, this does the same as `send_command_help()`.
         '''
-        await ctx.respond(embed = command_help_format(ctx, group))
+        await ctx.respond(embed = personalize(self.index.get_command_embed(group), ctx))
 
 def load(bot: models.MichaelBot):
     bot.d.old_help_command = bot.help_command
@@ -1,4 +1,7 @@
+import asyncio
+import contextlib
 import datetime as dt
+import time
 import typing as t
 from textwrap import dedent
 
@@ -15,15 +18,23 @@ plugin.add_checks(
     lightbulb.bot_has_guild_permissions(*helpers.COMMAND_STANDARD_PERMISSIONS),
 )
 
+# Purges without an amount run in the background, one per channel.
+plugin.d.purge_jobs = {}
+# Minimum seconds between two progress edits of a background purge.
+PURGE_PROGRESS_INTERVAL = 5
+
 def get_purge_iterator(
     bot: models.MichaelBot, 
     channel_id: int, 
     *, 
     amount: int = 0, 
-    predicate: t.Callable[[hikari.Message], bool] = lambda m: True
+    predicate: t.Callable[[hikari.Message], bool] = lambda m: True,
+    before: hikari.UndefinedOr[hikari.SearchableSnowflakeishOr[hikari.Unique]] = hikari.UNDEFINED
 ) -> hikari.LazyIterator[hikari.Message]:
     '''Get an iterator of messages based on the criteria specified.
 
+    The messages are fetched page by page and `predicate` is evaluated as each message arrives.
+
     Parameters
     ----------
     bot : models.MichaelBot
@@ -34,6 +45,8 @@ def get_purge_iterator(
         The maximum amount of messages to delete. If 0, then there's no max.
     predicate : t.Callable[[hikari.Message], bool], optional
         A callback that filter out the message to delete. By default, no filter is applied.
+    before : hikari.UndefinedOr[hikari.SearchableSnowflakeishOr[hikari.Unique]], optional
+        Only messages before this are considered. By default, start from the latest message.
 
     Returns
     -------
@@ -41,25 +54,55 @@ def get_purge_iterator(
         The iterator containing messages to delete.
     '''
     bulk_delete_limit = dt.datetime.now().astimezone() - dt.timedelta(weeks = 2)
+    iterator = (
+        bot.rest.fetch_messages(channel_id, before = before)
+        .take_while(lambda message: message.created_at > bulk_delete_limit)
+        .filter(predicate)
+    )
     if amount > 0:
-        return (
-            bot.rest.fetch_messages(channel_id)
-            .take_while(lambda message: message.created_at > bulk_delete_limit)
-            .filter(predicate)
-            .limit(amount)
-        )
-    else:
-        return (
-            bot.rest.fetch_messages(channel_id)
-            .take_while(lambda message: message.created_at > bulk_delete_limit)
-            .filter(predicate))
+        return iterator.limit(amount)
+    return iterator
+async def bulk_delete(bot: models.MichaelBot, channel_id: int, messages: t.Sequence[hikari.Message]) -> int:
+    '''This is a coroutine. Bulk delete up to 100 messages.
+
+    `hikari` already waits on the bulk delete bucket before sending the request. If the bucket's reset is further than what
+    `hikari` is willing to wait, this sleeps for the `retry_after` reported by Discord and tries again instead of failing.
+
+    Parameters
+    ----------
+    bot : models.MichaelBot
+        The bot instance.
+    channel_id : int
+        The channel to delete.
+    messages : t.Sequence[hikari.Message]
+        The messages to delete.
+
+    Returns
+    -------
+    int
+        The number of messages successfully deleted.
+    '''
+    while True:
+        try:
+            with models.rest_timer():
+                await bot.rest.delete_messages(channel_id, messages)
+            return len(messages)
+        except hikari.BulkDeleteError as bulk_delete_error:
+            return len(bulk_delete_error.messages_deleted)
+        except hikari.RateLimitTooLongError as rate_limit:
+            await asyncio.sleep(rate_limit.retry_after)
 async def do_purge(
     bot: models.MichaelBot,
     iterator: hikari.LazyIterator[hikari.Message],
-    channel_id: int
+    channel_id: int,
+    *,
+    on_progress: t.Callable[[int], t.Awaitable[None]] | None = None
 ) -> int:
     '''This is a coroutine. Purge messages using the iterator provided.
 
+    Fetching and deleting are pipelined: the next page is fetched while the current batch is being deleted.
+    Both go through different rate limit buckets, so they don't slow each other down.
+
     Parameters
     ----------
     bot : models.MichaelBot
@@ -68,6 +111,8 @@ async def do_purge(
         An iterator of `hikari.Message`. Should be obtained via `get_purge_iterator()`.
     channel_id : int
         The channel to delete. This must match what is passed through `get_purge_iterator()`.
+    on_progress : t.Callable[[int], t.Awaitable[None]] | None, optional
+        A coroutine called with the total number of messages deleted so far after each batch.
 
     Returns
     -------
@@ -75,22 +120,131 @@ async def do_purge(
         The number of messages successfully deleted.
     '''
 
-    count: int = 0
-    async for messages in iterator.chunk(100):
+    # Only keep a couple batches ahead so a huge purge doesn't hold the whole channel in memory.
+    batches: asyncio.Queue[list[hikari.Message] | None] = asyncio.Queue(maxsize = 2)
+    async def fetch_batches():
         try:
-            await bot.rest.delete_messages(channel_id, messages)
-            count += len(messages)
-        except hikari.BulkDeleteError as bulk_delete_error:
-            count += len(bulk_delete_error.messages_deleted)
-        
-        # Hard limit to purging. Will need to see how big this can go.
-        if count >= 1000:
-            break
+            async for messages in iterator.chunk(100):
+                await batches.put(messages)
+            await batches.put(None)
+        except BaseException:
+            # The consumer might have stopped already, so never wait for room here.
+            # The purge is failing anyway, so drop whatever is queued to make room for the sentinel.
+            while not batches.empty():
+                batches.get_nowait()
+            batches.put_nowait(None)
+            raise
+    
+    fetcher = asyncio.create_task(fetch_batches())
+    count: int = 0
+    try:
+        while (messages := await batches.get()) is not None:
+            count += await bulk_delete(bot, channel_id, messages)
+            if on_progress is not None:
+                await on_progress(count)
+        # Surface any error from fetching.
+        await fetcher
+    finally:
+        # Wait for the fetcher to wind down so it doesn't outlive the purge.
+        # Its error, if any, is either surfaced above or superseded by the one being raised.
+        fetcher.cancel()
+        with contextlib.suppress(Exception, asyncio.CancelledError):
+            await fetcher
     return count
+async def run_purge_job(
+    bot: models.MichaelBot,
+    status: hikari.Message,
+    iterator: hikari.LazyIterator[hikari.Message],
+    summary: t.Callable[[int], str]
+) -> None:
+    '''This is a coroutine. Purge messages in the background, reporting progress on a status message.
+
+    This should be run as a task stored in `plugin.d.purge_jobs`. Cancelling the task stops the purge.
+
+    Parameters
+    ----------
+    bot : models.MichaelBot
+        The bot instance.
+    status : hikari.Message
+        The message to report progress on. The iterator must only contain messages before this one.
+    iterator : hikari.LazyIterator[hikari.Message]
+        An iterator of `hikari.Message`. Should be obtained via `get_purge_iterator()`.
+    summary : t.Callable[[int], str]
+        A callback that returns the final report given the number of messages deleted.
+    '''
+    deleted = 0
+    last_report = time.perf_counter()
+    async def report(count: int):
+        nonlocal deleted, last_report
+        deleted = count
+        if time.perf_counter() - last_report >= PURGE_PROGRESS_INTERVAL:
+            last_report = time.perf_counter()
+            await status.edit(f"Purging messages... {count} messages deleted so far. Use `purge cancel` to stop.")
+    
+    try:
+        await do_purge(bot, iterator, status.channel_id, on_progress = report)
+        content = summary(deleted)
+    except asyncio.CancelledError:
+        content = f"Purge cancelled. {deleted} messages were deleted."
+    except hikari.NotFoundError:
+        # The channel or the status message is gone, nothing left to do.
+        return
+    except hikari.HTTPError as error:
+        # Most likely the bot lost its permissions midway.
+        content = f"Purge stopped because of an error ({error.__class__.__name__}). {deleted} messages were deleted."
+    finally:
+        plugin.d.purge_jobs.pop(status.channel_id, None)
+    
+    try:
+        await status.edit(content)
+        await asyncio.sleep(5)
+        await status.delete()
+    except (hikari.NotFoundError, hikari.ForbiddenError):
+        pass
+async def start_purge(
+    ctx: lightbulb.Context,
+    summary: t.Callable[[int], str],
+    *,
+    amount: int = 0,
+    predicate: t.Callable[[hikari.Message], bool] = lambda m: True
+) -> None:
+    '''This is a coroutine. Purge messages and report the result to the invoker.
+
+    Purges with an amount are done right away. Purges without one can be very large, so they run as a background job
+    with progress updates that can be stopped with `purge cancel`.
+
+    Parameters
+    ----------
+    ctx : lightbulb.Context
+        The command context.
+    summary : t.Callable[[int], str]
+        A callback that returns the final report given the number of messages deleted.
+    amount : int, optional
+        The maximum amount of messages to delete. If 0, then there's no max.
+    predicate : t.Callable[[hikari.Message], bool], optional
+        A callback that filter out the message to delete. By default, no filter is applied.
+    '''
+    bot: models.MichaelBot = ctx.bot
+
+    if amount > 0:
+        iterator = get_purge_iterator(bot, ctx.channel_id, predicate = predicate, amount = amount)
+        count = await do_purge(bot, iterator, ctx.channel_id)
+        await ctx.respond(summary(count), delete_after = 5)
+        return
+    
+    if ctx.channel_id in plugin.d.purge_jobs:
+        await ctx.respond("A purge is already running in this channel. Use `purge cancel` to stop it.", reply = True, mentions_reply = True)
+        return
+    
+    resp = await ctx.respond("Purging messages... Use `purge cancel` to stop.")
+    status = await resp.message()
+    iterator = get_purge_iterator(bot, ctx.channel_id, predicate = predicate, before = status)
+    plugin.d.purge_jobs[ctx.channel_id] = bot.create_task(run_purge_job(bot, status, iterator, summary))
 
 @plugin.command()
 @lightbulb.set_help(dedent('''
     - The bot can delete messages up to 2 weeks. It can't delete any messages past that point.
+    - Without an amount, the purge runs in the background. Use `purge cancel` to stop it.
 '''))
 @lightbulb.add_checks(
     lightbulb.bot_has_guild_permissions(hikari.Permissions.MANAGE_MESSAGES),
@@ -106,6 +260,7 @@ async def purge(ctx: lightbulb.Context):
 @purge.child
 @lightbulb.set_help(dedent('''
     - The bot can delete messages up to 2 weeks. It can't delete any messages past that point.
+    - Without an amount, the purge runs in the background. Use `purge cancel` to stop it.
 '''))
 @lightbulb.add_checks(
     lightbulb.bot_has_guild_permissions(hikari.Permissions.MANAGE_MESSAGES),
@@ -117,7 +272,6 @@ async def purge(ctx: lightbulb.Context):
 @lightbulb.implements(lightbulb.PrefixSubCommand, lightbulb.SlashSubCommand)
 async def purge_messages(ctx: lightbulb.Context):
     amount = ctx.options.amount
-    bot: models.MichaelBot = ctx.bot
 
     if amount != 0:
         amount = max(1, min(amount, 500))
@@ -125,14 +279,12 @@ async def purge_messages(ctx: lightbulb.Context):
             # Delete the command just sent.
             amount += 1
 
-    iterator = get_purge_iterator(bot, ctx.channel_id, amount = amount)
-    count = await do_purge(bot, iterator, ctx.channel_id)
-    
-    await ctx.respond(f"Successfully deleted {count} messages.", delete_after = 5)
+    await start_purge(ctx, lambda count: f"Successfully deleted {count} messages.", amount = amount)
 
 @purge.child
 @lightbulb.set_help(dedent('''
     - The bot can delete messages up to 2 weeks. It can't delete any messages past that point.
+    - Without an amount, the purge runs in the background. Use `purge cancel` to stop it.
 '''))
 @lightbulb.add_checks(
     lightbulb.bot_has_guild_permissions(hikari.Permissions.MANAGE_MESSAGES),
@@ -146,7 +298,6 @@ async def purge_messages(ctx: lightbulb.Context):
 async def purge_member(ctx: lightbulb.Context):
     member: hikari.Member = ctx.options.member
     amount: int = ctx.options.amount
-    bot: models.MichaelBot = ctx.bot
 
     if amount != 0:
         amount = max(1, min(amount, 500))
@@ -156,14 +307,12 @@ async def purge_member(ctx: lightbulb.Context):
     def predicate(m: hikari.Message) -> bool:
         return m.author.id == member.id
     
-    iterator = get_purge_iterator(bot, ctx.channel_id, predicate = predicate, amount = amount)
-    count = await do_purge(bot, iterator, ctx.channel_id)
-
-    await ctx.respond(f"Successfully deleted {count} messages from user `{member}`.", delete_after = 5)
+    await start_purge(ctx, lambda count: f"Successfully deleted {count} messages from user `{member}`.", amount = amount, predicate = predicate)
 
 @purge.child
 @lightbulb.set_help(dedent('''
     - The bot can delete messages up to 2 weeks. It can't delete any messages past that point.
+    - Without an amount, the purge runs in the background. Use `purge cancel` to stop it.
 '''))
 @lightbulb.add_checks(
     lightbulb.bot_has_guild_permissions(hikari.Permissions.MANAGE_MESSAGES),
@@ -175,21 +324,18 @@ async def purge_member(ctx: lightbulb.Context):
 @lightbulb.implements(lightbulb.PrefixSubCommand, lightbulb.SlashSubCommand)
 async def purge_embed(ctx: lightbulb.Context):
     amount: int = ctx.options.amount
-    bot: models.MichaelBot = ctx.bot
 
     if amount != 0:
         amount = max(1, min(amount, 500))
         if isinstance(ctx, lightbulb.PrefixContext) and bool(ctx.event.message.embeds):
             amount += 1
     
-    iterator = get_purge_iterator(bot, ctx.channel_id, predicate = lambda m: bool(m.embeds), amount = amount)
-    count = await do_purge(bot, iterator, ctx.channel_id)
-    
-    await ctx.respond(f"Successfully deleted {count} messages with embeds.", delete_after = 5)
+    await start_purge(ctx, lambda count: f"Successfully deleted {count} messages with embeds.", amount = amount, predicate = lambda m: bool(m.embeds))
 
 @purge.child
 @lightbulb.set_help(dedent('''
     - The bot can delete messages up to 2 weeks. It can't delete any messages past that point.
+    - This purge runs in the background. Use `purge cancel` to stop it.
 '''))
 @lightbulb.add_checks(
     lightbulb.bot_has_guild_permissions(hikari.Permissions.MANAGE_MESSAGES),
@@ -203,7 +349,6 @@ async def purge_embed(ctx: lightbulb.Context):
 async def purge_range(ctx: lightbulb.Context):
     from_message: hikari.Message = ctx.options.from_message
     to_message: hikari.Message = ctx.options.to_message
-    bot: models.MichaelBot = ctx.bot
     
     if to_message is None:
         if isinstance(ctx, lightbulb.PrefixContext):
@@ -220,16 +365,14 @@ async def purge_range(ctx: lightbulb.Context):
     to_date = to_message.created_at
     def between_date(msg: hikari.Message):
         return from_date <= msg.created_at <= to_date
-    iterator = get_purge_iterator(bot, ctx.channel_id, predicate = between_date)
-    count = await do_purge(bot, iterator, ctx.channel_id)
-
-    await ctx.respond(f"Successfully deleted {count} messages between the range specified.", delete_after = 5)
+    await start_purge(ctx, lambda count: f"Successfully deleted {count} messages between the range specified.", predicate = between_date)
 
 @purge.child
 @lightbulb.set_help(dedent('''
     - This command will delete any occurrence of the provided pattern. If the string is `e e` and the message is `the end` then it'll be deleted.
     - To delete messages that contain any of the provided words, consider using `purge words`.
     - The bot can delete messages up to 2 weeks. It can't delete any messages past that point.
+    - Without an amount, the purge runs in the background. Use `purge cancel` to stop it.
 '''))
 @lightbulb.add_checks(
     lightbulb.bot_has_guild_permissions(hikari.Permissions.MANAGE_MESSAGES),
@@ -243,7 +386,6 @@ async def purge_range(ctx: lightbulb.Context):
 async def purge_string(ctx: lightbulb.Context):
     string: str = ctx.options.string
     amount: int = ctx.options.amount
-    bot: models.MichaelBot = ctx.bot
 
     if amount != 0:
         amount = max(1, min(amount, 500))
@@ -254,16 +396,14 @@ async def purge_string(ctx: lightbulb.Context):
         if msg.content is None:
             return False
         return string in msg.content
-    iterator = get_purge_iterator(bot, ctx.channel_id, predicate = has_string, amount = amount)
-    count = await do_purge(bot, iterator, ctx.channel_id)
-
-    await ctx.respond(f"Successfully deleted {count} messages that contains the string `{string}`.", delete_after = 5)
+    await start_purge(ctx, lambda count: f"Successfully deleted {count} messages that contains the string `{string}`.", amount = amount, predicate = has_string)
 
 @purge.child
 @lightbulb.set_help(dedent('''
     - This command will delete any occurrence of the provided words. If the input words is `e f` and the message is `fly` or `set` then it'll be deleted.
     - To delete messages that contain all the provided words, consider using `purge string`.
     - The bot can delete messages up to 2 weeks. It can't delete any messages past that point.
+    - Without an amount, the purge runs in the background. Use `purge cancel` to stop it.
 '''))
 @lightbulb.add_checks(
     lightbulb.bot_has_guild_permissions(hikari.Permissions.MANAGE_MESSAGES),
@@ -277,7 +417,6 @@ async def purge_string(ctx: lightbulb.Context):
 async def purge_words(ctx: lightbulb.Context):
     words: str = ctx.options.words
     amount: int = ctx.options.amount
-    bot: models.MichaelBot = ctx.bot
 
     word_list = words.split()
 
@@ -294,10 +433,22 @@ async def purge_words(ctx: lightbulb.Context):
         if isinstance(ctx, lightbulb.PrefixContext) and has_word(ctx.event.message):
             amount += 1
     
-    iterator = get_purge_iterator(bot, ctx.channel_id, predicate = has_word, amount = amount)
-    count = await do_purge(bot, iterator, ctx.channel_id)
+    await start_purge(ctx, lambda count: f"Successfully deleted {count} messages that contains any of the following words: `{', '.join(word_list)}`.", amount = amount, predicate = has_word)
 
-    await ctx.respond(f"Successfully deleted {count} messages that contains any of the following words: `{', '.join(word_list)}`.", delete_after = 5)
+@purge.child
+@lightbulb.add_checks(
+    lightbulb.has_guild_permissions(hikari.Permissions.MANAGE_MESSAGES)
+)
+@lightbulb.command("cancel", f"[{plugin.name}] Stop the purge running in this channel.")
+@lightbulb.implements(lightbulb.PrefixSubCommand, lightbulb.SlashSubCommand)
+async def purge_cancel(ctx: lightbulb.Context):
+    job: asyncio.Task | None = plugin.d.purge_jobs.get(ctx.channel_id)
+    if job is None:
+        await ctx.respond("There's no purge running in this channel.", reply = True, mentions_reply = True)
+        return
+    
+    job.cancel()
+    await ctx.respond("Stopping the purge...", delete_after = 5)
 
 def load(bot: models.MichaelBot):
     bot.add_plugin(plugin)
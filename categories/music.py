@@ -2,6 +2,7 @@
 
 import datetime as dt
 import itertools as itools
+import math
 from textwrap import dedent
 
 import hikari
@@ -11,10 +12,12 @@ import lightbulb
 from utils import checks, helpers, models
 from utils.converters import IntervalConverter
 from utils.models import NodeExtra
-from utils.nav import ButtonNavigator, run_view
+from utils.nav import ButtonNavigator, PageSource, run_view
 
 plugin = lightbulb.Plugin("Music", description = "Music Commands", include_datastore = True)
 plugin.d.emote = helpers.get_emote(":musical_note:")
+# Working channel id -> the channel's "Now Playing" announcer.
+plugin.d.announcers = {}
 plugin.add_checks(
     checks.is_command_enabled, 
     checks.strict_concurrency, 
@@ -43,7 +46,12 @@ async def track_start_event(event: lavaplayer.TrackStartEvent):
     node = await bot.lavalink.get_guild_node(event.guild_id)
     # We probably don't want to spam the Now Playing when it's only looping one song.
     if node is not None and not node.repeat:
-        await bot.rest.create_message(bot.node_extra[event.guild_id].working_channel, f"Now Playing: `{event.track.title}`.")
+        channel_id = bot.node_extra[event.guild_id].working_channel
+        announcer: models.NowPlayingAnnouncer | None = plugin.d.announcers.get(channel_id)
+        if announcer is None:
+            announcer = models.NowPlayingAnnouncer(bot.rest, channel_id)
+            plugin.d.announcers[channel_id] = announcer
+        announcer.announce(f"Now Playing: `{event.track.title}`.")
 
 async def track_end_event(event: lavaplayer.TrackEndEvent):
     bot: models.MichaelBot = plugin.bot
@@ -54,11 +62,17 @@ async def track_end_event(event: lavaplayer.TrackEndEvent):
     node = await bot.lavalink.get_guild_node(event.guild_id)
     if node is not None:
         if bot.node_extra[event.guild_id].queue_loop and not node.repeat:
-            node.queue.append(event.track)
+            models.TrackQueue.of(node).append(event.track)
 
 async def web_socket_closed_event(event: lavaplayer.WebSocketClosedEvent):
     print(event.reason)
 
+@plugin.listener(hikari.GuildMessageCreateEvent)
+async def bury_now_playing(event: hikari.GuildMessageCreateEvent):
+    announcer: models.NowPlayingAnnouncer | None = plugin.d.announcers.get(event.channel_id)
+    if announcer is not None and event.message_id != announcer.message_id:
+        announcer.mark_buried()
+
 # On voice state update the bot will update the lavalink node
 @plugin.listener(hikari.VoiceStateUpdateEvent)
 async def voice_state_update(event: hikari.VoiceStateUpdateEvent):
@@ -73,6 +87,9 @@ async def voice_server_update(event: hikari.VoiceServerUpdateEvent):
 @plugin.listener(hikari.ShardReadyEvent)
 async def start_lavalink(event: hikari.ShardReadyEvent):
     bot: models.MichaelBot = event.app
+    # Voice events arrive on the shard owning the guild, so every process needs its own client, but only one.
+    if bot.lavalink is not None:
+        return
     bot.lavalink = lavaplayer.LavalinkClient(
         host = "0.0.0.0",  # Lavalink host
         port = 2333,  # Lavalink port
@@ -134,7 +151,11 @@ async def leave(ctx: lightbulb.Context):
 
     node = await bot.lavalink.get_guild_node(ctx.guild_id)
     if node is not None:
-        bot.node_extra.pop(ctx.guild_id, None)
+        node_extra = bot.node_extra.pop(ctx.guild_id, None)
+        if node_extra is not None:
+            announcer = plugin.d.announcers.pop(node_extra.working_channel, None)
+            if announcer is not None:
+                announcer.close()
         await bot.update_voice_state(ctx.guild_id, None)
         await ctx.respond("**Successfully disconnected.**", reply = True)
     else:
@@ -208,11 +229,14 @@ async def play(ctx: lightbulb.Context):
         if node is None:
             return
     
-    result = await bot.lavalink.auto_search_tracks(query)
+    result = await bot.track_cache.resolve(bot.lavalink, query)
     if not result:
         await ctx.respond("Can't find any songs with the query.", reply = True, mentions_reply = True)
         return
     
+    # Make sure lavaplayer appends into our queue.
+    models.TrackQueue.of(node)
+    
     if isinstance(result, lavaplayer.PlayList):
         await bot.lavalink.add_to_queue(ctx.guild_id, result.tracks, ctx.author.id)
         await ctx.respond(f"Added playlist `{result.name}` with {len(result.tracks)} tracks to queue.", reply = True)
@@ -249,7 +273,7 @@ async def search(ctx: lightbulb.Context):
     bot: models.MichaelBot = ctx.bot
 
     # Ideally the user should provide keywords, but if they provide a link then I'll go with that too.
-    results = await bot.lavalink.auto_search_tracks(track)
+    results = await bot.track_cache.resolve(bot.lavalink, track)
     if results is None:
         await ctx.respond("Can't find any songs with the keywords provided.", reply = True, mentions_reply = True)
         return
@@ -361,49 +385,38 @@ async def queue(ctx: lightbulb.Context):
             )
             await ctx.respond(embed = embed, reply = True)
         else:
-            current_track = node.queue[0]
-            upcoming = node.queue[1:]
-
-            page_list = []
-            text = ""
-            embed = None
-            for index, track in enumerate(upcoming):
-                if index % 5 == 0:
-                    embed = helpers.get_default_embed(
-                        title = f"Queue for {ctx.get_guild().name}",
-                        timestamp = dt.datetime.now().astimezone(),
-                        author = ctx.author
-                    ).add_field(
-                        name = "Now playing:",
-                        value = f"[{current_track.title}]({current_track.uri}) - {dt.timedelta(milliseconds = current_track.length)}",
-                        inline = False
-                    )
+            track_queue = models.TrackQueue.of(node)
+            page_size = 5
+
+            # Pages are formatted from the live queue when they're displayed, so this is O(page) no matter how long the queue is.
+            def format_page(page_index: int) -> hikari.Embed:
+                embed = helpers.get_default_embed(
+                    title = f"Queue for {ctx.get_guild().name}",
+                    timestamp = dt.datetime.now().astimezone(),
+                    author = ctx.author
+                )
+                if not track_queue:
+                    embed.description = "*There are no songs currently in queue.*"
+                    return embed
                 
-                text += f"`{index + 1}`. [{track.title}]({track.uri}) - {dt.timedelta(milliseconds = track.length)}\n"
-
-                if index % 5 == 4:
-                    embed.add_field(
-                        name = "Up Next:",
-                        value = text,
-                        inline = False
-                    )
-                    embed.add_field(
-                        name = f"{MUSIC_EMOTES['single_loop']}",
-                        value = "Yes" if node.repeat else "No",
-                        inline = True
-                    ).add_field(
-                        name = f"{MUSIC_EMOTES['queue_loop']}",
-                        value = "Yes" if bot.node_extra[ctx.guild_id].queue_loop else "No",
-                        inline = True
-                    )
-                    page_list.append(embed)
-                    text = ""
-                    embed = None
-            # We're updating text rather than embed every loop, this should be the check instead of embed is None.
-            if text != "":
+                current_track = track_queue[0]
                 embed.add_field(
-                    name = "Up Next:",
-                    value = text,
+                    name = "Now playing:",
+                    value = f"[{current_track.title}]({current_track.uri}) - {dt.timedelta(milliseconds = current_track.length)}",
+                    inline = False
+                )
+
+                page_start = 1 + page_index * page_size
+                text = ""
+                for track_index, track in enumerate(track_queue[page_start:page_start + page_size], start = page_start):
+                    text += f"`{track_index}`. [{track.title}]({track.uri}) - {dt.timedelta(milliseconds = track.length)}\n"
+                
+                # The position is in seconds.
+                remaining = track_queue.duration_between(1) + max(0, current_track.length - int(current_track.position * 1000))
+                remaining = str(dt.timedelta(milliseconds = remaining)).split('.', maxsplit = 1)[0]
+                embed.add_field(
+                    name = f"Up Next ({len(track_queue) - 1} tracks, {remaining} left):",
+                    value = text if text else "*The queue has moved on. Invoke this command again for the updated queue.*",
                     inline = False
                 )
                 embed.add_field(
@@ -415,10 +428,10 @@ async def queue(ctx: lightbulb.Context):
                     value = "Yes" if bot.node_extra[ctx.guild_id].queue_loop else "No",
                     inline = True
                 )
-                page_list.append(embed)
+                return embed
             
-            page_nav = ButtonNavigator(pages = page_list, authors = (ctx.author.id, ))
-            await run_view(page_nav, ctx)
+            pages = PageSource(math.ceil((len(track_queue) - 1) / page_size), format_page)
+            await run_view(ButtonNavigator(pages = pages, authors = (ctx.author.id, )), ctx)
     else:
         await ctx.respond("Bot is not in a voice channel.", reply = True, mentions_reply = True)
 
@@ -436,8 +449,12 @@ async def queue_clear(ctx: lightbulb.Context):
     bot: models.MichaelBot = ctx.bot
 
     node = await bot.lavalink.get_guild_node(ctx.guild_id)
-    if node is not None:    
-        node.queue = [node.queue[0]]
+    if node is not None:
+        track_queue = models.TrackQueue.of(node)
+        if track_queue:
+            current_track = track_queue[0]
+            track_queue.clear()
+            track_queue.append(current_track)
         await bot.lavalink.set_guild_node(ctx.guild_id, node)
         await ctx.respond(f"{MUSIC_EMOTES['queue_clear']} **Queue cleared!**", reply = True)
     else:
@@ -490,19 +507,18 @@ async def queue_move(ctx: lightbulb.Context):
 
     node = await bot.lavalink.get_guild_node(ctx.guild_id)
     if node is not None:
-        movable_queue = node.queue[1:]
-        movable_size = len(movable_queue)
+        track_queue = models.TrackQueue.of(node)
+        movable_size = len(track_queue) - 1
         if from_index < 0 or to_index > movable_size - 1 or to_index < 0 or from_index > movable_size - 1:
             await ctx.respond("Index out of range.", reply = True, mentions_reply = True)
             return
         
-        track = movable_queue[from_index]
         # remove() will remove the first instance of the track.
-        # It's not clear if two same songs will be considered the same track, so we manually remove with list slicing.
-        movable_queue = movable_queue[:from_index] + movable_queue[from_index + 1:]
-        movable_queue.insert(to_index, track)
+        # It's not clear if two same songs will be considered the same track, so we remove by index.
+        # The first track is the current one, so offset by 1.
+        track = track_queue.pop(from_index + 1)
+        track_queue.insert(to_index + 1, track)
 
-        node.queue = [node.queue[0]] + movable_queue
         await bot.lavalink.set_guild_node(ctx.guild_id, node)
         await ctx.respond(f"**Track** `{track.title}` **moved from {from_index + 1} to {to_index + 1}.**", reply = True)
     else:
@@ -519,15 +535,14 @@ async def queue_remove(ctx: lightbulb.Context):
 
     node = await bot.lavalink.get_guild_node(ctx.guild_id)
     if node is not None:
-        removable_queue = node.queue[1:]
-        if index < 0 or index > len(removable_queue) - 1:
+        track_queue = models.TrackQueue.of(node)
+        if index < 0 or index > len(track_queue) - 2:
             await ctx.respond("Index out of range.")
             return
         
-        removed_track = removable_queue[index]
-        removable_queue = removable_queue[:index] + removable_queue[index + 1:]
+        # The first track is the current one, so offset by 1.
+        removed_track = track_queue.pop(index + 1)
 
-        node.queue = [node.queue[0]] + removable_queue
         await bot.lavalink.set_guild_node(ctx.guild_id, node)
         await ctx.respond(f"**Track removed:** `{removed_track.title}`.", reply = True)
     else:
@@ -154,7 +154,8 @@ async def embed_to_json(ctx: lightbulb.Context):
     
     message: hikari.Message = None
     try:
-        message = await bot.rest.fetch_message(channel_id, message_id)
+        with models.rest_timer():
+            message = await bot.rest.fetch_message(channel_id, message_id)
     except hikari.NotFoundError:
         await ctx.respond("I can't get this message!", reply = True, mentions_reply = True)
         return
@@ -209,7 +210,8 @@ async def embed_simple(ctx: lightbulb.Context):
             await ctx.respond(embed = embed)
         else:
             await ctx.respond("Sent!")
-            await ctx.bot.rest.create_message(channel, embed = embed)
+            with models.rest_timer():
+                await ctx.bot.rest.create_message(channel, embed = embed)
 @embed_simple.autocomplete("color")
 async def embed_simple_autocomplete(option: hikari.AutocompleteInteractionOption, _interaction: hikari.AutocompleteInteraction):
     if option.value != "":
@@ -273,16 +275,10 @@ async def embed_interactive(ctx: lightbulb.Context):
     
     msg = await ctx.respond(f"Destination: {channel.mention}", embed = embed, components = view.build())
     
-    def is_valid_interaction(event: hikari.InteractionCreateEvent) -> bool:
-        if not isinstance(event.interaction, hikari.ComponentInteraction):
-            return False
-        
-        if event.interaction.member.id != ctx.author.id:
-            return False
-        
+    def is_valid_interaction(interaction: hikari.ComponentInteraction) -> bool:
         # Filter select menu.
-        if event.interaction.values:
-            return event.interaction.values[0] in (
+        if interaction.values:
+            return interaction.values[0] in (
                 "edit_title",
                 "edit_description",
                 "add_field",
@@ -292,252 +288,240 @@ async def embed_interactive(ctx: lightbulb.Context):
                 "edit_destination",
             )
         # Filter buttons.
-        return event.interaction.custom_id in ("toggle_inline", "export", "send")
+        return interaction.custom_id in ("toggle_inline", "export", "send")
     
     def is_response(event: hikari.GuildMessageCreateEvent):
         msg = event.message
         return msg.author == ctx.author and msg.channel_id == ctx.channel_id
     
     # TODO: Handle case when the edited embed is ill-formed (empty, max capacity, etc.)
-    while True:
-        try:
-            event = await bot.wait_for(hikari.InteractionCreateEvent, timeout = timeout, predicate = is_valid_interaction)
-            interaction: hikari.ComponentInteraction = event.interaction
-            # Need to force typing despite already type hint. Good job linter.
-            assert isinstance(interaction, hikari.ComponentInteraction)
+    with bot.interaction_router.listen(await msg.message(), user_id = ctx.author.id, predicate = is_valid_interaction) as menu:
+        while True:
+            try:
+                interaction = await menu.wait(timeout = timeout)
             
-            # User selected menu.
-            if interaction.values:
-                if interaction.values[0] == "edit_title":
-                    title_modal = ModalWithCallback("Edit Title", timeout = timeout)
-                    title_modal.add_item(miru.TextInput(
-                        label = "What's the title?",
-                        placeholder = "Submit nothing will clear this field.", 
-                        custom_id = "title_prompt",
-                        max_length = 256,
-                    ))
-                    @title_modal.as_callback
-                    async def edit_title(context: miru.ModalContext):
-                        response: str = context.get_value_by_id("title_prompt")
-                        if response.strip('`') != "":
-                            embed.title = response
-                        else:
-                            embed.title = ""
+                # User selected menu.
+                if interaction.values:
+                    if interaction.values[0] == "edit_title":
+                        title_modal = ModalWithCallback("Edit Title", timeout = timeout)
+                        title_modal.add_item(miru.TextInput(
+                            label = "What's the title?",
+                            placeholder = "Submit nothing will clear this field.", 
+                            custom_id = "title_prompt",
+                            max_length = 256,
+                        ))
+                        @title_modal.as_callback
+                        async def edit_title(context: miru.ModalContext):
+                            response: str = context.get_value_by_id("title_prompt")
+                            if response.strip('`') != "":
+                                embed.title = response
+                            else:
+                                embed.title = ""
+                        
+                            await context.edit_response(embed = embed)
+                        await title_modal.send(interaction)                        
+                    elif interaction.values[0] == "edit_description":
+                        description_modal = ModalWithCallback("Edit Description", timeout = timeout)
+                        description_modal.add_item(miru.TextInput(
+                            label = "What's the description?", 
+                            style = hikari.TextInputStyle.PARAGRAPH,
+                            placeholder = "Submit nothing will clear this field.",
+                            custom_id = "description_prompt", 
+                        ))
+                        @description_modal.as_callback
+                        async def edit_description(context: miru.ModalContext):
+                            response: str = context.get_value_by_id("description_prompt")
+                            embed.description = response
                         
-                        await context.edit_response(embed = embed)
-                    await title_modal.send(interaction)                        
-                elif interaction.values[0] == "edit_description":
-                    description_modal = ModalWithCallback("Edit Description", timeout = timeout)
-                    description_modal.add_item(miru.TextInput(
-                        label = "What's the description?", 
-                        style = hikari.TextInputStyle.PARAGRAPH,
-                        placeholder = "Submit nothing will clear this field.",
-                        custom_id = "description_prompt", 
-                    ))
-                    @description_modal.as_callback
-                    async def edit_description(context: miru.ModalContext):
-                        response: str = context.get_value_by_id("description_prompt")
-                        embed.description = response
+                            await context.edit_response(embed = embed)
+                    
+                        await description_modal.send(interaction)
+                    elif interaction.values[0] == "add_field":
+                        if len(embed.fields) >= 25:
+                            await interaction.create_initial_response(
+                                hikari.ResponseType.MESSAGE_CREATE,
+                                "An embed can only have up to 25 fields!",
+                                flags = hikari.MessageFlag.EPHEMERAL,
+                            )
+                            continue
+                    
+                        add_field_modal = ModalWithCallback("Add Field", timeout = timeout)
+                        add_field_modal.add_item(miru.TextInput(
+                            label = "What's the field's name?",
+                            required = True,
+                            max_length = 256,
+                            custom_id = "add_field_name_prompt",
+                        )).add_item(miru.TextInput(
+                            label = "What's the field's value?",
+                            style = hikari.TextInputStyle.PARAGRAPH,
+                            required = True,
+                            max_length = 1024,
+                            custom_id = "add_field_value_prompt",
+                        ))
+                        # Modal doesn't have a checkbox option so we can't use it to toggle inline unfortunately.
+                        # Inline will need to be set by a separate button and not in this modal.
+                        @add_field_modal.as_callback
+                        async def add_field(context: miru.ModalContext):
+                            response_name: str = context.get_value_by_id("add_field_name_prompt")
+                            response_value: str = context.get_value_by_id("add_field_value_prompt")
+                            embed.add_field(response_name, response_value)
                         
-                        await context.edit_response(embed = embed)
+                            await context.edit_response(embed = embed)
+                    
+                        await add_field_modal.send(interaction)
+                    elif interaction.values[0] == "remove_field":
+                        if not embed.fields:
+                            await interaction.create_initial_response(
+                                hikari.ResponseType.MESSAGE_CREATE,
+                                "There's no field to remove!",
+                                flags = hikari.MessageFlag.EPHEMERAL,
+                            )
+                            continue
                     
-                    await description_modal.send(interaction)
-                elif interaction.values[0] == "add_field":
-                    if len(embed.fields) >= 25:
+                        # Since max field of embed is 25, we can use a select menu.
+                        remove_field_view = miru.View()
+                        remove_field_options = []
+                        for index, field in enumerate(embed.fields):
+                            remove_field_options.append(miru.SelectOption(
+                                label = field.name,
+                                value = str(index),
+                            ))
+                        # We're using interaction's id to make sure it's unique.
+                        remove_field_view.add_item(miru.Select(
+                            options = remove_field_options,
+                            custom_id = f"{interaction.id}",
+                            placeholder = "Select a field to remove.",
+                        ))
                         await interaction.create_initial_response(
                             hikari.ResponseType.MESSAGE_CREATE,
-                            "An embed can only have up to 25 fields!",
+                            "Which field to remove?",
+                            components = remove_field_view.build(),
                             flags = hikari.MessageFlag.EPHEMERAL,
                         )
-                        continue
+                        remove_field_msg = await interaction.fetch_initial_response()
+                        with bot.interaction_router.listen(remove_field_msg, user_id = ctx.author.id, predicate = lambda i: bool(i.values)) as remove_field_menu:
+                            remove_field_inter = await remove_field_menu.wait(timeout = timeout)
+                        assert remove_field_inter.values
                     
-                    add_field_modal = ModalWithCallback("Add Field", timeout = timeout)
-                    add_field_modal.add_item(miru.TextInput(
-                        label = "What's the field's name?",
-                        required = True,
-                        max_length = 256,
-                        custom_id = "add_field_name_prompt",
-                    )).add_item(miru.TextInput(
-                        label = "What's the field's value?",
-                        style = hikari.TextInputStyle.PARAGRAPH,
-                        required = True,
-                        max_length = 1024,
-                        custom_id = "add_field_value_prompt",
-                    ))
-                    # Modal doesn't have a checkbox option so we can't use it to toggle inline unfortunately.
-                    # Inline will need to be set by a separate button and not in this modal.
-                    @add_field_modal.as_callback
-                    async def add_field(context: miru.ModalContext):
-                        response_name: str = context.get_value_by_id("add_field_name_prompt")
-                        response_value: str = context.get_value_by_id("add_field_value_prompt")
-                        embed.add_field(response_name, response_value)
-                        
-                        await context.edit_response(embed = embed)
+                        if remove_field_inter.values:
+                            # Since we use only integers, there's no way this raises ValueError.
+                            remove_index = int(remove_field_inter.values[0])
+                            embed.remove_field(remove_index)
                     
-                    await add_field_modal.send(interaction)
-                elif interaction.values[0] == "remove_field":
-                    if not embed.fields:
+                        await remove_field_inter.create_initial_response(hikari.ResponseType.MESSAGE_UPDATE)
+                        await msg.edit(embed = embed)
+                        await interaction.delete_initial_response()
+                    elif interaction.values[0] == "edit_color":
+                        # The prompt for color is too long, so we can't fit it in a modal. Unfortunate.
                         await interaction.create_initial_response(
                             hikari.ResponseType.MESSAGE_CREATE,
-                            "There's no field to remove!",
-                            flags = hikari.MessageFlag.EPHEMERAL,
+                            f"What's the color? You can enter a hex number or one of the following predefined colors: `{', '.join(available_colors)}`",
+                            flags = hikari.MessageFlag.EPHEMERAL
                         )
-                        continue
-                    
-                    def interaction_filter(event: hikari.InteractionCreateEvent):
-                        if not isinstance(event.interaction, hikari.ComponentInteraction):
-                            return False
-                        
-                        if event.interaction.member.id != ctx.author.id:
-                            return False
-                        
-                        if not event.interaction.values:
-                            return False
-                        return event.interaction.custom_id == str(interaction.id)
+
+                        try:
+                            setter_event = await bot.wait_for(hikari.GuildMessageCreateEvent, timeout = timeout, predicate = is_response)
+                            color_content = setter_event.message.content.lower()
+
+                            if color_content in available_colors:
+                                embed.color = models.DefaultColor.get_color(color_content)
+                            else:
+                                try:
+                                    embed.color = hikari.Color(int(color_content, base = 16))
+                                except ValueError:
+                                    pass
                         
-                    # Since max field of embed is 25, we can use a select menu.
-                    remove_field_view = miru.View()
-                    remove_field_options = []
-                    for index, field in enumerate(embed.fields):
-                        remove_field_options.append(miru.SelectOption(
-                            label = field.name,
-                            value = str(index),
-                        ))
-                    # We're using interaction's id to make sure it's unique.
-                    remove_field_view.add_item(miru.Select(
-                        options = remove_field_options,
-                        custom_id = f"{interaction.id}",
-                        placeholder = "Select a field to remove.",
-                    ))
-                    await interaction.create_initial_response(
-                        hikari.ResponseType.MESSAGE_CREATE,
-                        "Which field to remove?",
-                        components = remove_field_view.build(),
-                        flags = hikari.MessageFlag.EPHEMERAL,
-                    )
-                    remove_field_event = await bot.wait_for(hikari.InteractionCreateEvent, timeout = timeout, predicate = interaction_filter)
-                    remove_field_inter: hikari.ComponentInteraction = remove_field_event.interaction
-                    assert remove_field_inter.values
-                    
-                    if remove_field_inter.values:
-                        # Since we use only integers, there's no way this raises ValueError.
-                        remove_index = int(remove_field_inter.values[0])
-                        embed.remove_field(remove_index)
-                    
-                    await remove_field_inter.create_initial_response(hikari.ResponseType.MESSAGE_UPDATE)
-                    await msg.edit(embed = embed)
-                    await interaction.delete_initial_response()
-                elif interaction.values[0] == "edit_color":
-                    # The prompt for color is too long, so we can't fit it in a modal. Unfortunate.
-                    await interaction.create_initial_response(
-                        hikari.ResponseType.MESSAGE_CREATE,
-                        f"What's the color? You can enter a hex number or one of the following predefined colors: `{', '.join(available_colors)}`",
-                        flags = hikari.MessageFlag.EPHEMERAL
-                    )
-
-                    try:
-                        setter_event = await bot.wait_for(hikari.GuildMessageCreateEvent, timeout = timeout, predicate = is_response)
-                        color_content = setter_event.message.content.lower()
-
-                        if color_content in available_colors:
-                            embed.color = models.DefaultColor.get_color(color_content)
+                            await msg.edit(embed = embed)
+                            await setter_event.message.delete()
+                        except asyncio.TimeoutError:
+                            await interaction.edit_initial_response(f"`{interaction.custom_id}` session expired.")
+                            await asyncio.sleep(5)
+                        await interaction.delete_initial_response()
+                    elif interaction.values[0] == "toggle_timestamp":
+                        if not embed.timestamp:
+                            embed.timestamp = dt.datetime.now().astimezone()
                         else:
-                            try:
-                                embed.color = hikari.Color(int(color_content, base = 16))
-                            except ValueError:
-                                pass
-                        
-                        await msg.edit(embed = embed)
-                        await setter_event.message.delete()
-                    except asyncio.TimeoutError:
-                        await interaction.edit_initial_response(f"`{interaction.custom_id}` session expired.")
-                        await asyncio.sleep(5)
-                    await interaction.delete_initial_response()
-                elif interaction.values[0] == "toggle_timestamp":
-                    if not embed.timestamp:
-                        embed.timestamp = dt.datetime.now().astimezone()
-                    else:
-                        embed.timestamp = None
+                            embed.timestamp = None
                     
-                    await interaction.create_initial_response(hikari.ResponseType.MESSAGE_UPDATE)
-                    await msg.edit(embed = embed)
-                elif interaction.values[0] == "edit_destination":
-                    # The reason we don't use modal is because it's easier for user to input channel from default Discord messages.
-                    # I'll keep this code here just in case Discord change modal input.
-
-                    #async def edit_destination(context: miru.ModalContext):
-                    #    response: str = context.get_value_by_id("destination_prompt")
-                    #    if response:
-                    #        channel = await lightbulb.TextableGuildChannelConverter(ctx).convert(response)
-                    #        if channel is None:
-                    #            channel = ctx.get_channel()
-                    #    
-                    #    await context.edit_response(f"Destination: {channel.mention}")
-                    #
-                    #destination_modal = ModalWithCallback("Edit Destination", callback = edit_destination, timeout = timeout)
-                    #destination_modal.add_item(miru.TextInput(
-                    #    label = "Which channel to send this embed?",
-                    #    placeholder = "Submit nothing will set destination to this channel.",
-                    #    custom_id = "destination_prompt",
-                    #))
-                    #await destination_modal.send(interaction)
+                        await interaction.create_initial_response(hikari.ResponseType.MESSAGE_UPDATE)
+                        await msg.edit(embed = embed)
+                    elif interaction.values[0] == "edit_destination":
+                        # The reason we don't use modal is because it's easier for user to input channel from default Discord messages.
+                        # I'll keep this code here just in case Discord change modal input.
+
+                        #async def edit_destination(context: miru.ModalContext):
+                        #    response: str = context.get_value_by_id("destination_prompt")
+                        #    if response:
+                        #        channel = await lightbulb.TextableGuildChannelConverter(ctx).convert(response)
+                        #        if channel is None:
+                        #            channel = ctx.get_channel()
+                        #    
+                        #    await context.edit_response(f"Destination: {channel.mention}")
+                        #
+                        #destination_modal = ModalWithCallback("Edit Destination", callback = edit_destination, timeout = timeout)
+                        #destination_modal.add_item(miru.TextInput(
+                        #    label = "Which channel to send this embed?",
+                        #    placeholder = "Submit nothing will set destination to this channel.",
+                        #    custom_id = "destination_prompt",
+                        #))
+                        #await destination_modal.send(interaction)
                     
-                    await interaction.create_initial_response(
-                        hikari.ResponseType.MESSAGE_CREATE,
-                        "Which channel to send this embed? (Type `None` to send it here)",
-                        flags = hikari.MessageFlag.EPHEMERAL
-                    )
-
-                    try:
-                        setter_event = await bot.wait_for(hikari.GuildMessageCreateEvent, timeout = timeout, predicate = is_response)
-                        if setter_event.message.content.strip('`') != "None":
-                            channel = await lightbulb.TextableGuildChannelConverter(ctx).convert(setter_event.message.content.strip('`'))
-                        elif channel is None or setter_event.message.content.strip('`') == "None":
-                            channel = ctx.get_channel()
+                        await interaction.create_initial_response(
+                            hikari.ResponseType.MESSAGE_CREATE,
+                            "Which channel to send this embed? (Type `None` to send it here)",
+                            flags = hikari.MessageFlag.EPHEMERAL
+                        )
+
+                        try:
+                            setter_event = await bot.wait_for(hikari.GuildMessageCreateEvent, timeout = timeout, predicate = is_response)
+                            if setter_event.message.content.strip('`') != "None":
+                                channel = await lightbulb.TextableGuildChannelConverter(ctx).convert(setter_event.message.content.strip('`'))
+                            elif channel is None or setter_event.message.content.strip('`') == "None":
+                                channel = ctx.get_channel()
                         
-                        await msg.edit(f"Destination: {channel.mention}")
-                        await setter_event.message.delete()
-                    except asyncio.TimeoutError:
-                        await interaction.edit_initial_response(f"`{interaction.custom_id}` session expired.")
-                        await asyncio.sleep(5)
-                    await interaction.delete_initial_response()
-            elif interaction.custom_id == "toggle_inline":
-                if not embed.fields:
-                    await interaction.create_initial_response(
-                        hikari.ResponseType.MESSAGE_CREATE,
-                        "This button only works when the embed has at least one field.",
-                        flags = hikari.MessageFlag.EPHEMERAL,
-                    )
-                    continue
+                            await msg.edit(f"Destination: {channel.mention}")
+                            await setter_event.message.delete()
+                        except asyncio.TimeoutError:
+                            await interaction.edit_initial_response(f"`{interaction.custom_id}` session expired.")
+                            await asyncio.sleep(5)
+                        await interaction.delete_initial_response()
+                elif interaction.custom_id == "toggle_inline":
+                    if not embed.fields:
+                        await interaction.create_initial_response(
+                            hikari.ResponseType.MESSAGE_CREATE,
+                            "This button only works when the embed has at least one field.",
+                            flags = hikari.MessageFlag.EPHEMERAL,
+                        )
+                        continue
                 
-                last_field = embed.fields[-1]
-                embed.edit_field(-1, inline = not last_field.is_inline)
-                await interaction.create_initial_response(hikari.ResponseType.MESSAGE_UPDATE)
-                await msg.edit(embed = embed)
-            elif interaction.custom_id == "export":
-                d = bot.entity_factory.serialize_embed(embed)[0]
-                d_text = json.dumps(str(d), indent = 4)
-                if len(d_text) > 2000:
-                    await interaction.create_initial_response(
-                        hikari.ResponseType.MESSAGE_CREATE,
-                        "The content is too large, so I throw them in this file!",
-                        attachment = hikari.Bytes(StringIO(d_text), "embed_export.json"),
-                        flags = hikari.MessageFlag.EPHEMERAL,
-                    )
-                else:
-                    await interaction.create_initial_response(
-                        hikari.ResponseType.MESSAGE_CREATE,
-                        f"```{d_text}```",
-                        flags = hikari.MessageFlag.EPHEMERAL,
-                    )
-            elif interaction.custom_id == "send":
-                # No need to response to the interaction if we just delete the message.
-                await bot.rest.create_message(channel, embed = embed)
-                await msg.delete()
+                    last_field = embed.fields[-1]
+                    embed.edit_field(-1, inline = not last_field.is_inline)
+                    await interaction.create_initial_response(hikari.ResponseType.MESSAGE_UPDATE)
+                    await msg.edit(embed = embed)
+                elif interaction.custom_id == "export":
+                    d = bot.entity_factory.serialize_embed(embed)[0]
+                    d_text = json.dumps(str(d), indent = 4)
+                    if len(d_text) > 2000:
+                        await interaction.create_initial_response(
+                            hikari.ResponseType.MESSAGE_CREATE,
+                            "The content is too large, so I throw them in this file!",
+                            attachment = hikari.Bytes(StringIO(d_text), "embed_export.json"),
+                            flags = hikari.MessageFlag.EPHEMERAL,
+                        )
+                    else:
+                        await interaction.create_initial_response(
+                            hikari.ResponseType.MESSAGE_CREATE,
+                            f"```{d_text}```",
+                            flags = hikari.MessageFlag.EPHEMERAL,
+                        )
+                elif interaction.custom_id == "send":
+                    # No need to response to the interaction if we just delete the message.
+                    await bot.rest.create_message(channel, embed = embed)
+                    await msg.delete()
+                    return
+            except asyncio.TimeoutError:
+                await msg.edit("Session expired.", embeds = None, components = None)
                 return
-        except asyncio.TimeoutError:
-            await msg.edit("Session expired.", embeds = None, components = None)
-            return
 
 async def do_remind(bot: models.MichaelBot, user_id: int, message: str, when: dt.datetime = None, remind_id: int = None):
     '''Send `user_id` a DM about `message` at time `when`.
@@ -592,7 +576,7 @@ async def do_remind(bot: models.MichaelBot, user_id: int, message: str, when: dt
         #        async with bot.pool.acquire() as conn:
         #            await psql.Reminders.delete_reminder(conn, remind_id, user_id)
         pass
-@tasks.task(s = NOTIFY_REFRESH, auto_start = True, pass_app = True, wait_before_execution = True)
+@tasks.task(s = NOTIFY_REFRESH, pass_app = True, wait_before_execution = True)
 async def scan_reminders(bot: models.MichaelBot):
     '''Check for past and future reminders every `NOTIFY_REFRESH` seconds.
 
@@ -614,11 +598,18 @@ async def scan_reminders(bot: models.MichaelBot):
         passed = await psql.Reminders.get_past_reminders(conn, current)
         upcoming = await psql.Reminders.get_reminders(conn, current, future)
     
+    # Spawned through the coordinator so they're dropped if another process takes over the scan.
     for missed_reminder in passed:
-        bot.create_task(do_remind(bot, missed_reminder.user_id, missed_reminder.message, None, missed_reminder.remind_id))
+        bot.task_coordinator.create_task("scan_reminders", do_remind(bot, missed_reminder.user_id, missed_reminder.message, None, missed_reminder.remind_id))
     
     for upcoming_reminder in upcoming:
-        bot.create_task(do_remind(bot, upcoming_reminder.user_id, upcoming_reminder.message, upcoming_reminder.awake_time, upcoming_reminder.remind_id))
+        bot.task_coordinator.create_task("scan_reminders", do_remind(bot, upcoming_reminder.user_id, upcoming_reminder.message, upcoming_reminder.awake_time, upcoming_reminder.remind_id))
+
+@plugin.listener(hikari.StartedEvent)
+async def on_started(event: hikari.StartedEvent):
+    bot: models.MichaelBot = event.app
+    # Reminders are stored in the db, so only one process should send them.
+    bot.task_coordinator.register("scan_reminders", scan_reminders)
 
 @plugin.command()
 @lightbulb.set_help(dedent('''
@@ -706,7 +697,7 @@ async def remind_view(ctx: lightbulb.Context):
             time_till_awake: dt.timedelta = item.awake_time - dt.datetime.now().astimezone()
             embed.description += f"`{item.remind_id}`. {message} - {humanize.precisedelta(time_till_awake, 'minutes', format = '%0.0f')}\n"
         
-        await run_view(builder.build(), ctx)
+        await run_view(builder.build(lazy = True), ctx)
 
 @remind.child
 @lightbulb.set_help(dedent('''
@@ -0,0 +1,156 @@
+'''Check the prefetched `dadjoke` buffer against a local stand-in of icanhazdadjoke.
+
+A small `aiohttp.web` server plays the joke API, so nothing here touches the internet or Discord. The script goes through
+a successful refill, a source returning duplicates not being called in a loop, the circuit breaker opening after consecutive
+failures, the half-open trial once the breaker's timeout passes, and the command falling back to the offline jokes while the API is down.
+
+Usage
+-----
+```sh
+python check_dadjoke_buffer.py
+```
+
+It exits with a non-zero status and a traceback on the first failed check.
+'''
+
+import asyncio
+import types
+from unittest import mock
+
+import aiohttp
+from aiohttp import web
+
+from categories import fun
+from utils import models
+
+class JokeStandIn:
+    '''A local stand-in of the joke API that can be switched to failing.'''
+
+    def __init__(self) -> None:
+        self.hits = 0
+        self.failing = False
+        # Answer with the same joke every time, like a degraded API serving from its own cache.
+        self.repeating = False
+        self.url: str = ""
+        self.__runner: web.AppRunner | None = None
+
+    async def __handle(self, _: web.Request) -> web.Response:
+        self.hits += 1
+        if self.failing:
+            return web.Response(status = 503, text = "Service Unavailable")
+        if self.repeating:
+            return web.json_response({"id": "0", "joke": "Joke #0", "status": 200})
+        return web.json_response({"id": str(self.hits), "joke": f"Joke #{self.hits}", "status": 200})
+
+    async def start(self) -> None:
+        app = web.Application()
+        app.router.add_get("/", self.__handle)
+        self.__runner = web.AppRunner(app)
+        await self.__runner.setup()
+        site = web.TCPSite(self.__runner, "127.0.0.1", 0)
+        await site.start()
+        port = self.__runner.addresses[0][1]
+        self.url = f"http://127.0.0.1:{port}/"
+    async def stop(self) -> None:
+        if self.__runner is not None:
+            await self.__runner.cleanup()
+
+async def drain_refill(buffer: models.PrefetchBuffer) -> bool:
+    '''Start a refill and wait for it. Return whether the breaker let it through.'''
+    task = buffer.refill()
+    if task is None:
+        return False
+    await task
+    return True
+
+async def check_refill(stand_in: JokeStandIn) -> None:
+    buffer = models.PrefetchBuffer(fun.fetch_dadjoke, capacity = 5, low_water = 2)
+    assert await drain_refill(buffer)
+    assert len(buffer) == 5, len(buffer)
+    assert stand_in.hits == 5, stand_in.hits
+
+    # Taking down to the low water mark starts a refill in the background.
+    jokes = [buffer.take() for _ in range(4)]
+    assert all(joke is not None and joke.startswith("Joke #") for joke in jokes), jokes
+    assert await drain_refill(buffer)
+    assert len(buffer) == 5, len(buffer)
+    assert stand_in.hits == 9, stand_in.hits
+    print("ok: refill")
+
+async def check_duplicates(stand_in: JokeStandIn) -> None:
+    buffer = models.PrefetchBuffer(fun.fetch_dadjoke, capacity = 5, low_water = 2)
+    stand_in.repeating = True
+    stand_in.hits = 0
+
+    # A refill stops after `capacity` fetches even though the buffer isn't full.
+    assert await drain_refill(buffer)
+    assert len(buffer) == 1, len(buffer)
+    assert stand_in.hits == 5, stand_in.hits
+    stand_in.repeating = False
+    print("ok: duplicates don't loop")
+
+async def check_breaker(stand_in: JokeStandIn) -> None:
+    breaker = models.CircuitBreaker(failure_threshold = 3, reset_timeout = 0.2)
+    buffer = models.PrefetchBuffer(fun.fetch_dadjoke, capacity = 5, low_water = 2, breaker = breaker)
+    stand_in.failing = True
+    stand_in.hits = 0
+
+    for _ in range(3):
+        assert not breaker.is_open
+        assert await drain_refill(buffer)
+    assert breaker.is_open
+    assert stand_in.hits == 3, stand_in.hits
+
+    # While open, nothing reaches the API.
+    assert not await drain_refill(buffer)
+    assert buffer.take() is None
+    assert stand_in.hits == 3, stand_in.hits
+    print("ok: breaker opens after 3 failures")
+
+    # Once the timeout passes, exactly one trial goes through. A failed trial opens the breaker again right away.
+    await asyncio.sleep(0.25)
+    assert await drain_refill(buffer)
+    assert stand_in.hits == 4, stand_in.hits
+    assert breaker.is_open
+    assert not await drain_refill(buffer)
+    assert stand_in.hits == 4, stand_in.hits
+
+    # A successful trial closes the breaker and the buffer fills up again.
+    stand_in.failing = False
+    await asyncio.sleep(0.25)
+    assert await drain_refill(buffer)
+    assert not breaker.is_open
+    assert breaker.failures == 0
+    assert len(buffer) == 5, len(buffer)
+    print("ok: half-open trial")
+
+async def check_offline_fallback(stand_in: JokeStandIn) -> None:
+    breaker = models.CircuitBreaker(failure_threshold = 1, reset_timeout = 60)
+    fun.plugin.d.dadjokes = models.PrefetchBuffer(fun.fetch_dadjoke, capacity = 5, low_water = 2, breaker = breaker)
+    stand_in.failing = True
+    assert await drain_refill(fun.plugin.d.dadjokes)
+    assert breaker.is_open
+
+    ctx = mock.AsyncMock()
+    await fun.dadjoke.callback(ctx)
+    joke = ctx.respond.call_args.args[0]
+    assert joke in fun.OFFLINE_DADJOKES, joke
+    print("ok: offline fallback")
+
+async def main() -> None:
+    stand_in = JokeStandIn()
+    await stand_in.start()
+    fun.DADJOKE_URL = stand_in.url
+    async with aiohttp.ClientSession() as session:
+        # `fetch_dadjoke()` only needs the bot's http client.
+        fun.plugin._app = types.SimpleNamespace(aio_session = session) # pylint: disable=protected-access
+        try:
+            await check_refill(stand_in)
+            await check_duplicates(stand_in)
+            await check_breaker(stand_in)
+            await check_offline_fallback(stand_in)
+        finally:
+            await stand_in.stop()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,168 @@
+'''Check `models.TrackCache` against a local stand-in of Lavalink.
+
+The stand-in answers `auto_search_tracks()` with made-up tracks after a short delay and counts every call, so the script
+can tell exactly how many lookups reached "Lavalink". It goes through single-flight coalescing, TTL expiry, LRU eviction by
+the size of the encoded tracks, not caching errors and empty results, and handing out copies.
+
+Usage
+-----
+```sh
+python check_track_cache.py
+```
+
+It exits with a non-zero status and a traceback on the first failed check.
+'''
+
+import asyncio
+import collections
+
+import lavaplayer
+
+from utils import models
+
+class LavalinkStandIn:
+    '''Answer `auto_search_tracks()` like `lavaplayer.LavalinkClient` does, without a Lavalink server.'''
+
+    def __init__(self, *, delay: float = 0.05) -> None:
+        self.delay = delay
+        self.calls = 0
+        self.calls_per_query: collections.Counter[str] = collections.Counter()
+        # Queries answered with something other than a single track.
+        self.results: dict[str, list[lavaplayer.Track] | lavaplayer.PlayList | None | Exception] = {}
+        # The length of the encoded track of each query. Default to 100.
+        self.sizes: dict[str, int] = {}
+
+    async def auto_search_tracks(self, query: str) -> list[lavaplayer.Track] | lavaplayer.PlayList | None:
+        self.calls += 1
+        self.calls_per_query[query] += 1
+        await asyncio.sleep(self.delay)
+
+        result = self.results.get(query, ...)
+        if isinstance(result, Exception):
+            raise result
+        if result is not ...:
+            return result
+        return [make_track(query, self.sizes.get(query, 100))]
+
+def make_track(title: str, size: int) -> lavaplayer.Track:
+    return lavaplayer.Track(
+        track = 'Q' * size,
+        identifier = title,
+        is_seekable = True,
+        author = "Stand-in",
+        length = 180000,
+        is_stream = False,
+        position = 0,
+        title = title,
+        uri = f"https://example.com/{title}",
+    )
+
+async def check_coalescing() -> None:
+    lavalink = LavalinkStandIn()
+    cache = models.TrackCache()
+
+    # Different spellings of the same search share the key.
+    queries = ["never gonna give you up", "  Never Gonna  give you UP "] * 10
+    results = await asyncio.gather(*(cache.resolve(lavalink, query) for query in queries))
+    assert lavalink.calls == 1, lavalink.calls
+    assert cache.misses == 1 and cache.coalesced == 19, cache.to_dict()
+    assert len({id(result[0]) for result in results}) == len(results), "Coalesced callers share a track."
+
+    await cache.resolve(lavalink, "NEVER gonna give you up")
+    assert lavalink.calls == 1, lavalink.calls
+    assert cache.hits == 1, cache.to_dict()
+    print("ok: coalescing")
+
+async def check_copies() -> None:
+    lavalink = LavalinkStandIn()
+    lavalink.results["some playlist"] = lavaplayer.PlayList("Some Playlist", 0, [make_track("a", 10), make_track("b", 10)])
+    cache = models.TrackCache()
+
+    tracks = await cache.resolve(lavalink, "bohemian rhapsody")
+    tracks[0].requester = "1234"
+    tracks.clear()
+    tracks = await cache.resolve(lavalink, "bohemian rhapsody")
+    assert len(tracks) == 1 and tracks[0].requester is None, tracks
+
+    playlist = await cache.resolve(lavalink, "some playlist")
+    playlist.tracks[0].requester = "1234"
+    playlist.tracks.pop()
+    playlist = await cache.resolve(lavalink, "some playlist")
+    assert len(playlist.tracks) == 2 and playlist.tracks[0].requester is None, playlist.tracks
+    assert lavalink.calls == 2, lavalink.calls
+    print("ok: copies")
+
+async def check_ttl() -> None:
+    lavalink = LavalinkStandIn(delay = 0)
+    cache = models.TrackCache(ttl = 0.1)
+
+    await cache.resolve(lavalink, "lofi beats")
+    await cache.resolve(lavalink, "lofi beats")
+    assert lavalink.calls == 1, lavalink.calls
+
+    await asyncio.sleep(0.15)
+    await cache.resolve(lavalink, "lofi beats")
+    assert lavalink.calls == 2, lavalink.calls
+    assert len(cache) == 1 and cache.size == 100, cache.to_dict()
+    print("ok: ttl")
+
+async def check_eviction() -> None:
+    lavalink = LavalinkStandIn(delay = 0)
+    lavalink.sizes["huge"] = 400
+    cache = models.TrackCache(max_bytes = 300)
+
+    for query in ("a", "b", "c"):
+        await cache.resolve(lavalink, query)
+    assert cache.size == 300 and cache.evictions == 0, cache.to_dict()
+
+    # Touching "a" makes "b" the least recently used.
+    await cache.resolve(lavalink, "a")
+    await cache.resolve(lavalink, "d")
+    assert cache.size == 300 and cache.evictions == 1, cache.to_dict()
+    await cache.resolve(lavalink, "a")
+    assert lavalink.calls_per_query["a"] == 1, lavalink.calls_per_query
+    await cache.resolve(lavalink, "b")
+    assert lavalink.calls_per_query["b"] == 2, lavalink.calls_per_query
+
+    # A result bigger than the whole cache is not stored, and doesn't evict anything.
+    evictions = cache.evictions
+    await cache.resolve(lavalink, "huge")
+    await cache.resolve(lavalink, "huge")
+    assert lavalink.calls_per_query["huge"] == 2, lavalink.calls_per_query
+    assert cache.evictions == evictions and cache.size == 300, cache.to_dict()
+    print("ok: eviction by bytes")
+
+async def check_not_cached() -> None:
+    lavalink = LavalinkStandIn()
+    lavalink.results["broken"] = RuntimeError("Lavalink is down.")
+    lavalink.results["nothing"] = []
+    lavalink.results["no match"] = None
+    lavalink.results["empty playlist"] = lavaplayer.PlayList("Empty", -1, [])
+    cache = models.TrackCache()
+
+    # Every coalesced caller sees the error.
+    results = await asyncio.gather(*(cache.resolve(lavalink, "broken") for _ in range(5)), return_exceptions = True)
+    assert all(isinstance(result, RuntimeError) for result in results), results
+    assert lavalink.calls_per_query["broken"] == 1, lavalink.calls_per_query
+    try:
+        await cache.resolve(lavalink, "broken")
+    except RuntimeError:
+        pass
+    assert lavalink.calls_per_query["broken"] == 2, lavalink.calls_per_query
+
+    for query in ("nothing", "no match", "empty playlist"):
+        await cache.resolve(lavalink, query)
+        await cache.resolve(lavalink, query)
+        assert lavalink.calls_per_query[query] == 2, (query, lavalink.calls_per_query)
+    assert len(cache) == 0 and cache.size == 0, cache.to_dict()
+    print("ok: errors and empty results are not cached")
+
+async def main() -> None:
+    await check_coalescing()
+    await check_copies()
+    await check_ttl()
+    await check_eviction()
+    await check_not_cached()
+
+if __name__ == "__main__":
+    asyncio.run(main())
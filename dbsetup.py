@@ -198,6 +198,47 @@ async def setup_database(user, password, database, host, port):
             ON CONFLICT DO NOTHING;
         """)
 
+        # Every process running the bot listens to this to keep its cache in sync with the others.
+        print("Creating cache invalidation triggers...", end = '')
+        await conn.execute("""
+            CREATE OR REPLACE FUNCTION notify_cache_invalidate() RETURNS TRIGGER AS $$
+            DECLARE
+                row_data JSONB;
+            BEGIN
+                IF TG_OP = 'DELETE' THEN
+                    row_data := to_jsonb(OLD);
+                ELSE
+                    row_data := to_jsonb(NEW);
+                END IF;
+
+                PERFORM pg_notify('cache_invalidate', json_build_object(
+                    'table', lower(TG_TABLE_NAME),
+                    'key', row_data->>TG_ARGV[0],
+                    'origin', current_setting('application_name')
+                )::TEXT);
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql;
+        """)
+        # Rows of the per-user tables are keyed by their owner, since the caches reload a user's rows as a whole.
+        cached_tables = (
+            ("Guilds", "id"),
+            ("GuildLogs", "guild_id"),
+            ("GuildLogSettings", "guild_id"),
+            ("Users", "id"),
+            ("Items", "id"),
+            ("UserEquipment", "user_id"),
+            ("UserInventory", "user_id"),
+        )
+        for table_name, key_column in cached_tables:
+            await conn.execute(f"""
+                DROP TRIGGER IF EXISTS {table_name}_cache_invalidate ON {table_name};
+                CREATE TRIGGER {table_name}_cache_invalidate
+                    AFTER INSERT OR UPDATE OR DELETE ON {table_name}
+                    FOR EACH ROW EXECUTE FUNCTION notify_cache_invalidate('{key_column}');
+            """)
+        print("Done!")
+
     except Exception as e:
         raise e
     finally:
@@ -268,83 +268,77 @@ async def log_view(ctx: lightbulb.Context):
 
     msg_proxy = await ctx.respond(f"**Log Destination:** {bot.cache.get_guild_channel(log_cache.log_channel).mention}\n", embed = embed, components = main_view.build())
     
-    def is_valid_interaction(event: hikari.InteractionCreateEvent) -> bool:
-        if not isinstance(event.interaction, hikari.ComponentInteraction):
-            return False
+    def is_valid_interaction(interaction: hikari.ComponentInteraction) -> bool:
+        if interaction.values:
+            return interaction.values[0] in __EVENT_GROUPING.keys()
         
-        if event.interaction.member.id != ctx.author.id or event.interaction.channel_id != ctx.channel_id:
-            return False
-        
-        if event.interaction.values:
-            return event.interaction.values[0] in __EVENT_GROUPING.keys()
-        
-        return event.interaction.custom_id.startswith(BUTTON_PREFIX_ID)
+        return interaction.custom_id.startswith(BUTTON_PREFIX_ID)
     
     # We need to create a deferred response before editing. Otherwise, we get interaction failed.
-    while True:
-        try:
-            event = await bot.wait_for(hikari.InteractionCreateEvent, timeout = 120, predicate = is_valid_interaction)
-            interaction: hikari.ComponentInteraction = event.interaction
-            # User selected menu.
-            if interaction.values:
-                sub_view_value = interaction.values[0]
+    with bot.interaction_router.listen(await msg_proxy.message(), user_id = ctx.author.id, predicate = is_valid_interaction) as menu:
+        while True:
+            try:
+                interaction = await menu.wait(timeout = 120)
+                # User selected menu.
+                if interaction.values:
+                    sub_view_value = interaction.values[0]
                 
-                sub_view.clear_items()
-                embed.description = f"**{sub_view_value.capitalize()} events:**\n"
-                embed.description += "Select a button to toggle between enable and disable.\n"
-                for event in __EVENT_GROUPING[sub_view_value]: # Already check for valid interaction option, no need to check in-bound.
-                    friendly_name = __EVENT_FRIENDLY[event]
-                    event_name = __EVENT_OPTION_MAPPING[event]
-                    sub_view.add_item(miru.Button(style = hikari.ButtonStyle.PRIMARY, label = friendly_name, custom_id = BUTTON_PREFIX_ID + __EVENT_OPTION_MAPPING[event]))
-
-                    embed.description += f"- `{friendly_name}`: {'✅' if log_cache.settings_dict_view.get(event_name) else '❌'}\n"
-                sub_view.add_item(return_button)
+                    sub_view.clear_items()
+                    embed.description = f"**{sub_view_value.capitalize()} events:**\n"
+                    embed.description += "Select a button to toggle between enable and disable.\n"
+                    for event in __EVENT_GROUPING[sub_view_value]: # Already check for valid interaction option, no need to check in-bound.
+                        friendly_name = __EVENT_FRIENDLY[event]
+                        event_name = __EVENT_OPTION_MAPPING[event]
+                        sub_view.add_item(miru.Button(style = hikari.ButtonStyle.PRIMARY, label = friendly_name, custom_id = BUTTON_PREFIX_ID + __EVENT_OPTION_MAPPING[event]))
+
+                        embed.description += f"- `{friendly_name}`: {'✅' if log_cache.settings_dict_view.get(event_name) else '❌'}\n"
+                    sub_view.add_item(return_button)
                 
-                await interaction.create_initial_response(hikari.ResponseType.DEFERRED_MESSAGE_UPDATE)
-                await msg_proxy.edit(embed = embed, components = sub_view.build())
+                    await interaction.create_initial_response(hikari.ResponseType.DEFERRED_MESSAGE_UPDATE)
+                    await msg_proxy.edit(embed = embed, components = sub_view.build())
             
-            elif interaction.custom_id.startswith(BUTTON_PREFIX_ID):
-                # Remove the prefix.
-                event_name = interaction.custom_id[len(BUTTON_PREFIX_ID):]
+                elif interaction.custom_id.startswith(BUTTON_PREFIX_ID):
+                    # Remove the prefix.
+                    event_name = interaction.custom_id[len(BUTTON_PREFIX_ID):]
                 
-                if event_name == "return":
-                    embed.description = main_description
-                    await interaction.create_initial_response(hikari.ResponseType.DEFERRED_MESSAGE_UPDATE)
-                    await msg_proxy.edit(embed = embed, components = main_view.build())
+                    if event_name == "return":
+                        embed.description = main_description
+                        await interaction.create_initial_response(hikari.ResponseType.DEFERRED_MESSAGE_UPDATE)
+                        await msg_proxy.edit(embed = embed, components = main_view.build())
                     
-                    continue
-                elif event_name == "submit":
-                    async with bot.pool.acquire() as conn:
-                        await bot.log_cache.update(conn, log_cache)
-                    await interaction.create_initial_response(hikari.ResponseType.DEFERRED_MESSAGE_UPDATE)
-                    await msg_proxy.edit("Successfully updated! ✅", embeds = None, components = None)
+                        continue
+                    elif event_name == "submit":
+                        async with bot.pool.acquire() as conn:
+                            await bot.log_cache.update(conn, log_cache)
+                        await interaction.create_initial_response(hikari.ResponseType.DEFERRED_MESSAGE_UPDATE)
+                        await msg_proxy.edit("Successfully updated! ✅", embeds = None, components = None)
                     
-                    return
+                        return
                 
-                # Find where the setting is in the list.
-                index: int = -1
-                for i, setting in enumerate(log_cache.log_settings):
-                    if event_name == setting.setting_name:
-                        index = i
-                        break
-                if index == -1:
-                    raise RuntimeError("Can't find the event in the event list.")
-                log_cache.log_settings[index].is_enabled = not log_cache.log_settings[index].is_enabled
+                    # Find where the setting is in the list.
+                    index: int = -1
+                    for i, setting in enumerate(log_cache.log_settings):
+                        if event_name == setting.setting_name:
+                            index = i
+                            break
+                    if index == -1:
+                        raise RuntimeError("Can't find the event in the event list.")
+                    log_cache.log_settings[index].is_enabled = not log_cache.log_settings[index].is_enabled
                 
-                embed.description = f"**{sub_view_value.capitalize()} events:**\n"
-                embed.description += "Select a button to toggle between enable and disable.\n"
-                for event in __EVENT_GROUPING[sub_view_value]: # Already check for valid interaction option, no need to check in-bound.
-                    friendly_name = __EVENT_FRIENDLY[event]
-                    event_name = __EVENT_OPTION_MAPPING[event]
+                    embed.description = f"**{sub_view_value.capitalize()} events:**\n"
+                    embed.description += "Select a button to toggle between enable and disable.\n"
+                    for event in __EVENT_GROUPING[sub_view_value]: # Already check for valid interaction option, no need to check in-bound.
+                        friendly_name = __EVENT_FRIENDLY[event]
+                        event_name = __EVENT_OPTION_MAPPING[event]
 
-                    embed.description += f"- `{friendly_name}`: {'✅' if log_cache.settings_dict_view.get(event_name) else '❌'}\n"
+                        embed.description += f"- `{friendly_name}`: {'✅' if log_cache.settings_dict_view.get(event_name) else '❌'}\n"
                 
-                await interaction.create_initial_response(hikari.ResponseType.DEFERRED_MESSAGE_UPDATE)
-                await msg_proxy.edit(embed = embed)
+                    await interaction.create_initial_response(hikari.ResponseType.DEFERRED_MESSAGE_UPDATE)
+                    await msg_proxy.edit(embed = embed)
 
-        except asyncio.TimeoutError:
-            await msg_proxy.edit("Session expired. None of the changes are saved.", embeds = None, components = None)
-            return
+            except asyncio.TimeoutError:
+                await msg_proxy.edit("Session expired. None of the changes are saved.", embeds = None, components = None)
+                return
 
 @plugin.listener(hikari.GuildChannelCreateEvent)
 async def on_guild_channel_create(event: hikari.GuildChannelCreateEvent):
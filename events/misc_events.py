@@ -4,7 +4,6 @@ import datetime as dt
 import json
 import logging
 
-import aiohttp
 import asyncpg
 import hikari
 import lightbulb
@@ -30,6 +29,9 @@ async def update_item(conn: asyncpg.Connection, bot: models.MichaelBot):
                 item["sort_id"] = index
                 await bot.item_cache.update(conn, psql.Item(**item))
 
+        from categories.econ import loot
+        psql.Equipment.load_item_traits(bot.item_cache.values(), craftable = loot.has_craft_recipe, brewable = loot.has_brew_recipe)
+
 async def update_badge(conn: asyncpg.Connection, _: models.MichaelBot):
     badge_data: list[dict]
     try:
@@ -53,12 +55,16 @@ async def on_starting(event: hikari.StartingEvent):
     
     if bot.pool is None:
         try:
-            bot.pool = await asyncpg.create_pool(
+            pool = await asyncpg.create_pool(
                 host = bot.secrets["host"],
                 port = bot.secrets["port"],
                 database = bot.secrets["database"],
                 user = bot.secrets["user"],
-                password = bot.secrets["password"]
+                password = bot.secrets["password"],
+                # Runs the inventory hooks again once a transaction commits.
+                connection_class = psql.HookedConnection,
+                # Lets this process recognize (and skip) its own cache invalidation notifications.
+                server_settings = {"application_name": bot.cache_invalidator.origin},
             )
         except asyncpg.InvalidPasswordError:
             logger.error(f"Invalid password for user '{bot.secrets['user']}'.")
@@ -67,8 +73,19 @@ async def on_starting(event: hikari.StartingEvent):
         except ConnectionRefusedError:
             logger.error(f"Unable to connect to a database at {bot.secrets['host']}, port {bot.secrets['port']}")
         else:
+            bot.pool = models.ProfiledPool(pool)
             logger.info("Bot successfully connected to the database.")
 
+            connect_kwargs = {
+                "host": bot.secrets["host"],
+                "port": bot.secrets["port"],
+                "database": bot.secrets["database"],
+                "user": bot.secrets["user"],
+                "password": bot.secrets["password"],
+            }
+            bot.cache_invalidator.start(**connect_kwargs)
+            bot.task_coordinator.start(**connect_kwargs)
+
             async with bot.pool.acquire() as conn:
                 await update_item(conn, bot)
                 await update_badge(conn, bot)
@@ -77,8 +94,16 @@ async def on_starting(event: hikari.StartingEvent):
         logger.warning("Unable to connect to a database. Bot will be missing features.")
     
     if bot.aio_session is None:
-        bot.aio_session = aiohttp.ClientSession()
+        bot.aio_session = bot.create_aio_session()
         logger.info("aiohttp connection session created.")
+    
+    if not bot.loop_monitor.is_running:
+        bot.loop_monitor.start()
+        logger.info("Event loop lag monitor started.")
+    
+    if not bot.host_metrics.is_running:
+        bot.host_metrics.start()
+        logger.info("Host metrics sampler started.")
 
 @plugin.listener(hikari.ShardReadyEvent)
 async def on_shard_ready(event: hikari.ShardReadyEvent):
@@ -108,12 +133,16 @@ async def on_shard_ready(event: hikari.ShardReadyEvent):
                 
                 await bot.user_cache.update_all_from_db(conn)
                 logger.info("Populated user cache with stored info.")
+
+                await bot.equipment_cache.update_all_from_db(conn)
+                logger.info("Populated equipment cache with stored info.")
     
     logger.info("Bot is now ready to go!")
 
 @plugin.listener(hikari.GuildJoinEvent)
 async def on_guild_join(event: hikari.GuildJoinEvent):
     bot: models.MichaelBot = event.app
+    bot.guild_stats.remove_local(event.guild_id)
 
     if bot.pool is not None:
         async with bot.pool.acquire() as conn:
@@ -135,10 +164,59 @@ async def on_guild_join(event: hikari.GuildJoinEvent):
 @plugin.listener(hikari.GuildLeaveEvent)
 async def on_guild_leave(event: hikari.GuildLeaveEvent):
     bot: models.MichaelBot = event.app
+    bot.guild_stats.remove_local(event.guild_id)
     if bot.pool is not None:
         bot.guild_cache.remove_local(event.guild_id)
         logger.info(f"Bot left guild '{event.guild_id}'. Cache entry removed.")
 
+# These keep bot.guild_stats in sync with hikari's cache.
+@plugin.listener(hikari.GuildAvailableEvent)
+async def on_guild_available(event: hikari.GuildAvailableEvent):
+    bot: models.MichaelBot = event.app
+    # The guild is resent in full (ie. after reconnecting), so rebuild on the next request.
+    bot.guild_stats.remove_local(event.guild_id)
+
+@plugin.listener(hikari.MemberChunkEvent)
+async def on_member_chunk(event: hikari.MemberChunkEvent):
+    bot: models.MichaelBot = event.app
+    for member in event.members.values():
+        bot.guild_stats.set_member(member)
+
+@plugin.listener(hikari.MemberCreateEvent)
+async def on_member_create(event: hikari.MemberCreateEvent):
+    bot: models.MichaelBot = event.app
+    bot.guild_stats.set_member(event.member)
+
+@plugin.listener(hikari.MemberUpdateEvent)
+async def on_member_update(event: hikari.MemberUpdateEvent):
+    bot: models.MichaelBot = event.app
+    bot.guild_stats.set_member(event.member)
+
+@plugin.listener(hikari.MemberDeleteEvent)
+async def on_member_delete(event: hikari.MemberDeleteEvent):
+    bot: models.MichaelBot = event.app
+    bot.guild_stats.remove_member(event.guild_id, event.user_id)
+
+@plugin.listener(hikari.GuildChannelCreateEvent)
+async def on_guild_channel_create(event: hikari.GuildChannelCreateEvent):
+    bot: models.MichaelBot = event.app
+    bot.guild_stats.set_channel(event.channel)
+
+@plugin.listener(hikari.GuildChannelUpdateEvent)
+async def on_guild_channel_update(event: hikari.GuildChannelUpdateEvent):
+    bot: models.MichaelBot = event.app
+    bot.guild_stats.set_channel(event.channel)
+
+@plugin.listener(hikari.GuildChannelDeleteEvent)
+async def on_guild_channel_delete(event: hikari.GuildChannelDeleteEvent):
+    bot: models.MichaelBot = event.app
+    bot.guild_stats.remove_channel(event.guild_id, event.channel_id)
+
+@plugin.listener(hikari.RoleDeleteEvent)
+async def on_role_delete(event: hikari.RoleDeleteEvent):
+    bot: models.MichaelBot = event.app
+    bot.guild_stats.remove_role(event.guild_id, event.role_id)
+
 @plugin.listener(hikari.GuildMessageCreateEvent)
 async def on_guild_message(event: hikari.GuildMessageCreateEvent):
     msg = event.message
@@ -153,6 +231,8 @@ async def on_command_complete(event: lightbulb.CommandCompletionEvent):
     # Remove concurrency
     if command.max_concurrency:
         bot.custom_command_concurrency_session.release_session(event.context)
+    
+    bot.command_profiler.finish(event.context)
 
 @plugin.listener(lightbulb.CommandErrorEvent)
 async def on_command_error(event: lightbulb.CommandErrorEvent):
@@ -163,11 +243,17 @@ async def on_command_error(event: lightbulb.CommandErrorEvent):
 
     if command and command.max_concurrency:
         bot.custom_command_concurrency_session.release_session(event.context)
+    
+    bot.command_profiler.finish(event.context, failed = True)
 
 @plugin.listener(hikari.StoppingEvent)
 async def on_stopping(event: hikari.StoppingEvent):
     bot: models.MichaelBot = event.app
 
+    bot.loop_monitor.stop()
+    bot.host_metrics.stop()
+    bot.cache_invalidator.stop()
+    bot.task_coordinator.stop()
     if bot.pool is not None:
         await bot.pool.close()
         logger.info("Postgres connection pool gracefully closed.")
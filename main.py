@@ -1,8 +1,12 @@
 '''Entry point of the bot.'''
 
+import argparse
+import asyncio
 import json
+import math
+import multiprocessing
 import os
-import sys
+import time
 
 import hikari
 import lightbulb
@@ -70,21 +74,76 @@ def load_info(bot_name: str) -> tuple[dict]:
     
     return (bot_info, secrets)
 
-if __name__ == "__main__":
+def plan_shards(shard_count: int, processes: int) -> list[list[int]]:
+    '''Split the shards into contiguous ranges, one per process.
+
+    Parameters
+    ----------
+    shard_count : int
+        The total amount of shards.
+    processes : int
+        The amount of processes. Capped to `shard_count`.
+
+    Returns
+    -------
+    list[list[int]]
+        The shard ids of each process.
+    '''
+    processes = max(1, min(processes, shard_count))
+    size, extra = divmod(shard_count, processes)
+
+    plan = []
+    start = 0
+    for index in range(processes):
+        end = start + size + (1 if index < extra else 0)
+        plan.append(list(range(start, end)))
+        start = end
+    return plan
+
+async def fetch_gateway_info(token: str) -> tuple[int, int]:
+    '''Return the recommended shard count and the identify concurrency of the bot.'''
+    rest = hikari.RESTApp()
+    await rest.start()
+    try:
+        async with rest.acquire(token, hikari.TokenType.BOT) as client:
+            info = await client.fetch_gateway_bot_info()
+    finally:
+        await rest.close()
+    return info.shard_count, info.session_start_limit.max_concurrency
+
+def run_bot(bot_info: dict, secrets: dict, *, shard_ids: list[int] | None = None, shard_count: int | None = None, is_leader: bool = True, startup_delay: float = 0):
+    '''Create and run the bot in this process. This blocks until the bot stops.
+
+    Parameters
+    ----------
+    bot_info : dict
+        The bot information in `config.json`.
+    secrets : dict
+        The bot's secrets.
+    shard_ids : list[int] | None, optional
+        The shards this process runs. `None` runs all of them.
+    shard_count : int | None, optional
+        The total amount of shards across all processes. `None` uses Discord's recommendation.
+    is_leader : bool, optional
+        Whether this process runs the work that must only run once. See `MichaelBot`.
+    startup_delay : float, optional
+        How long to wait before connecting, in seconds. This keeps processes from identifying at the same time.
+    '''
     if os.name != "nt":
         import uvloop
         uvloop.install()
     
-    argc = len(sys.argv)
-    bot_info, secrets = load_info(sys.argv[1])
-    
+    if startup_delay > 0:
+        time.sleep(startup_delay)
+
     bot = MichaelBot(
         token = secrets["token"],
         prefix = lightbulb.when_mentioned_or(retrieve_prefix),
         intents = hikari.Intents.ALL ^ hikari.Intents.GUILD_PRESENCES,
 
         info = bot_info,
-        secrets = secrets
+        secrets = secrets,
+        is_leader = is_leader,
     )
     
     tasks.load(bot)
@@ -94,5 +153,70 @@ if __name__ == "__main__":
         bot.load_extensions(extension)
     
     bot.run(
-        activity = hikari.Activity(name = "o7 Technoblade", type = hikari.ActivityType.PLAYING)
+        activity = hikari.Activity(name = "o7 Technoblade", type = hikari.ActivityType.PLAYING),
+        shard_ids = shard_ids,
+        shard_count = shard_count,
     )
+
+def launch(bot_info: dict, secrets: dict, processes: int, shard_count: int | None = None):
+    '''Run the bot across multiple processes, each owning a contiguous range of shards.
+
+    The first process is the leader. This blocks until every process stops.
+
+    Parameters
+    ----------
+    bot_info : dict
+        The bot information in `config.json`. It's shared by every process.
+    secrets : dict
+        The bot's secrets. It's shared by every process.
+    processes : int
+        The amount of processes to run.
+    shard_count : int | None, optional
+        The total amount of shards. `None` uses Discord's recommendation.
+    '''
+    recommended, max_concurrency = asyncio.run(fetch_gateway_info(secrets["token"]))
+    if shard_count is None:
+        shard_count = recommended
+    
+    # Discord allows `max_concurrency` identifies every 5 seconds across the whole bot, and each process
+    # only paces its own shards, so later processes wait for the earlier ones to be done identifying.
+    context = multiprocessing.get_context("spawn")
+    workers: list[multiprocessing.Process] = []
+    delay = 0.0
+    for index, shard_ids in enumerate(plan_shards(shard_count, processes)):
+        worker = context.Process(
+            target = run_bot,
+            args = (bot_info, secrets),
+            kwargs = {
+                "shard_ids": shard_ids,
+                "shard_count": shard_count,
+                "is_leader": index == 0,
+                "startup_delay": delay,
+            },
+            name = f"MichaelBot-{shard_ids[0]}-{shard_ids[-1]}",
+        )
+        worker.start()
+        workers.append(worker)
+        delay += 5 * math.ceil(len(shard_ids) / max_concurrency)
+    
+    try:
+        for worker in workers:
+            worker.join()
+    except KeyboardInterrupt:
+        for worker in workers:
+            worker.terminate()
+        for worker in workers:
+            worker.join()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description = "Run the bot.")
+    parser.add_argument("bot_index", help = "The bot index in `setup/config.json`.")
+    parser.add_argument("--processes", "-p", type = int, default = 1, help = "The amount of processes to split the shards across. Default to 1.")
+    parser.add_argument("--shards", "-s", type = int, default = None, help = "The total amount of shards. Default to Discord's recommendation.")
+    args = parser.parse_args()
+
+    bot_info, secrets = load_info(args.bot_index)
+    if args.processes > 1:
+        launch(bot_info, secrets, args.processes, args.shards)
+    else:
+        run_bot(bot_info, secrets, shard_count = args.shards)
@@ -0,0 +1,443 @@
+'''Replay gateway events into the bot without connecting to Discord, and measure how fast they are handled.
+
+The bot is built like in `main.py` and its extensions are loaded, but instead of connecting to the gateway, raw event payloads
+are fed into hikari's event manager one at a time. Each event goes through the same path as a live one (deserializing,
+updating the cache, running every listener and command) while every REST call is answered by a stub. The database from the
+bot's secrets is used, so run this against a local Postgres.
+
+Usage
+-----
+```sh
+# Synthesize events and report the throughput, latency percentiles and allocations per event type.
+python replay_events.py BotIndex --events 2000 --trace-alloc
+
+# Save the synthesized events to replay the exact same ones later.
+python replay_events.py BotIndex --save events.jsonl
+python replay_events.py BotIndex --replay events.jsonl
+
+# Record real payloads by running the bot normally. Stop with Ctrl+C.
+python replay_events.py BotIndex --record events.jsonl
+```
+
+The payload files contain one `{"name": ..., "payload": ...}` object per line, which is what the gateway sends.
+'''
+
+import argparse
+import asyncio
+import collections
+import datetime as dt
+import importlib.util
+import json
+import os
+import random
+import time
+import tracemalloc
+import typing as t
+from unittest import mock
+
+import hikari
+
+import main
+from utils.models import MichaelBot
+
+GUILD_ID = 1000000000000000000
+OWNER_ID = 1000000000000000001
+BOT_ID = 1000000000000000002
+CHANNEL_IDS = [1000000000000001000 + i for i in range(5)]
+ROLE_IDS = [1000000000000002000 + i for i in range(8)]
+MEMBER_IDS = [1000000000000003000 + i for i in range(50)]
+
+def snowflake_at(when: dt.datetime) -> int:
+    '''Return a snowflake with the given creation time.'''
+    return int(hikari.Snowflake.from_datetime(when)) | random.getrandbits(22)
+
+def _user_payload(user_id: int, *, bot: bool = False) -> dict:
+    return {
+        "id": str(user_id),
+        "username": f"user{user_id % 10000}",
+        "discriminator": "0001",
+        "avatar": None,
+        "bot": bot,
+        "public_flags": 0,
+    }
+
+def _member_payload(user_id: int, role_ids: t.Sequence[int]) -> dict:
+    return {
+        "user": _user_payload(user_id, bot = user_id == BOT_ID),
+        "nick": None,
+        "roles": [str(role_id) for role_id in role_ids],
+        "joined_at": "2022-01-01T00:00:00+00:00",
+        "deaf": False,
+        "mute": False,
+        "guild_id": str(GUILD_ID),
+    }
+
+def _role_payload(role_id: int, position: int, *, permissions: int = 0) -> dict:
+    return {
+        "id": str(role_id),
+        "name": f"role{position}",
+        "color": 0,
+        "hoist": False,
+        "icon": None,
+        "unicode_emoji": None,
+        "position": position,
+        "permissions": str(permissions),
+        "managed": False,
+        "mentionable": False,
+    }
+
+def _channel_payload(channel_id: int, position: int) -> dict:
+    return {
+        "id": str(channel_id),
+        "type": 0,
+        "guild_id": str(GUILD_ID),
+        "name": f"channel{position}",
+        "position": position,
+        "permission_overwrites": [],
+        "nsfw": False,
+        "topic": None,
+        "last_message_id": None,
+        "rate_limit_per_user": 0,
+        "parent_id": None,
+    }
+
+def _message_payload(message_id: int, channel_id: int, author_id: int, content: str) -> dict:
+    return {
+        "id": str(message_id),
+        "channel_id": str(channel_id),
+        "guild_id": str(GUILD_ID),
+        "author": _user_payload(author_id),
+        "member": {key: value for key, value in _member_payload(author_id, ROLE_IDS[1:2]).items() if key != "user"},
+        "content": content,
+        "timestamp": dt.datetime.now(dt.timezone.utc).isoformat(),
+        "edited_timestamp": None,
+        "tts": False,
+        "mention_everyone": False,
+        "mentions": [],
+        "mention_roles": [],
+        "attachments": [],
+        "embeds": [],
+        "pinned": False,
+        "type": 0,
+        "flags": 0,
+    }
+
+def guild_create_payload() -> dict:
+    '''Return the `GUILD_CREATE` payload of the fake guild every synthesized event happens in.'''
+    # @everyone, then the bot's role with every permission so permission checks pass.
+    roles = [_role_payload(GUILD_ID, 0, permissions = int(hikari.Permissions.SEND_MESSAGES | hikari.Permissions.VIEW_CHANNEL))]
+    roles.append(_role_payload(ROLE_IDS[0], 1, permissions = int(hikari.Permissions.all_permissions())))
+    roles.extend(_role_payload(role_id, index + 2) for index, role_id in enumerate(ROLE_IDS[1:]))
+
+    members = [_member_payload(BOT_ID, ROLE_IDS[:1]), _member_payload(OWNER_ID, ())]
+    members.extend(_member_payload(member_id, random.sample(ROLE_IDS[1:], 2)) for member_id in MEMBER_IDS)
+    return {
+        "id": str(GUILD_ID),
+        "name": "Replay Guild",
+        "icon": None,
+        "splash": None,
+        "discovery_splash": None,
+        "banner": None,
+        "description": None,
+        "owner_id": str(OWNER_ID),
+        "afk_channel_id": None,
+        "afk_timeout": 300,
+        "verification_level": 0,
+        "default_message_notifications": 0,
+        "explicit_content_filter": 0,
+        "roles": roles,
+        "emojis": [],
+        "stickers": [],
+        "features": [],
+        "mfa_level": 0,
+        "application_id": None,
+        "system_channel_id": None,
+        "system_channel_flags": 0,
+        "rules_channel_id": None,
+        "public_updates_channel_id": None,
+        "vanity_url_code": None,
+        "premium_tier": 0,
+        "premium_subscription_count": 0,
+        "preferred_locale": "en-US",
+        "nsfw_level": 0,
+        "premium_progress_bar_enabled": False,
+        "max_members": 500000,
+        "joined_at": "2022-01-01T00:00:00+00:00",
+        "large": False,
+        "unavailable": False,
+        "member_count": len(members),
+        "voice_states": [],
+        "members": members,
+        "channels": [_channel_payload(channel_id, index) for index, channel_id in enumerate(CHANNEL_IDS)],
+        "threads": [],
+        "presences": [],
+        "stage_instances": [],
+        "guild_scheduled_events": [],
+    }
+
+def synthesize(count: int, *, prefix: str = '$', seed: int = 0) -> list[tuple[str, dict]]:
+    '''Return a mix of `count` events in the fake guild, preceded by its `GUILD_CREATE`.
+
+    Parameters
+    ----------
+    count : int
+        The amount of events, not counting the `GUILD_CREATE`.
+    prefix : str, optional
+        The prefix of the prefix commands in the messages. Default to `$`.
+    seed : int, optional
+        The random seed, so runs are comparable. Default to 0.
+
+    Returns
+    -------
+    list[tuple[str, dict]]
+        The `(event name, payload)` pairs.
+    '''
+    random.seed(seed)
+    events: list[tuple[str, dict]] = [("GUILD_CREATE", guild_create_payload())]
+    messages: collections.deque[dict] = collections.deque(maxlen = 200)
+    extra_roles: list[int] = []
+    commands = ("dice", "ping", "info bot")
+
+    kinds = ("MESSAGE_CREATE", "MESSAGE_UPDATE", "MESSAGE_DELETE", "GUILD_MEMBER_UPDATE", "GUILD_ROLE_CREATE", "GUILD_ROLE_UPDATE", "GUILD_ROLE_DELETE", "INTERACTION_CREATE")
+    weights = (40, 10, 10, 15, 3, 5, 2, 15)
+    for kind in random.choices(kinds, weights, k = count):
+        now = dt.datetime.now(dt.timezone.utc)
+        if kind in ("MESSAGE_UPDATE", "MESSAGE_DELETE") and not messages:
+            kind = "MESSAGE_CREATE"
+        if kind in ("GUILD_ROLE_UPDATE", "GUILD_ROLE_DELETE") and not extra_roles:
+            kind = "GUILD_ROLE_CREATE"
+
+        if kind == "MESSAGE_CREATE":
+            content = f"{prefix}{random.choice(commands)}" if random.random() < 0.2 else f"hello there {random.random()}"
+            payload = _message_payload(snowflake_at(now), random.choice(CHANNEL_IDS), random.choice(MEMBER_IDS), content)
+            messages.append(payload)
+        elif kind == "MESSAGE_UPDATE":
+            payload = dict(random.choice(messages))
+            payload["content"] += " (edited)"
+            payload["edited_timestamp"] = now.isoformat()
+        elif kind == "MESSAGE_DELETE":
+            message = messages.popleft()
+            payload = {"id": message["id"], "channel_id": message["channel_id"], "guild_id": str(GUILD_ID)}
+        elif kind == "GUILD_MEMBER_UPDATE":
+            payload = _member_payload(random.choice(MEMBER_IDS), random.sample(ROLE_IDS[1:], random.randint(0, 3)))
+            payload["nick"] = random.choice((None, f"nick{random.randint(0, 99)}"))
+        elif kind == "GUILD_ROLE_CREATE":
+            role_id = snowflake_at(now)
+            extra_roles.append(role_id)
+            payload = {"guild_id": str(GUILD_ID), "role": _role_payload(role_id, len(ROLE_IDS) + len(extra_roles))}
+        elif kind == "GUILD_ROLE_UPDATE":
+            role_id = random.choice(extra_roles)
+            role = _role_payload(role_id, len(ROLE_IDS) + extra_roles.index(role_id) + 1)
+            role["color"] = random.randint(0, 0xFFFFFF)
+            payload = {"guild_id": str(GUILD_ID), "role": role}
+        elif kind == "GUILD_ROLE_DELETE":
+            role_id = extra_roles.pop(random.randrange(len(extra_roles)))
+            payload = {"guild_id": str(GUILD_ID), "role_id": str(role_id)}
+        else:
+            member = _member_payload(random.choice(MEMBER_IDS), ROLE_IDS[1:2])
+            member["permissions"] = str(int(hikari.Permissions.all_permissions()))
+            payload = {
+                "id": str(snowflake_at(now)),
+                "application_id": str(BOT_ID),
+                "type": int(hikari.InteractionType.APPLICATION_COMMAND),
+                "data": {"id": str(snowflake_at(now)), "name": "dice", "type": 1},
+                "guild_id": str(GUILD_ID),
+                "channel_id": str(random.choice(CHANNEL_IDS)),
+                "member": member,
+                "token": "replay-token",
+                "version": 1,
+                "locale": "en-US",
+                "guild_locale": "en-US",
+                "app_permissions": str(int(hikari.Permissions.all_permissions())),
+            }
+        events.append((kind, payload))
+    return events
+
+def load_events(path: str) -> list[tuple[str, dict]]:
+    with open(path, encoding = "utf-8") as fin:
+        return [(entry["name"], entry["payload"]) for entry in map(json.loads, fin) if entry]
+
+def save_events(path: str, events: t.Iterable[tuple[str, dict]]) -> None:
+    with open(path, 'w', encoding = "utf-8") as fout:
+        for name, payload in events:
+            fout.write(json.dumps({"name": name, "payload": payload}) + '\n')
+
+def create_stub_rest() -> mock.AsyncMock:
+    '''Return a REST client answering every call without touching the network.
+
+    Coroutine methods return mocks, so listeners and commands can use the results without failing on attribute access.
+    '''
+    rest = mock.AsyncMock(spec = hikari.impl.RESTClientImpl)
+    rest.fetch_application.return_value = mock.Mock(id = BOT_ID)
+    # Some callers check the type of what they get back.
+    message = mock.Mock(spec = hikari.Message)
+    message.edit.return_value = message
+    for method in (rest.create_message, rest.edit_message, rest.fetch_message, rest.execute_webhook, rest.edit_webhook_message, rest.fetch_interaction_response, rest.edit_interaction_response):
+        method.return_value = message
+    return rest
+
+def create_stub_shard() -> mock.AsyncMock:
+    '''Return a gateway shard that the events appear to come from.'''
+    shard = mock.AsyncMock(spec = hikari.impl.GatewayShardImpl)
+    shard.id = 0
+    shard.shard_count = 1
+    shard.get_user_id.return_value = hikari.Snowflake(BOT_ID)
+    return shard
+
+class EventStats:
+    '''The measurements of one event type.'''
+
+    def __init__(self) -> None:
+        self.latencies: list[float] = []
+        self.peak_bytes: list[int] = []
+        self.retained_bytes: list[int] = []
+
+    def percentile(self, p: float) -> float:
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * p))] if ordered else 0
+
+def create_bot(bot_info: dict, secrets: dict) -> MichaelBot:
+    '''Create the bot with every extension loaded and the REST client stubbed.'''
+    bot = MichaelBot(
+        token = secrets["token"] or "replay",
+        prefix = main.retrieve_prefix,
+        intents = hikari.Intents.ALL ^ hikari.Intents.GUILD_PRESENCES,
+
+        info = bot_info,
+        secrets = secrets,
+    )
+    main.tasks.load(bot)
+    main.miru.install(bot)
+    # Music needs a Lavalink server. Some extensions (ie. `categories.test`) are local-only.
+    for extension in sorted(set(main.EXTENSIONS) - {"categories.music"}):
+        if importlib.util.find_spec(extension) is not None:
+            bot.load_extensions(extension)
+
+    # pylint: disable=protected-access
+    bot._rest = create_stub_rest()
+    bot._cache.set_me(bot.entity_factory.deserialize_my_user(_user_payload(BOT_ID, bot = True) | {"verified": True, "mfa_enabled": False, "flags": 0, "locale": "en-US", "premium_type": 0}))
+    # pylint: enable=protected-access
+    return bot
+
+async def replay(bot: MichaelBot, events: t.Sequence[tuple[str, dict]], *, trace_alloc: bool = False) -> dict[str, EventStats]:
+    '''Feed the events into the bot one by one and measure each of them.
+
+    Every event is awaited until all of its listeners finish before the next one is fed.
+    '''
+    shard = create_stub_shard()
+    stats: dict[str, EventStats] = collections.defaultdict(EventStats)
+    # pylint: disable=protected-access
+    manager = bot.event_manager
+    for name, payload in events:
+        consumer = manager._consumers.get(name.lower())
+        if consumer is None:
+            # Recorded files can contain payloads hikari doesn't dispatch.
+            continue
+        if trace_alloc:
+            tracemalloc.reset_peak()
+            before, _ = tracemalloc.get_traced_memory()
+
+        started = time.perf_counter()
+        await manager._handle_dispatch(consumer, shard, payload)
+        elapsed = time.perf_counter() - started
+
+        stat = stats[name]
+        stat.latencies.append(elapsed)
+        if trace_alloc:
+            after, peak = tracemalloc.get_traced_memory()
+            stat.peak_bytes.append(peak - before)
+            stat.retained_bytes.append(after - before)
+    # pylint: enable=protected-access
+    return stats
+
+def report(stats: dict[str, EventStats]) -> str:
+    lines = [f"{'Event':<22}{'Count':>7}{'Events/s':>11}{'p50 (ms)':>10}{'p95 (ms)':>10}{'p99 (ms)':>10}{'Peak (KiB)':>12}{'Kept (B)':>10}"]
+    total_count = 0
+    total_time = 0.0
+    for name, stat in sorted(stats.items()):
+        count = len(stat.latencies)
+        elapsed = sum(stat.latencies)
+        total_count += count
+        total_time += elapsed
+
+        peak = f"{sum(stat.peak_bytes) / len(stat.peak_bytes) / 1024:.1f}" if stat.peak_bytes else '-'
+        kept = f"{sum(stat.retained_bytes) / len(stat.retained_bytes):.0f}" if stat.retained_bytes else '-'
+        lines.append(
+            f"{name:<22}{count:>7}{count / elapsed if elapsed else 0:>11.0f}"
+            f"{stat.percentile(0.5) * 1000:>10.3f}{stat.percentile(0.95) * 1000:>10.3f}{stat.percentile(0.99) * 1000:>10.3f}{peak:>12}{kept:>10}"
+        )
+    lines.append(f"{'Total':<22}{total_count:>7}{total_count / total_time if total_time else 0:>11.0f}")
+    return '\n'.join(lines)
+
+async def run_benchmark(bot_info: dict, secrets: dict, events: list[tuple[str, dict]], *, use_db: bool, trace_alloc: bool, warmup: int) -> None:
+    if not use_db:
+        # Nothing listens on port 1, which the bot handles like any unreachable database.
+        secrets = secrets | {"host": "127.0.0.1", "port": 1}
+    bot = create_bot(bot_info, secrets)
+
+    # Same setup as a real start (database pool, caches, monitors), minus the gateway.
+    await bot.dispatch(hikari.StartingEvent(app = bot))
+    try:
+        # The guild has to be in the cache before anything happens in it.
+        head = [event for event in events[:1] if event[0] == "GUILD_CREATE"]
+        body = events[len(head):]
+        await replay(bot, head + body[:warmup])
+
+        if trace_alloc:
+            tracemalloc.start()
+        stats = await replay(bot, body[warmup:], trace_alloc = trace_alloc)
+        if trace_alloc:
+            tracemalloc.stop()
+        print(report(stats))
+    finally:
+        await bot.dispatch(hikari.StoppingEvent(app = bot))
+
+def record(bot_info: dict, secrets: dict, path: str) -> None:
+    '''Run the bot normally and append every raw payload it receives to `path`.'''
+    fout = open(path, 'a', encoding = "utf-8")
+
+    async def on_payload(event: hikari.ShardPayloadEvent):
+        fout.write(json.dumps({"name": event.name, "payload": event.payload}) + '\n')
+
+    bot = MichaelBot(
+        token = secrets["token"],
+        prefix = main.retrieve_prefix,
+        intents = hikari.Intents.ALL ^ hikari.Intents.GUILD_PRESENCES,
+
+        info = bot_info,
+        secrets = secrets,
+    )
+    bot.subscribe(hikari.ShardPayloadEvent, on_payload)
+    main.tasks.load(bot)
+    main.miru.install(bot)
+    for extension in sorted(main.EXTENSIONS):
+        bot.load_extensions(extension)
+    try:
+        bot.run()
+    finally:
+        fout.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description = "Replay gateway events into the bot and measure how fast they are handled.")
+    parser.add_argument("bot_index", help = "The bot index in `setup/config.json`.")
+    parser.add_argument("--events", "-n", type = int, default = 1000, help = "The amount of events to synthesize. Default to 1000.")
+    parser.add_argument("--seed", type = int, default = 0, help = "The random seed of the synthesized events. Default to 0.")
+    parser.add_argument("--replay", metavar = "FILE", help = "Replay the events in this file instead of synthesizing them.")
+    parser.add_argument("--save", metavar = "FILE", help = "Save the synthesized events to this file and exit.")
+    parser.add_argument("--record", metavar = "FILE", help = "Run the bot normally and record the payloads it receives to this file.")
+    parser.add_argument("--warmup", type = int, default = 100, help = "The amount of events to run before measuring. Default to 100.")
+    parser.add_argument("--trace-alloc", action = "store_true", help = "Also measure the memory allocated per event. This slows everything down.")
+    parser.add_argument("--no-db", action = "store_true", help = "Run without connecting to the database.")
+    args = parser.parse_args()
+
+    bot_info, secrets = main.load_info(args.bot_index)
+    if args.record:
+        record(bot_info, secrets, args.record)
+    elif args.save:
+        save_events(args.save, synthesize(args.events, prefix = bot_info["prefix"], seed = args.seed))
+    else:
+        events = load_events(args.replay) if args.replay else synthesize(args.events, prefix = bot_info["prefix"], seed = args.seed)
+        if os.name != "nt":
+            import uvloop
+            uvloop.install()
+        asyncio.run(run_benchmark(bot_info, secrets, events, use_db = not args.no_db, trace_alloc = args.trace_alloc, warmup = args.warmup))
@@ -1,18 +1,37 @@
 '''Contains many data structures, including the customized `MichaelBot` class.'''
 
+import asyncio
+import bisect
+import collections
+import contextlib
+import contextvars
 import copy
 import datetime as dt
+import hashlib
+import json
+import logging
+import math
+import os
+import sys
+import threading
+import time
+import traceback
 import typing as t
-from dataclasses import dataclass, field
+from dataclasses import asdict, dataclass, field
 
 import aiohttp
 import asyncpg
 import hikari
 import lavaplayer
 import lightbulb
+import psutil
+from lightbulb.ext import tasks
 
 from utils import psql
 
+logger = logging.getLogger("MichaelBot")
+
+T = t.TypeVar('T')
 
 class GuildCache:
     '''A wrapper around `dict[str, psql.Guild]`
@@ -219,6 +238,8 @@ class UserCache:
             self.__user_mapping[user.id] = user
     def update_local(self, user: psql.User):
         self.__user_mapping[user.id] = user
+    def remove_local(self, user_id: int):
+        del self.__user_mapping[user_id]
 
 class ItemCache:
     '''A wrapper around `dict[str, psql.Item]`
@@ -273,6 +294,13 @@ class ItemCache:
     async def update(self, conn: asyncpg.Connection, item: psql.Item):
         await psql.Item.update(conn, item)
         self.__item_mapping[item.id] = item
+    async def update_all_from_db(self, conn: asyncpg.Connection):
+        items = await psql.Item.fetch_all(conn)
+
+        self.__item_mapping = {}
+
+        for item in items:
+            self.__item_mapping[item.id] = item
     def update_local(self, item: psql.Item):
         '''Set the cache item with the new value.
 
@@ -285,6 +313,350 @@ class ItemCache:
         '''
 
         self.__item_mapping[item.id] = item
+    def remove_local(self, item_id: str):
+        del self.__item_mapping[item_id]
+
+class EquipmentCache:
+    '''A wrapper around `dict[int, dict[str, psql.Equipment]]`, indexed by `(user_id, eq_type)`.
+
+    Since a user can only equip one tool of each type but many different potions, tools are stored under their equipment type (`_pickaxe`, `_sword`, `_axe`)
+    while potions are stored under their id (`fire_potion`, `luck_potion`, etc.). The getters accept either of them and return a deep copy of the desired object.
+
+    This cache is write-through: the methods that modify equipments run the SQL functions then update the cache, so equipments should
+    only be modified via these methods instead of `psql.Equipment`. When they're used within a transaction, open it with `transaction()`
+    so the cache doesn't keep the changes of a transaction that is rolled back.
+
+    Warnings
+    --------
+    A cache should be used immediately upon fetching. You must periodically refresh the data if you use it in a session-like setting,
+    otherwise, two or more cache might exist at the same time, causing some sort of "data race" when updating.
+    '''
+
+    def __init__(self) -> None:
+        self.__equipment_mapping: dict[int, dict[str, psql.Equipment]] = {}
+
+    @staticmethod
+    def _slot_of(eq_type_or_id: str) -> str:
+        if eq_type_or_id.startswith('_') or psql.Equipment.is_potion(eq_type_or_id):
+            return eq_type_or_id
+        return psql.Equipment.get_equipment_type(eq_type_or_id)
+
+    def get(self, user_id: int, eq_type_or_id: str) -> psql.Equipment | None:
+        '''Return a copy of the user's equipment matching the equipment's type or id, or `None` if none was found.'''
+
+        equipment = self.__equipment_mapping.get(user_id, {}).get(self._slot_of(eq_type_or_id))
+        if equipment is None:
+            return None
+        if not eq_type_or_id.startswith('_') and equipment.item_id != eq_type_or_id:
+            return None
+        return copy.deepcopy(equipment)
+    def filter(self, user_id: int, eq_types_or_ids: t.Sequence[str]) -> tuple[psql.Equipment | None]:
+        '''Return a copy of the user's equipments matching the equipments' types or ids.
+
+        The order of these equipments (including `None`) matches the order of `eq_types_or_ids`.
+        '''
+
+        return tuple(self.get(user_id, eq_type_or_id) for eq_type_or_id in eq_types_or_ids)
+    def get_user_equipments(self, user_id: int) -> list[psql.Equipment]:
+        '''Return a copy of all the user's equipments.'''
+
+        return [copy.deepcopy(equipment) for equipment in self.__equipment_mapping.get(user_id, {}).values()]
+    def get_user_potions(self, user_id: int) -> list[psql.Equipment]:
+        '''Return a copy of all the user's potions.'''
+
+        return [copy.deepcopy(equipment) for equipment in self.__equipment_mapping.get(user_id, {}).values() if equipment.eq_type == "_potion"]
+    def count(self, user_id: int) -> int:
+        '''Return the amount of equipments the user currently has.'''
+
+        return len(self.__equipment_mapping.get(user_id, {}))
+
+    @contextlib.asynccontextmanager
+    async def transaction(self, conn: asyncpg.Connection, user_id: int) -> t.AsyncIterator[None]:
+        '''Open a transaction in which the user's equipments are modified.
+
+        The cache is updated as soon as each statement runs, so if the transaction is rolled back, the user's equipments are
+        reloaded from the database. If that also fails, the user is dropped from the cache and must be resynced via `force-sync-cache`.
+
+        Parameters
+        ----------
+        conn : asyncpg.Connection
+            The connection to open the transaction on.
+        user_id : int
+            The user whose equipments are modified.
+        '''
+        try:
+            async with conn.transaction():
+                yield
+        except BaseException:
+            try:
+                await self.update_from_db(conn, user_id)
+            except Exception as e: # pylint: disable=broad-exception-caught
+                logger.warning("Unable to reload the equipments of user %d after a rollback: %s", user_id, e)
+                self.__equipment_mapping.pop(user_id, None)
+            raise
+
+    async def transfer_from_inventory(self, conn: asyncpg.Connection, inventory: psql.Inventory) -> int:
+        '''Transfer an equipment from the inventory and add it to the cache.
+
+        See `psql.Equipment.transfer_from_inventory()` for more information.
+        '''
+
+        status = await psql.Equipment.transfer_from_inventory(conn, inventory)
+        if status:
+            traits = psql.Equipment.get_item_traits(inventory.item_id)
+            if traits.durability is not None:
+                self.update_local(psql.Equipment(inventory.user_id, inventory.item_id, traits.eq_type, traits.durability))
+            else:
+                await self.update_from_db(conn, inventory.user_id)
+        return status
+    async def update_durability(self, conn: asyncpg.Connection, user_id: int, item_id: str, new_durability: int) -> int:
+        '''Update an equipment's durability and remove if needed.'''
+
+        status = await psql.Equipment.update_durability(conn, user_id, item_id, new_durability)
+        if new_durability <= 0:
+            self.remove_local(user_id, item_id)
+        elif (equipment := self.__equipment_mapping.get(user_id, {}).get(self._slot_of(item_id))) is not None:
+            equipment.remain_durability = new_durability
+        return status
+    async def consume_durability(self, conn: asyncpg.Connection, user_id: int, item_ids: t.Sequence[str]) -> dict[str, int]:
+        '''Decrease the durability of multiple equipments by 1 and remove the ones that broke.
+
+        See `psql.Equipment.consume_durability()` for more information.
+        '''
+
+        remaining = await psql.Equipment.consume_durability(conn, user_id, item_ids)
+        for item_id, durability in remaining.items():
+            if durability <= 0:
+                self.remove_local(user_id, item_id)
+            elif (equipment := self.__equipment_mapping.get(user_id, {}).get(self._slot_of(item_id))) is not None:
+                equipment.remain_durability = durability
+        return remaining
+    async def delete(self, conn: asyncpg.Connection, user_id: int, item_id: str) -> int:
+        '''Delete an equipment of a user.'''
+
+        status = await psql.Equipment.delete(conn, user_id = user_id, item_id = item_id)
+        self.remove_local(user_id, item_id)
+        return status
+    async def delete_user_equipments(self, conn: asyncpg.Connection, user_id: int, *, exclude: t.Sequence[str] = ()) -> int:
+        '''Delete all equipments of a user, except the ones in `exclude`.'''
+
+        status = await psql.Equipment.delete_user_equipments(conn, user_id, exclude = exclude)
+        kept = {slot: equipment for slot, equipment in self.__equipment_mapping.get(user_id, {}).items() if equipment.item_id in exclude}
+        if kept:
+            self.__equipment_mapping[user_id] = kept
+        else:
+            self.__equipment_mapping.pop(user_id, None)
+        return status
+    async def update_from_db(self, conn: asyncpg.Connection, user_id: int):
+        equipments = await psql.Equipment.fetch_user_equipments(conn, user_id)
+
+        self.__equipment_mapping.pop(user_id, None)
+        for equipment in equipments:
+            self.update_local(equipment)
+    async def update_all_from_db(self, conn: asyncpg.Connection):
+        equipments = await psql.Equipment.fetch_all(conn)
+
+        self.__equipment_mapping = {}
+        for equipment in equipments:
+            self.update_local(equipment)
+    def update_local(self, equipment: psql.Equipment):
+        self.__equipment_mapping.setdefault(equipment.user_id, {})[self._slot_of(equipment.item_id)] = equipment
+    def remove_local(self, user_id: int, item_id: str):
+        equipments = self.__equipment_mapping.get(user_id)
+        if equipments is None:
+            return
+
+        slot = self._slot_of(item_id)
+        if slot in equipments and equipments[slot].item_id == item_id:
+            del equipments[slot]
+        if not equipments:
+            del self.__equipment_mapping[user_id]
+
+class InventoryCache:
+    '''A read-only cache of the users' inventories, for read-heavy commands such as `inventory view`.
+
+    An entry is invalidated whenever the user's inventory is modified via `psql.Inventory` (see `psql.add_inventory_hook()`), and again once
+    the modifying transaction ends, so a read racing with the transaction can't keep the old rows around. Entries also expire after `ttl`
+    seconds as a safety net for writes that don't go through `psql.Inventory`.
+
+    Warnings
+    --------
+    The returned inventories are shared and must not be modified. This is a read model; always use `psql.Inventory` for anything that writes.
+    '''
+
+    def __init__(self, max_users: int = 1024, ttl: float = 120.0) -> None:
+        '''
+        Parameters
+        ----------
+        max_users : int, optional
+            The max amount of inventories to keep. The least recently used one is dropped first. Default to 1024.
+        ttl : float, optional
+            The amount of seconds an inventory is kept before it must be fetched again. Default to 120.
+        '''
+        self.max_users = max_users
+        self.ttl = ttl
+
+        self.__inventory_mapping: collections.OrderedDict[int, tuple[float, tuple[psql.Inventory, ...]]] = collections.OrderedDict()
+        # A fetch only fills the cache if the inventory is not modified while fetching.
+        self.__loading: dict[int, object] = {}
+
+    async def get_user_inventory(self, conn: asyncpg.Connection, user_id: int) -> tuple[psql.Inventory, ...]:
+        '''Return the user's inventory, sorted by amount in descending order.
+
+        Parameters
+        ----------
+        conn : asyncpg.Connection
+            The connection to use if the inventory is not cached.
+        user_id : int
+            The user's id.
+
+        Returns
+        -------
+        tuple[psql.Inventory, ...]
+            The user's inventory.
+        '''
+        entry = self.__inventory_mapping.get(user_id)
+        if entry is not None and time.monotonic() - entry[0] < self.ttl:
+            self.__inventory_mapping.move_to_end(user_id)
+            return entry[1]
+
+        token = self.__loading[user_id] = object()
+        fetched_at = time.monotonic()
+        inventories = tuple(await psql.Inventory.get_user_inventory(conn, user_id))
+        if self.__loading.get(user_id) is token:
+            del self.__loading[user_id]
+            self.__inventory_mapping[user_id] = (fetched_at, inventories)
+            self.__inventory_mapping.move_to_end(user_id)
+            while len(self.__inventory_mapping) > self.max_users:
+                self.__inventory_mapping.popitem(last = False)
+        return inventories
+    def invalidate(self, user_id: int) -> None:
+        '''Drop the user's cached inventory. This is registered as an inventory hook.'''
+
+        self.__inventory_mapping.pop(user_id, None)
+        self.__loading.pop(user_id, None)
+    def clear(self) -> None:
+        self.__inventory_mapping.clear()
+        self.__loading.clear()
+
+@dataclass(slots = True)
+class GuildStats:
+    '''Aggregated info of a guild, used by `info server` and `info role`.'''
+
+    channel_types: dict[int, hikari.ChannelType] = field(default_factory = dict)
+    channel_counts: collections.Counter[hikari.ChannelType] = field(default_factory = collections.Counter)
+    member_roles: dict[int, frozenset[int]] = field(default_factory = dict)
+    role_members: dict[int, set[int]] = field(default_factory = dict)
+    bot_ids: set[int] = field(default_factory = set)
+
+    @property
+    def member_count(self) -> int:
+        return len(self.member_roles)
+    @property
+    def bot_count(self) -> int:
+        return len(self.bot_ids)
+    @property
+    def human_count(self) -> int:
+        return len(self.member_roles) - len(self.bot_ids)
+    
+    def get_role_members(self, role_id: int) -> set[int]:
+        '''Return the ids of the members having this role. The set is shared and must not be modified.'''
+        return self.role_members.get(role_id, set())
+
+    def set_member(self, member: hikari.Member) -> None:
+        old_roles = self.member_roles.get(member.id, frozenset())
+        new_roles = frozenset(member.role_ids)
+        self.member_roles[member.id] = new_roles
+
+        for role_id in old_roles - new_roles:
+            self.__unlink(role_id, member.id)
+        for role_id in new_roles - old_roles:
+            self.role_members.setdefault(role_id, set()).add(member.id)
+        
+        if member.is_bot:
+            self.bot_ids.add(member.id)
+    def remove_member(self, user_id: int) -> None:
+        for role_id in self.member_roles.pop(user_id, ()):
+            self.__unlink(role_id, user_id)
+        self.bot_ids.discard(user_id)
+    def remove_role(self, role_id: int) -> None:
+        for member_id in self.role_members.pop(role_id, ()):
+            self.member_roles[member_id] = self.member_roles[member_id] - {role_id}
+    def set_channel(self, channel: hikari.GuildChannel) -> None:
+        self.remove_channel(channel.id)
+        self.channel_types[channel.id] = channel.type
+        self.channel_counts[channel.type] += 1
+    def remove_channel(self, channel_id: int) -> None:
+        channel_type = self.channel_types.pop(channel_id, None)
+        if channel_type is not None:
+            self.channel_counts[channel_type] -= 1
+    
+    def __unlink(self, role_id: int, member_id: int) -> None:
+        members = self.role_members.get(role_id)
+        if members is not None:
+            members.discard(member_id)
+            if not members:
+                del self.role_members[role_id]
+
+class GuildStatsCache:
+    '''Keep a `GuildStats` for each guild up to date, so the info commands don't scan every member and channel.
+
+    A guild's stats are built from hikari's cache the first time they're requested. After that, they're only updated through
+    the member, channel and role events (see `events/misc_events.py`), so a request costs nothing regardless of the guild's size.
+    Events for guilds that are not built yet are ignored, since the build will read the already updated cache anyway.
+    '''
+
+    def __init__(self) -> None:
+        self.__stats_mapping: dict[int, GuildStats] = {}
+    
+    def get(self, guild: hikari.GatewayGuild) -> GuildStats:
+        '''Return the guild's stats, building them from hikari's cache if needed.
+
+        The returned object is updated in place by later events, so don't hold onto it across awaits if you need a snapshot.
+
+        Parameters
+        ----------
+        guild : hikari.GatewayGuild
+            The guild.
+
+        Returns
+        -------
+        GuildStats
+            The guild's stats.
+        '''
+        stats = self.__stats_mapping.get(guild.id)
+        if stats is None:
+            stats = GuildStats()
+            for member in guild.get_members().values():
+                stats.set_member(member)
+            for channel in guild.get_channels().values():
+                stats.set_channel(channel)
+            self.__stats_mapping[guild.id] = stats
+        return stats
+
+    def set_member(self, member: hikari.Member) -> None:
+        stats = self.__stats_mapping.get(member.guild_id)
+        if stats is not None:
+            stats.set_member(member)
+    def remove_member(self, guild_id: int, user_id: int) -> None:
+        stats = self.__stats_mapping.get(guild_id)
+        if stats is not None:
+            stats.remove_member(user_id)
+    def remove_role(self, guild_id: int, role_id: int) -> None:
+        stats = self.__stats_mapping.get(guild_id)
+        if stats is not None:
+            stats.remove_role(role_id)
+    def set_channel(self, channel: hikari.GuildChannel) -> None:
+        stats = self.__stats_mapping.get(channel.guild_id)
+        if stats is not None:
+            stats.set_channel(channel)
+    def remove_channel(self, guild_id: int, channel_id: int) -> None:
+        stats = self.__stats_mapping.get(guild_id)
+        if stats is not None:
+            stats.remove_channel(channel_id)
+    def remove_local(self, guild_id: int) -> None:
+        '''Drop the guild's stats. They'll be rebuilt on the next `get()`.'''
+        self.__stats_mapping.pop(guild_id, None)
 
 # Reference: https://github.com/Rapptz/discord.py/blob/master/discord/colour.py
 @dataclass(frozen = True)
@@ -350,13 +722,563 @@ class NodeExtra:
     queue_loop: bool = False
     working_channel: int = 0
 
+class NowPlayingAnnouncer:
+    '''Post the "Now Playing" announcements of a channel as a single message that gets edited.
+
+    Announcements made within `delay` seconds of each other (ie. skipping several tracks) are collapsed into the latest one,
+    and REST calls are spaced at least `min_interval` seconds apart to stay well within the channel's rate limit.
+    If other messages were posted after the announcement, a new one is posted and the old one is deleted so it stays visible.
+    '''
+
+    def __init__(self, rest: hikari.api.RESTClient, channel_id: int, *, delay: float = 1.0, min_interval: float = 2.0) -> None:
+        '''
+        Parameters
+        ----------
+        rest : hikari.api.RESTClient
+            The REST client.
+        channel_id : int
+            The channel to announce in.
+        delay : float, optional
+            The amount of seconds to wait for more announcements before sending. Default to 1.
+        min_interval : float, optional
+            The minimum amount of seconds between two REST calls. Default to 2.
+        '''
+        self.rest = rest
+        self.channel_id = channel_id
+        self.delay = delay
+        self.min_interval = min_interval
+
+        self.message_id: int | None = None
+        self.__is_latest = False
+        self.__pending: str | None = None
+        self.__last_sent = -math.inf
+        self.__task: asyncio.Task | None = None
+
+    def announce(self, content: str) -> None:
+        '''Schedule an announcement. This replaces any announcement that is not sent yet.'''
+        self.__pending = content
+        if self.__task is None or self.__task.done():
+            self.__task = asyncio.get_running_loop().create_task(self.__run())
+    def mark_buried(self) -> None:
+        '''Notify that another message was posted in the channel, so the next announcement is posted anew.'''
+        self.__is_latest = False
+    def close(self) -> None:
+        '''Drop any pending announcement.'''
+        self.__pending = None
+        if self.__task is not None:
+            self.__task.cancel()
+
+    async def __run(self) -> None:
+        while self.__pending is not None:
+            await asyncio.sleep(max(self.delay, self.__last_sent + self.min_interval - time.monotonic()))
+            content, self.__pending = self.__pending, None
+            if content is None:
+                return
+            
+            self.__last_sent = time.monotonic()
+            try:
+                await self.__send(content)
+            except (hikari.ForbiddenError, hikari.NotFoundError):
+                # Can't talk in this channel anymore, nothing to do.
+                self.message_id = None
+    async def __send(self, content: str) -> None:
+        if self.message_id is not None and self.__is_latest:
+            try:
+                await self.rest.edit_message(self.channel_id, self.message_id, content)
+                return
+            except hikari.NotFoundError:
+                self.message_id = None
+        
+        old_message_id = self.message_id
+        message = await self.rest.create_message(self.channel_id, content)
+        self.message_id = message.id
+        self.__is_latest = True
+
+        if old_message_id is not None:
+            try:
+                await self.rest.delete_message(self.channel_id, old_message_id)
+            except hikari.NotFoundError:
+                pass
+
+class TrackQueue(t.MutableSequence[lavaplayer.Track]):
+    '''A drop-in replacement of `lavaplayer.Node.queue` that keeps the cumulative duration of the tracks.
+
+    Appending and removing the current track (what `lavaplayer` does on every track change) are O(1), as are
+    `len()`, indexing and `duration_between()`. Everything else (insert, remove in the middle, shuffle) rebuilds the sums in O(n).
+
+    `lavaplayer` sometimes replaces the queue with a plain `list` (ie. `shuffle()`), so use `TrackQueue.of()` to access a node's queue.
+    '''
+
+    __slots__ = ("__tracks", "__ends", "__head", "__base")
+
+    def __init__(self, tracks: t.Iterable[lavaplayer.Track] = ()) -> None:
+        # The removed tracks at the front are only compacted once they're the majority, so removing the current track is O(1) amortized.
+        self.__tracks: list[lavaplayer.Track | None] = []
+        # __ends[i] is the total length of every track up to and including i, counting the removed ones.
+        self.__ends: list[int] = []
+        self.__head = 0
+        # The total length of the removed tracks.
+        self.__base = 0
+        for track in tracks:
+            self.append(track)
+
+    @classmethod
+    def of(cls, node: lavaplayer.Node) -> "TrackQueue":
+        '''Return the node's queue, converting it into a `TrackQueue` first if needed.'''
+        if not isinstance(node.queue, cls):
+            node.queue = cls(node.queue)
+        return node.queue
+
+    def __len__(self) -> int:
+        return len(self.__tracks) - self.__head
+    def __getitem__(self, index: int | slice) -> lavaplayer.Track | list[lavaplayer.Track]:
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            return self.__tracks[self.__head + start:self.__head + stop:step]
+        return self.__tracks[self.__head + self.__normalize(index)]
+    def __setitem__(self, index: int, track: lavaplayer.Track) -> None:
+        index = self.__normalize(index)
+        self.__tracks[self.__head + index] = track
+        self.__rebuild(index)
+    def __delitem__(self, index: int) -> None:
+        index = self.__normalize(index)
+        if index == 0:
+            self.__base = self.__ends[self.__head]
+            self.__tracks[self.__head] = None
+            self.__head += 1
+            if self.__head * 2 >= len(self.__tracks):
+                self.__compact()
+        elif index == len(self) - 1:
+            self.__tracks.pop()
+            self.__ends.pop()
+        else:
+            del self.__tracks[self.__head + index]
+            self.__rebuild(index)
+    def insert(self, index: int, track: lavaplayer.Track) -> None:
+        index = max(0, min(index if index >= 0 else len(self) + index, len(self)))
+        if index == len(self):
+            self.append(track)
+            return
+        self.__tracks.insert(self.__head + index, track)
+        self.__rebuild(index)
+    def append(self, track: lavaplayer.Track) -> None:
+        last = self.__ends[-1] if self.__ends else self.__base
+        self.__tracks.append(track)
+        self.__ends.append(last + track.length)
+    def clear(self) -> None:
+        self.__tracks.clear()
+        self.__ends.clear()
+        self.__head = 0
+        self.__base = 0
+    
+    def duration_between(self, start: int = 0, stop: int | None = None) -> int:
+        '''Return the total length in milliseconds of the tracks in `[start, stop)`, same as `sum(track.length for track in queue[start:stop])`.'''
+        start, stop, _ = slice(start, stop).indices(len(self))
+        if start >= stop:
+            return 0
+        before = self.__ends[self.__head + start - 1] if self.__head + start > 0 else self.__base
+        return self.__ends[self.__head + stop - 1] - before
+
+    def __normalize(self, index: int) -> int:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("queue index out of range")
+        return index
+    def __compact(self) -> None:
+        self.__tracks = self.__tracks[self.__head:]
+        self.__ends = self.__ends[self.__head:]
+        self.__head = 0
+    def __rebuild(self, index: int) -> None:
+        # Recompute the sums from the given (live) index onward.
+        position = self.__head + index
+        del self.__ends[position:]
+        last = self.__ends[-1] if self.__ends else self.__base
+        for track in self.__tracks[position:]:
+            last += track.length
+            self.__ends.append(last)
+
+class ChangelogFeed:
+    '''Keep the latest messages of a few channels in memory and serve them as embeds.
+
+    The channels are loaded once with `preload()`, then kept current by feeding message create, update and delete events
+    into `add()`, `edit()` and `remove()`. Reading the feed never calls the API.
+    '''
+
+    def __init__(self, channel_ids: t.Iterable[int], *, limit: int = 10) -> None:
+        '''
+        Parameters
+        ----------
+        channel_ids : Iterable[int]
+            The channels to follow.
+        limit : int, optional
+            The amount of latest messages to keep per channel. Default to 10.
+        '''
+        self.limit = limit
+        # Channel id -> (message id, content) from newest to oldest, or `None` if it's not loaded yet.
+        self.__messages: dict[int, list[tuple[int, str]] | None] = {channel_id: None for channel_id in channel_ids}
+        self.__embeds: dict[int, list[hikari.Embed]] = {}
+        self.__refreshing: dict[int, asyncio.Task] = {}
+
+    def __contains__(self, channel_id: int) -> bool:
+        return channel_id in self.__messages
+
+    def is_loaded(self, channel_id: int) -> bool:
+        return self.__messages.get(channel_id) is not None
+    
+    async def refresh(self, rest: hikari.api.RESTClient, channel_id: int) -> None:
+        '''Fetch the latest messages of a channel, replacing what's stored.
+
+        Raises
+        ------
+        hikari.HTTPError
+            The channel can't be read.
+        '''
+        if channel_id not in self.__messages:
+            raise KeyError(channel_id)
+        
+        messages = await rest.fetch_messages(channel_id).limit(self.limit)
+        self.__messages[channel_id] = [(message.id, message.content or '') for message in messages]
+        self.__embeds.pop(channel_id, None)
+    async def preload(self, rest: hikari.api.RESTClient) -> None:
+        '''Load every channel. Channels that fail to load are logged and left unloaded.'''
+        results = await asyncio.gather(*[self.refresh(rest, channel_id) for channel_id in self.__messages], return_exceptions = True)
+        for channel_id, result in zip(self.__messages, results):
+            if isinstance(result, Exception):
+                logger.warning("Unable to load changelog channel %d: %s", channel_id, result)
+    
+    def add(self, message: hikari.PartialMessage) -> None:
+        '''Add a new message. Does nothing if its channel isn't followed or loaded.'''
+        messages = self.__messages.get(message.channel_id)
+        if messages is None:
+            return
+        
+        # Message ids increase over time, so keep the list sorted by id descending.
+        index = 0
+        while index < len(messages) and messages[index][0] > message.id:
+            index += 1
+        if index < len(messages) and messages[index][0] == message.id:
+            return
+        messages.insert(index, (message.id, message.content or ''))
+        del messages[self.limit:]
+        self.__embeds.pop(message.channel_id, None)
+    def edit(self, message: hikari.PartialMessage) -> None:
+        '''Update the content of a stored message. Does nothing if it isn't stored or the content didn't change.'''
+        messages = self.__messages.get(message.channel_id)
+        if messages is None or message.content is hikari.UNDEFINED:
+            return
+        
+        for index, (message_id, _) in enumerate(messages):
+            if message_id == message.id:
+                messages[index] = (message_id, message.content or '')
+                self.__embeds.pop(message.channel_id, None)
+                return
+    def remove(self, rest: hikari.api.RESTClient, channel_id: int, message_id: int) -> None:
+        '''Remove a stored message.
+
+        If the channel had a full page of messages, it is refreshed in the background to pull in the next older one.
+        '''
+        messages = self.__messages.get(channel_id)
+        if messages is None:
+            return
+        
+        was_full = len(messages) >= self.limit
+        for index, (stored_id, _) in enumerate(messages):
+            if stored_id == message_id:
+                del messages[index]
+                self.__embeds.pop(channel_id, None)
+                break
+        else:
+            return
+        
+        if was_full and (channel_id not in self.__refreshing or self.__refreshing[channel_id].done()):
+            self.__refreshing[channel_id] = asyncio.get_running_loop().create_task(self.__background_refresh(rest, channel_id))
+    async def __background_refresh(self, rest: hikari.api.RESTClient, channel_id: int) -> None:
+        try:
+            await self.refresh(rest, channel_id)
+        except hikari.HTTPError as e:
+            logger.warning("Unable to refresh changelog channel %d: %s", channel_id, e)
+
+    def get_embeds(self, channel_id: int) -> list[hikari.Embed] | None:
+        '''Return the messages of a channel as embeds, from newest to oldest.
+
+        The embeds are shared between calls, so copy them before adding anything to them.
+
+        Returns
+        -------
+        list[hikari.Embed] | None
+            The embeds, or `None` if the channel isn't loaded.
+        '''
+        messages = self.__messages.get(channel_id)
+        if messages is None:
+            return None
+        
+        embeds = self.__embeds.get(channel_id)
+        if embeds is None:
+            embeds = [hikari.Embed(description = content, color = DefaultColor.green) for _, content in messages]
+            self.__embeds[channel_id] = embeds
+        return embeds
+
+class TrackCache:
+    '''A shared cache of resolved Lavalink queries, used by `play` and `search`.
+
+    Entries are keyed by the normalized query and expire after `ttl` seconds. The cache is bounded by the total size of the encoded tracks;
+    the least recently used entries are dropped first. Concurrent lookups of the same query share a single request to Lavalink.
+
+    Empty results and errors are never cached.
+    '''
+
+    def __init__(self, max_bytes: int = 16 * 1024 * 1024, ttl: float = 1800.0) -> None:
+        '''
+        Parameters
+        ----------
+        max_bytes : int, optional
+            The max total length of the encoded tracks to keep. Default to 16 MiB.
+        ttl : float, optional
+            The amount of seconds a result is kept. Default to 30 minutes.
+        '''
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+
+        # {query: (fetched_at, size, result)}
+        self.__entries: collections.OrderedDict[str, tuple[float, int, list[lavaplayer.Track] | lavaplayer.PlayList]] = collections.OrderedDict()
+        self.__size = 0
+        self.__inflight: dict[str, asyncio.Task] = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+    
+    def __len__(self) -> int:
+        return len(self.__entries)
+    @property
+    def size(self) -> int:
+        '''The total length of the encoded tracks currently cached.'''
+        return self.__size
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses + self.coalesced
+        return (self.hits + self.coalesced) / lookups if lookups else 0.0
+
+    @staticmethod
+    def normalize(query: str) -> str:
+        '''Return the cache key of a query.
+
+        URLs are only stripped since their path and parameters might be case-sensitive. Searches are case-insensitive and ignore extra whitespaces.
+        '''
+        query = query.strip()
+        if "http" in query:
+            return query
+        return ' '.join(query.split()).casefold()
+
+    async def resolve(self, lavalink: lavaplayer.LavalinkClient, query: str) -> list[lavaplayer.Track] | lavaplayer.PlayList | None:
+        '''Resolve the query, same as `lavalink.auto_search_tracks()`.
+
+        Parameters
+        ----------
+        lavalink : lavaplayer.LavalinkClient
+            The client to use on a miss. Anything with a compatible `auto_search_tracks()` works.
+        query : str
+            The query (url, name, etc.).
+
+        Returns
+        -------
+        list[lavaplayer.Track] | lavaplayer.PlayList | None
+            The result. Tracks are copies, so they can be modified freely (ie. `lavalink.play()` sets the requester).
+        '''
+        key = self.normalize(query)
+
+        entry = self.__entries.get(key)
+        if entry is not None:
+            if time.monotonic() - entry[0] < self.ttl:
+                self.__entries.move_to_end(key)
+                self.hits += 1
+                return self.__copy(entry[2])
+            self.__remove(key)
+        
+        lookup = self.__inflight.get(key)
+        if lookup is not None:
+            self.coalesced += 1
+        else:
+            self.misses += 1
+            lookup = self.__inflight[key] = asyncio.get_running_loop().create_task(self.__lookup(lavalink, key, query))
+            # The error is re-raised to the waiters; this only silences the warning if they're all gone.
+            lookup.add_done_callback(lambda task: task.cancelled() or task.exception())
+        # The lookup runs on its own task so a cancelled command doesn't cancel it for the others.
+        return self.__copy(await asyncio.shield(lookup))
+
+    async def __lookup(self, lavalink: lavaplayer.LavalinkClient, key: str, query: str) -> list[lavaplayer.Track] | lavaplayer.PlayList | None:
+        try:
+            result = await lavalink.auto_search_tracks(query)
+        finally:
+            del self.__inflight[key]
+        
+        if result and (isinstance(result, list) or result.tracks):
+            self.__store(key, result)
+        return result
+
+    def clear(self) -> None:
+        self.__entries.clear()
+        self.__size = 0
+    def reset_stats(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+    def to_dict(self) -> dict[str, t.Any]:
+        return {
+            "entries": len(self.__entries),
+            "bytes": self.__size,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+            "hit_rate": self.hit_rate,
+        }
+    
+    @staticmethod
+    def __tracks_of(result: list[lavaplayer.Track] | lavaplayer.PlayList) -> list[lavaplayer.Track]:
+        return result if isinstance(result, list) else result.tracks
+    @staticmethod
+    def __copy(result: list[lavaplayer.Track] | lavaplayer.PlayList | None) -> list[lavaplayer.Track] | lavaplayer.PlayList | None:
+        if isinstance(result, list):
+            return [copy.copy(track) for track in result]
+        if isinstance(result, lavaplayer.PlayList):
+            return lavaplayer.PlayList(result.name, result.selected_track, [copy.copy(track) for track in result.tracks])
+        return result
+    def __store(self, key: str, result: list[lavaplayer.Track] | lavaplayer.PlayList) -> None:
+        size = sum(len(track.track) for track in self.__tracks_of(result))
+        if size > self.max_bytes:
+            return
+
+        self.__remove(key)
+        self.__entries[key] = (time.monotonic(), size, result)
+        self.__size += size
+        while self.__size > self.max_bytes:
+            oldest = next(iter(self.__entries))
+            self.__remove(oldest)
+            self.evictions += 1
+    def __remove(self, key: str) -> None:
+        entry = self.__entries.pop(key, None)
+        if entry is not None:
+            self.__size -= entry[1]
+
+class CircuitBreaker:
+    '''Stop calling a failing service for a while.
+
+    After `failure_threshold` consecutive failures the breaker opens and `allow()` returns `False` for `reset_timeout` seconds.
+    After that, one trial call is allowed: a success closes the breaker, a failure opens it again.
+    '''
+
+    def __init__(self, *, failure_threshold: int = 3, reset_timeout: float = 60.0) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.__opened_at: float | None = None
+        self.__trial = False
+    
+    @property
+    def is_open(self) -> bool:
+        return self.__opened_at is not None
+    def allow(self) -> bool:
+        '''Return whether a call should be attempted now.'''
+        if self.__opened_at is None:
+            return True
+        if self.__trial or time.monotonic() - self.__opened_at < self.reset_timeout:
+            return False
+        self.__trial = True
+        return True
+    def record_success(self) -> None:
+        self.failures = 0
+        self.__opened_at = None
+        self.__trial = False
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.__trial or self.failures >= self.failure_threshold:
+            self.__opened_at = time.monotonic()
+        self.__trial = False
+
+class PrefetchBuffer(t.Generic[T]):
+    '''A buffer of items fetched ahead of time from a slow source.
+
+    `take()` never waits on the source: it pops a buffered item, and if the buffer drops below `low_water`,
+    starts a background task to fill it back to `capacity`. A refill makes at most `capacity` fetches, so duplicates may leave it short. Fetches go through a `CircuitBreaker`, so a source that is down
+    isn't hammered on every `take()`.
+    '''
+
+    def __init__(self, fetch: t.Callable[[], t.Awaitable[T]], *, capacity: int = 20, low_water: int = 5, breaker: CircuitBreaker | None = None) -> None:
+        '''
+        Parameters
+        ----------
+        fetch : Callable[[], Awaitable[T]]
+            Fetch one item. Any exception counts as a failure.
+        capacity : int, optional
+            The maximum amount of buffered items. Default to 20.
+        low_water : int, optional
+            Refill when fewer than this many items are left. Default to 5.
+        breaker : CircuitBreaker | None, optional
+            The breaker to guard `fetch` with. A default one is created if not provided.
+        '''
+        self.__fetch = fetch
+        self.capacity = capacity
+        self.low_water = low_water
+        self.breaker = breaker if breaker is not None else CircuitBreaker()
+        self.__items: collections.deque[T] = collections.deque(maxlen = capacity)
+        self.__task: asyncio.Task | None = None
+    
+    def __len__(self) -> int:
+        return len(self.__items)
+    
+    def take(self) -> T | None:
+        '''Pop the oldest buffered item, or return `None` if the buffer is empty.'''
+        item = self.__items.popleft() if self.__items else None
+        if len(self.__items) < self.low_water:
+            self.refill()
+        return item
+    def refill(self) -> asyncio.Task | None:
+        '''Start filling the buffer in the background if it isn't already.
+
+        Returns
+        -------
+        asyncio.Task | None
+            The refill task, or `None` if the breaker is open.
+        '''
+        if self.__task is not None and not self.__task.done():
+            return self.__task
+        if not self.breaker.allow():
+            return None
+        self.__task = asyncio.get_running_loop().create_task(self.__refill(first_allowed = True))
+        return self.__task
+    
+    async def __refill(self, first_allowed: bool) -> None:
+        # A source that keeps returning items already buffered would otherwise be called in a loop.
+        for _ in range(self.capacity):
+            if len(self.__items) >= self.capacity:
+                return
+            if not first_allowed and not self.breaker.allow():
+                return
+            first_allowed = False
+            
+            try:
+                item = await self.__fetch()
+            except Exception as e: # pylint: disable=broad-exception-caught
+                self.breaker.record_failure()
+                logger.warning("Prefetch failed (%d in a row): %s", self.breaker.failures, e)
+                return
+            
+            self.breaker.record_success()
+            if item not in self.__items:
+                self.__items.append(item)
+
 @dataclass
 class CommandActiveSessionManager:
     '''A manager to enforce strict command concurrency.
 
     In `lightbulb`, if a command is implemented under two or more types of commands, concurrency will apply to those types individually.
     This leads to a scenario where you want to force a command `test` to be 1, but you can bypass by using `$test` and `/test`.
-    This class provide a naive container to manage the remaining sessions of the command, regardless of its type.
+    This class provide a container to manage the active sessions of the command, regardless of its type.
     
     For command creators, to use this class, simply includes the `checks.strict_concurrency` check on top of `lightbulb.set_max_concurrency()`.
     ```py
@@ -378,14 +1300,20 @@ class CommandActiveSessionManager:
     # After command is finished.
     bot.command_concurrency_manager.release_session(ctx)
     ```
+
+    Notes
+    -----
+    Only buckets with at least one active session are stored. Once a bucket releases all of its sessions, its entry is removed,
+    so the memory used is proportional to the amount of commands currently running, not the amount of users that ever ran them.
     '''
-    # The idea is to create one instance of this in the bot, with `count` containing the max active sessions.
-    # Then for each command invocation that has concurrency registered, we decrease count by 1 until it reaches 0.
-    # If it reaches 0 and still decrease, we raise error.
-    # When the command finish, we increase the count by 1.
+    # Each entry in `_active_sessions` is keyed by `(qualname, bucket_hash)` and counts the sessions currently in use.
+    # Acquiring increases the count until it reaches the command's max uses, at which point we raise error.
+    # Releasing decreases the count, and the entry is deleted once it reaches 0.
 
-    _active_session_mapping: dict[str, dict[int, int]] = field(default_factory = dict)
+    _active_sessions: dict[tuple[str, int], int] = field(default_factory = dict)
     _bucket_storing: dict[str, tuple[int, type[lightbulb.Bucket]]] = field(default_factory = dict)
+    _active_per_command: dict[str, int] = field(default_factory = dict)
+    _peak_per_command: dict[str, int] = field(default_factory = dict)
 
     def _register(self, qualname: str, uses: int, bucket: type[lightbulb.Bucket]) -> None:
         '''Register a command to this manager.
@@ -414,7 +1342,7 @@ class CommandActiveSessionManager:
         bool
             Whether the command is registered to the manager or not.
         '''
-        return bool(self._bucket_storing.get(qualname))
+        return qualname in self._bucket_storing
     def acquire_session(self, ctx: lightbulb.Context) -> None:
         '''Acquire one session under the context provided.
 
@@ -434,23 +1362,22 @@ class CommandActiveSessionManager:
         command = ctx.command
         qualname = command.qualname
         if not self.command_registered(qualname):
-            self._register(command.qualname, command.max_concurrency[0], command.max_concurrency[1])
+            self._register(qualname, command.max_concurrency[0], command.max_concurrency[1])
+            if not self.command_registered(qualname):
+                return
         
         # Get the discord's id to determine the scope of active command.
-        cmd_bucket = self._bucket_storing[qualname]
-        session_id = cmd_bucket[1].extract_hash(ctx)
-        # If this command has never been invoked then we add it to the map and use 1 session.
-        if not self._active_session_mapping.get(qualname):
-            self._active_session_mapping[qualname] = {session_id: cmd_bucket[0] - 1}
-        else:
-            ctx_session = self._active_session_mapping[qualname].get(session_id)
-            # If we have no value for the ctx (for some reasons), we add again and take away 1 session.
-            if ctx_session is None:
-                self._active_session_mapping[qualname] = {session_id: cmd_bucket[0] - 1}
-            elif ctx_session <= 0:
-                raise lightbulb.MaxConcurrencyLimitReached(f"Maximum concurrency limit for command '{qualname}' exceeded.")
-            else:
-                self._active_session_mapping[qualname][session_id] -= 1
+        uses, bucket = self._bucket_storing[qualname]
+        key = (qualname, bucket.extract_hash(ctx))
+        in_use = self._active_sessions.get(key, 0)
+        if in_use >= uses:
+            raise lightbulb.MaxConcurrencyLimitReached(f"Maximum concurrency limit for command '{qualname}' exceeded.")
+        
+        self._active_sessions[key] = in_use + 1
+        active = self._active_per_command.get(qualname, 0) + 1
+        self._active_per_command[qualname] = active
+        if active > self._peak_per_command.get(qualname, 0):
+            self._peak_per_command[qualname] = active
     def release_session(self, ctx: lightbulb.Context) -> None:
         '''Release one session under the context provided.
 
@@ -464,17 +1391,1133 @@ class CommandActiveSessionManager:
         if not self.command_registered(qualname):
             return
         
-        cmd_bucket = self._bucket_storing[qualname]
-        session_id = cmd_bucket[1].extract_hash(ctx)
-        if self._active_session_mapping.get(qualname):
-            ctx_session = self._active_session_mapping[qualname].get(session_id)
-            if ctx_session is not None:
-                self._active_session_mapping[qualname][session_id] += 1
+        _, bucket = self._bucket_storing[qualname]
+        key = (qualname, bucket.extract_hash(ctx))
+        in_use = self._active_sessions.get(key)
+        if in_use is None:
+            return
+        
+        if in_use <= 1:
+            del self._active_sessions[key]
+        else:
+            self._active_sessions[key] = in_use - 1
+        
+        active = self._active_per_command[qualname] - 1
+        if active <= 0:
+            del self._active_per_command[qualname]
+        else:
+            self._active_per_command[qualname] = active
+    def active_sessions(self, qualname: str) -> int:
+        '''Return the number of sessions currently in use by a command across all of its buckets.
+
+        Parameters
+        ----------
+        qualname : str
+            The command's full name.
+
+        Returns
+        -------
+        int
+            The number of active sessions.
+        '''
+        return self._active_per_command.get(qualname, 0)
+    def gauges(self) -> dict[str, tuple[int, int, int]]:
+        '''Return a snapshot of the active sessions of every registered command.
+
+        Returns
+        -------
+        dict[str, tuple[int, int, int]]
+            A mapping of the command's full name to `(active, peak, max_uses)`.
+            `active` is the number of sessions in use across all buckets, `peak` is the highest `active` seen since the last reset,
+            and `max_uses` is the limit of a single bucket.
+        '''
+        return {
+            qualname: (self._active_per_command.get(qualname, 0), self._peak_per_command.get(qualname, 0), uses)
+            for qualname, (uses, _) in self._bucket_storing.items()
+        }
     def clear_all_sessions(self) -> None:
         '''Clear all active sessions.
         This should only be used when there's a major error in this manager.
         '''
-        self._active_session_mapping = {}
+        self._active_sessions = {}
+        self._active_per_command = {}
+        self._peak_per_command = {}
+
+current_context: contextvars.ContextVar[lightbulb.Context | None] = contextvars.ContextVar("current_context", default = None)
+'''The context of the command currently running in this task, or `None` if the task is not a command invocation.'''
+
+def current_command_name() -> str:
+    '''Return the qualname of the command currently running in this task.
+
+    Returns
+    -------
+    str
+        The command's full name, or `<background>` if the code isn't running under a command (listeners, tasks, etc.).
+    '''
+    ctx = current_context.get()
+    if ctx is None:
+        return "<background>"
+    command = ctx.invoked or ctx.command
+    return command.qualname if command is not None else "<unknown>"
+
+@dataclass(slots = True)
+class LatencyHistogram:
+    '''A fixed-size latency histogram with logarithmic buckets.
+
+    Memory usage is constant no matter how many samples are recorded. Percentiles are approximated by the upper bound of the bucket they fall in.
+    '''
+
+    BOUNDS: t.ClassVar[tuple[float, ...]] = (0.5, 1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, float("inf"))
+    '''The upper bound of each bucket, in milliseconds.'''
+
+    counts: list[int] = field(default_factory = lambda: [0] * len(LatencyHistogram.BOUNDS))
+    count: int = 0
+    total: float = 0
+    max: float = 0
+
+    def record(self, seconds: float) -> None:
+        '''Record a sample.
+
+        Parameters
+        ----------
+        seconds : float
+            The sample, in seconds.
+        '''
+        ms = seconds * 1000
+        self.counts[bisect.bisect_left(LatencyHistogram.BOUNDS, ms)] += 1
+        self.count += 1
+        self.total += ms
+        if ms > self.max:
+            self.max = ms
+    def percentile(self, p: float) -> float:
+        '''Return the approximated `p`-th percentile in milliseconds, or `0` if there are no samples.
+
+        Parameters
+        ----------
+        p : float
+            The percentile, between 0 and 100.
+        '''
+        if self.count == 0:
+            return 0
+        
+        rank = self.count * p / 100
+        seen = 0
+        for bound, count in zip(LatencyHistogram.BOUNDS, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+    @property
+    def mean(self) -> float:
+        '''The average sample in milliseconds, or `0` if there are no samples.'''
+        return self.total / self.count if self.count else 0
+    def to_dict(self) -> dict[str, t.Any]:
+        return {
+            "count": self.count,
+            "total_ms": round(self.total, 3),
+            "mean_ms": round(self.mean, 3),
+            "max_ms": round(self.max, 3),
+            "p50_ms": self.percentile(50),
+            "p95_ms": self.percentile(95),
+            "p99_ms": self.percentile(99),
+            "buckets": {str(bound): count for bound, count in zip(LatencyHistogram.BOUNDS, self.counts) if count},
+        }
+
+@dataclass(slots = True)
+class QueryStat:
+    '''Aggregated statistics of one query shape under one command.'''
+
+    shape: str
+    command: str
+    rows: int = 0
+    latency: LatencyHistogram = field(default_factory = LatencyHistogram)
+
+    def to_dict(self) -> dict[str, t.Any]:
+        return {
+            "shape": self.shape,
+            "command": self.command,
+            "calls": self.latency.count,
+            "rows": self.rows,
+            "latency": self.latency.to_dict(),
+        }
+
+class QueryStatsCollector:
+    '''Collect latency, row counts and call counts of every query run through `psql`, keyed by query shape and by the invoking command.
+
+    An instance is registered as a query hook in `MichaelBot` construction. The number of tracked `(shape, command)` pairs is capped;
+    once the cap is reached, new pairs are merged into a single overflow entry so memory stays bounded.
+    '''
+
+    OVERFLOW_KEY: t.ClassVar[str] = "<overflow>"
+
+    def __init__(self, max_entries: int = 512) -> None:
+        '''
+        Parameters
+        ----------
+        max_entries : int, optional
+            The maximum amount of `(shape, command)` pairs to track, by default 512.
+        '''
+        self.max_entries = max_entries
+        self.started_at = dt.datetime.now().astimezone()
+        self.__stats: dict[tuple[str, str], QueryStat] = {}
+        self.__shapes: dict[str, str] = {}
+
+    def _shape_of(self, query: str) -> str:
+        shape = self.__shapes.get(query)
+        if shape is None:
+            shape = ' '.join(query.split())
+            if len(self.__shapes) < self.max_entries:
+                self.__shapes[query] = shape
+        return shape
+    def record(self, query: str, elapsed: float, row_count: int) -> None:
+        '''Record a query. This is meant to be used as a `psql.QueryHook`.
+
+        Parameters
+        ----------
+        query : str
+            The query that was run.
+        elapsed : float
+            How long the query took, in seconds.
+        row_count : int
+            The amount of rows returned or affected.
+        '''
+        key = (self._shape_of(query), current_command_name())
+        stat = self.__stats.get(key)
+        if stat is None:
+            if len(self.__stats) >= self.max_entries:
+                key = (QueryStatsCollector.OVERFLOW_KEY, QueryStatsCollector.OVERFLOW_KEY)
+                stat = self.__stats.get(key)
+            if stat is None:
+                stat = QueryStat(*key)
+                self.__stats[key] = stat
+        
+        stat.rows += row_count
+        stat.latency.record(elapsed)
+    def top(self, n: int = 10, *, command: str | None = None, sort_by: str = "total") -> list[QueryStat]:
+        '''Return the top `n` entries.
+
+        Parameters
+        ----------
+        n : int, optional
+            The amount of entries to return, by default 10.
+        command : str | None, optional
+            Only return entries under this command's full name, by default `None` (all commands).
+        sort_by : str, optional
+            One of `total`, `calls`, `mean`, `p95`, `rows`. By default `total`.
+
+        Returns
+        -------
+        list[QueryStat]
+            The entries, in descending order.
+        '''
+        sort_keys: dict[str, t.Callable[[QueryStat], float]] = {
+            "total": lambda stat: stat.latency.total,
+            "calls": lambda stat: stat.latency.count,
+            "mean": lambda stat: stat.latency.mean,
+            "p95": lambda stat: stat.latency.percentile(95),
+            "rows": lambda stat: stat.rows,
+        }
+        stats = [stat for stat in self.__stats.values() if command is None or stat.command == command]
+        return sorted(stats, key = sort_keys.get(sort_by, sort_keys["total"]), reverse = True)[:n]
+    def to_dict(self) -> dict[str, t.Any]:
+        '''Return a JSON-serializable snapshot of all entries.'''
+        return {
+            "since": self.started_at.isoformat(),
+            "entries": [stat.to_dict() for stat in self.top(len(self.__stats))],
+        }
+    def reset(self) -> None:
+        '''Drop all recorded statistics.'''
+        self.started_at = dt.datetime.now().astimezone()
+        self.__stats = {}
+        self.__shapes = {}
+
+@dataclass(slots = True)
+class CommandSample:
+    '''The time breakdown of a single command invocation. All durations are in seconds.'''
+
+    qualname: str
+    started: float = field(default_factory = time.perf_counter)
+    wall: float = 0
+    pool_wait: float = 0
+    db: float = 0
+    rest: float = 0
+    lag: float = 0
+    failed: bool = False
+
+    def _record_lag(self, scheduled: float) -> None:
+        self.lag = time.perf_counter() - scheduled
+    @property
+    def other(self) -> float:
+        '''The time not accounted by any other category (mostly Python code and awaiting other things).'''
+        return max(self.wall - self.pool_wait - self.db - self.rest - self.lag, 0)
+
+current_sample: contextvars.ContextVar[CommandSample | None] = contextvars.ContextVar("current_sample", default = None)
+'''The profiling sample of the command currently running in this task, or `None` if the task is not a command invocation.'''
+
+def _record_sample_db(_query: str, elapsed: float, _row_count: int) -> None:
+    sample = current_sample.get()
+    if sample is not None:
+        sample.db += elapsed
+@contextlib.contextmanager
+def rest_timer() -> t.Iterator[None]:
+    '''Attribute the time spent in the block to the REST category of the running command's sample.
+
+    Responses through the command's context are already timed; use this around direct `bot.rest` calls made by commands.
+    '''
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        sample = current_sample.get()
+        if sample is not None:
+            sample.rest += time.perf_counter() - started
+
+class CommandProfile:
+    '''The rolling statistics of a command.
+
+    Only the latest `window` samples are kept, so the percentiles reflect the recent behavior of the command and memory stays bounded.
+    '''
+
+    FIELDS: t.ClassVar[tuple[str, ...]] = ("wall", "pool_wait", "db", "rest", "lag", "other")
+
+    def __init__(self, qualname: str, window: int) -> None:
+        self.qualname = qualname
+        self.calls = 0
+        self.failures = 0
+        self.samples: collections.deque[tuple[float, ...]] = collections.deque(maxlen = window)
+    
+    def add(self, sample: CommandSample) -> None:
+        self.calls += 1
+        if sample.failed:
+            self.failures += 1
+        self.samples.append(tuple(getattr(sample, name) for name in CommandProfile.FIELDS))
+    def percentile(self, p: float, name: str = "wall") -> float:
+        '''Return the `p`-th percentile of a category in milliseconds over the current window, or `0` if there are no samples.
+
+        Parameters
+        ----------
+        p : float
+            The percentile, between 0 and 100.
+        name : str, optional
+            One of `CommandProfile.FIELDS`, by default `wall`.
+        '''
+        if not self.samples:
+            return 0
+        
+        index = CommandProfile.FIELDS.index(name)
+        values = sorted(sample[index] for sample in self.samples)
+        rank = min(math.ceil(len(values) * p / 100), len(values)) - 1
+        return values[max(rank, 0)] * 1000
+    def mean(self, name: str = "wall") -> float:
+        '''Return the average of a category in milliseconds over the current window, or `0` if there are no samples.'''
+        if not self.samples:
+            return 0
+        
+        index = CommandProfile.FIELDS.index(name)
+        return sum(sample[index] for sample in self.samples) / len(self.samples) * 1000
+    def to_dict(self) -> dict[str, t.Any]:
+        return {
+            "command": self.qualname,
+            "calls": self.calls,
+            "failures": self.failures,
+            "window": len(self.samples),
+            **{
+                name: {
+                    "mean_ms": round(self.mean(name), 3),
+                    "p50_ms": round(self.percentile(50, name), 3),
+                    "p95_ms": round(self.percentile(95, name), 3),
+                    "p99_ms": round(self.percentile(99, name), 3),
+                } for name in CommandProfile.FIELDS
+            }
+        }
+
+class CommandProfiler:
+    '''Measure the end-to-end latency of every command invocation, broken down into time waiting for the db pool, db time, REST time and event loop lag.
+
+    A sample is started right before the command is invoked (see `MichaelBot.process_prefix_commands()`) and finished in the command completion/error listeners.
+    The db, pool and REST timings are attributed to the sample through `current_sample`.
+    '''
+
+    def __init__(self, window: int = 256, max_running: int = 1024) -> None:
+        '''
+        Parameters
+        ----------
+        window : int, optional
+            The amount of latest samples to keep per command, by default 256.
+        max_running : int, optional
+            The maximum amount of unfinished samples to keep, by default 1024. Samples of invocations that never dispatch a completion/error event
+            (ie. the error is handled by the command's own error handler) are dropped once this is exceeded.
+        '''
+        self.window = window
+        self.max_running = max_running
+        self.started_at = dt.datetime.now().astimezone()
+        self.__running: dict[lightbulb.Context, CommandSample] = {}
+        self.__profiles: dict[str, CommandProfile] = {}
+    
+    def start(self, ctx: lightbulb.Context) -> CommandSample:
+        '''Start a sample for this context.
+
+        Parameters
+        ----------
+        ctx : lightbulb.Context
+            The context that is about to be invoked.
+
+        Returns
+        -------
+        CommandSample
+            The new sample. It should be set as `current_sample` for the task running the command.
+        '''
+        while len(self.__running) >= self.max_running:
+            del self.__running[next(iter(self.__running))]
+        
+        sample = CommandSample(ctx.command.qualname if ctx.command else "<unknown>")
+        self.__running[ctx] = sample
+        asyncio.get_running_loop().call_soon(sample._record_lag, time.perf_counter())
+        return sample
+    def finish(self, ctx: lightbulb.Context, *, failed: bool = False) -> None:
+        '''Finish the sample of this context and add it to the command's statistics. Does nothing if the context has no sample.
+
+        Parameters
+        ----------
+        ctx : lightbulb.Context
+            The context that finished its invocation.
+        failed : bool, optional
+            Whether the invocation raised an error, by default False.
+        '''
+        sample = self.__running.pop(ctx, None)
+        if sample is None:
+            return
+        
+        sample.wall = time.perf_counter() - sample.started
+        sample.failed = failed
+        # The subcommand is only resolved during invocation.
+        command = ctx.invoked or ctx.command
+        if command is not None:
+            sample.qualname = command.qualname
+        
+        profile = self.__profiles.get(sample.qualname)
+        if profile is None:
+            profile = CommandProfile(sample.qualname, self.window)
+            self.__profiles[sample.qualname] = profile
+        profile.add(sample)
+    def get(self, qualname: str) -> CommandProfile | None:
+        '''Return the statistics of a command, or `None` if it has never finished.'''
+        return self.__profiles.get(qualname)
+    def slowest(self, n: int = 10, *, p: float = 95) -> list[CommandProfile]:
+        '''Return the `n` commands with the highest `p`-th percentile wall time.'''
+        return sorted(self.__profiles.values(), key = lambda profile: profile.percentile(p), reverse = True)[:n]
+    def to_dict(self) -> dict[str, t.Any]:
+        '''Return a JSON-serializable snapshot of all commands.'''
+        return {
+            "since": self.started_at.isoformat(),
+            "commands": [profile.to_dict() for profile in self.slowest(len(self.__profiles))],
+        }
+    def reset(self) -> None:
+        '''Drop all recorded statistics.'''
+        self.started_at = dt.datetime.now().astimezone()
+        self.__profiles = {}
+
+class _ProfiledAcquire:
+    '''Wrap the result of `asyncpg.Pool.acquire()` to time how long getting the connection takes.'''
+
+    __slots__ = ("__context",)
+
+    def __init__(self, context) -> None:
+        self.__context = context
+
+    @staticmethod
+    def __record(started: float) -> None:
+        sample = current_sample.get()
+        if sample is not None:
+            sample.pool_wait += time.perf_counter() - started
+    async def __aenter__(self) -> asyncpg.Connection:
+        started = time.perf_counter()
+        try:
+            return await self.__context.__aenter__()
+        finally:
+            self.__record(started)
+    async def __aexit__(self, *exc_info) -> None:
+        await self.__context.__aexit__(*exc_info)
+    async def __acquire(self) -> asyncpg.Connection:
+        started = time.perf_counter()
+        try:
+            return await self.__context
+        finally:
+            self.__record(started)
+    def __await__(self):
+        return self.__acquire().__await__()
+
+class ProfiledPool:
+    '''Wrap an `asyncpg.Pool` to report how long acquiring a connection takes to the running command's sample.
+
+    `acquire()` works the same as `asyncpg.Pool.acquire()`; everything else is forwarded to the pool as is.
+    '''
+
+    __slots__ = ("__pool",)
+
+    def __init__(self, pool: asyncpg.Pool) -> None:
+        self.__pool = pool
+
+    @property
+    def pool(self) -> asyncpg.Pool:
+        '''The wrapped pool.'''
+        return self.__pool
+    def acquire(self, *, timeout: float | None = None) -> _ProfiledAcquire:
+        return _ProfiledAcquire(self.__pool.acquire(timeout = timeout))
+    def __getattr__(self, name: str) -> t.Any:
+        return getattr(self.__pool, name)
+
+class CacheInvalidationListener:
+    '''Keep the db caches of this process in sync with writes made by other processes.
+
+    The triggers created in `dbsetup.py` send a `NOTIFY cache_invalidate` with the table, the row's key and the writer's
+    `application_name` on every write to a cached table. This listens to that channel on a dedicated connection and refetches
+    only the rows that changed. Notifications coming from this process (ie. from `bot.pool`, which uses `origin` as its
+    `application_name`) are skipped since the cache is already written through.
+
+    Notifications sent while the connection is down are lost, so every reconnection is followed by a full resync.
+    '''
+
+    CHANNEL = "cache_invalidate"
+
+    def __init__(self, bot: "MichaelBot", *, keepalive: float = 30.0, reconnect_delay: float = 5.0) -> None:
+        '''
+        Parameters
+        ----------
+        bot : MichaelBot
+            The bot whose caches are kept in sync.
+        keepalive : float, optional
+            How often to check the connection is still alive, in seconds. Default to 30.
+        reconnect_delay : float, optional
+            How long to wait before reconnecting, in seconds. Default to 5.
+        '''
+        self.keepalive = keepalive
+        self.reconnect_delay = reconnect_delay
+        # Postgres truncates `application_name` to 63 characters.
+        self.origin = f"MichaelBot-{os.getpid()}-{os.urandom(4).hex()}"
+        self.resyncs = 0
+
+        self.__bot = bot
+        self.__connect_kwargs: dict = {}
+        self.__pending: dict[tuple[str, str], None] = {}
+        self.__wakeup = asyncio.Event()
+        self.__task: asyncio.Task | None = None
+        self.__worker: asyncio.Task | None = None
+
+    @property
+    def is_running(self) -> bool:
+        return self.__task is not None and not self.__task.done()
+    def start(self, **connect_kwargs) -> None:
+        '''Start listening. The arguments are passed into `asyncpg.connect()`.'''
+        if self.is_running:
+            return
+        
+        self.__connect_kwargs = connect_kwargs
+        loop = asyncio.get_running_loop()
+        self.__task = loop.create_task(self.__run())
+        self.__worker = loop.create_task(self.__apply_pending())
+    def stop(self) -> None:
+        for task in (self.__task, self.__worker):
+            if task is not None:
+                task.cancel()
+        self.__task = None
+        self.__worker = None
+
+    async def __run(self) -> None:
+        connected_before = False
+        while True:
+            conn: asyncpg.Connection | None = None
+            try:
+                conn = await asyncpg.connect(**self.__connect_kwargs, server_settings = {"application_name": self.origin})
+                await conn.add_listener(CacheInvalidationListener.CHANNEL, self.__on_notify)
+                if connected_before:
+                    logger.info("Reconnected to the cache invalidation channel. Resyncing caches.")
+                    await self.resync()
+                connected_before = True
+
+                while True:
+                    await asyncio.sleep(self.keepalive)
+                    await asyncio.wait_for(conn.execute("SELECT 1;"), timeout = self.keepalive)
+            except (OSError, asyncio.TimeoutError, asyncpg.PostgresError, asyncpg.InterfaceError) as e:
+                logger.warning("Lost the cache invalidation channel: %s. Reconnecting in %.0fs.", e, self.reconnect_delay)
+            finally:
+                if conn is not None:
+                    conn.terminate()
+            await asyncio.sleep(self.reconnect_delay)
+
+    def __on_notify(self, _conn: asyncpg.Connection, _pid: int, _channel: str, payload: str) -> None:
+        try:
+            data = json.loads(payload)
+        except ValueError:
+            return
+        if data.get("origin") == self.origin or data.get("key") is None:
+            return
+        
+        # Dict as an ordered set, so a row written many times in a burst is only refetched once.
+        self.__pending[(data["table"], data["key"])] = None
+        self.__wakeup.set()
+    async def __apply_pending(self) -> None:
+        while True:
+            await self.__wakeup.wait()
+            self.__wakeup.clear()
+            while self.__pending:
+                table, key = next(iter(self.__pending))
+                del self.__pending[(table, key)]
+                try:
+                    await self.invalidate(table, key)
+                except (OSError, asyncpg.PostgresError, asyncpg.InterfaceError) as e:
+                    logger.warning("Unable to refresh %s %s from the database: %s", table, key, e)
+
+    async def invalidate(self, table: str, key: str) -> None:
+        '''Refetch one row of a cached table, dropping it from the cache if it no longer exists.
+
+        Parameters
+        ----------
+        table : str
+            The table's name in lowercase.
+        key : str
+            The row's key as text.
+        '''
+        bot = self.__bot
+        if table == "userinventory":
+            # The inventory cache is read-through, so dropping the entry is enough.
+            bot.inventory_cache.invalidate(int(key))
+            return
+        if bot.pool is None:
+            return
+        
+        async with bot.pool.acquire() as conn:
+            if table == "guilds":
+                guild_id = int(key)
+                guild = await psql.Guild.fetch_one(conn, id = guild_id)
+                if guild is not None:
+                    bot.guild_cache.update_local(guild)
+                elif guild_id in bot.guild_cache.keys():
+                    bot.guild_cache.remove_local(guild_id)
+            elif table in ("guildlogs", "guildlogsettings"):
+                guild_id = int(key)
+                log = await psql.GuildLog.fetch_one(conn, guild_id = guild_id)
+                if log is not None:
+                    bot.log_cache.update_local(log)
+                elif guild_id in bot.log_cache.keys():
+                    bot.log_cache.remove_local(guild_id)
+            elif table == "users":
+                user_id = int(key)
+                user = await psql.User.fetch_one(conn, id = user_id)
+                if user is not None:
+                    bot.user_cache.update_local(user)
+                elif user_id in bot.user_cache.keys():
+                    bot.user_cache.remove_local(user_id)
+            elif table == "items":
+                item = await psql.Item.fetch_one(conn, id = key)
+                if item is not None:
+                    bot.item_cache.update_local(item)
+                elif key in bot.item_cache.keys():
+                    bot.item_cache.remove_local(key)
+            elif table == "userequipment":
+                # The key is the owner, so reload all of their equipments (a single `WHERE user_id` query).
+                await bot.equipment_cache.update_from_db(conn, int(key))
+    async def resync(self) -> None:
+        '''Reload every cache kept in sync by this listener.'''
+        bot = self.__bot
+        if bot.pool is None:
+            return
+        
+        # Anything pending is covered by the full reload.
+        self.__pending.clear()
+        async with bot.pool.acquire() as conn:
+            await bot.guild_cache.update_all_from_db(conn)
+            await bot.log_cache.update_all_from_db(conn)
+            await bot.user_cache.update_all_from_db(conn)
+            await bot.item_cache.update_all_from_db(conn)
+            await bot.equipment_cache.update_all_from_db(conn)
+        bot.inventory_cache.clear()
+        self.resyncs += 1
+
+class TaskCoordinator:
+    '''Run each registered `lightbulb.ext.tasks` task in exactly one of the processes sharing the database.
+
+    Each task has a Postgres advisory lock. A process runs a task only while it holds the task's lock, which is taken with
+    `pg_try_advisory_lock()` on a dedicated connection. If that connection drops, Postgres releases its locks, so this
+    process stops its tasks and another process takes them over on its next poll.
+
+    Without a database, there's nothing to coordinate with, so tasks run right away on the leader process (see `MichaelBot.is_leader`).
+
+    Jobs a task schedules for later (ie. a reminder that is due in a few seconds) must be spawned with `create_task()`,
+    so they're cancelled along with the task instead of running a second time in the process that takes over.
+    '''
+
+    def __init__(self, bot: "MichaelBot", *, poll_interval: float = 15.0, reconnect_delay: float = 5.0) -> None:
+        '''
+        Parameters
+        ----------
+        bot : MichaelBot
+            The bot.
+        poll_interval : float, optional
+            How often to try taking the locks not held and to check the connection, in seconds. Default to 15.
+        reconnect_delay : float, optional
+            How long to wait before reconnecting, in seconds. Default to 5.
+        '''
+        self.poll_interval = poll_interval
+        self.reconnect_delay = reconnect_delay
+
+        self.__bot = bot
+        self.__connect_kwargs: dict | None = None
+        self.__tasks: dict[str, tasks.Task] = {}
+        self.__held: set[str] = set()
+        self.__spawned: dict[str, set[asyncio.Task]] = {}
+        self.__task: asyncio.Task | None = None
+        self.__wakeup = asyncio.Event()
+
+    @staticmethod
+    def lock_key(name: str) -> int:
+        '''Return the advisory lock key of a task name.'''
+        return int.from_bytes(hashlib.blake2b(name.encode(), digest_size = 8, person = b"MichaelBot").digest(), "big", signed = True)
+
+    @property
+    def is_running(self) -> bool:
+        return self.__task is not None and not self.__task.done()
+    def held(self) -> set[str]:
+        '''Return the names of the tasks this process currently runs.'''
+        return set(self.__held)
+
+    def register(self, name: str, task: tasks.Task) -> None:
+        '''Run a task in only one process. Does nothing if a task with this name is already registered.
+
+        Parameters
+        ----------
+        name : str
+            A name unique to the task. Every process must use the same name for the same task.
+        task : tasks.Task
+            The task. It must not be started already, nor have `auto_start` set.
+        '''
+        if name in self.__tasks:
+            return
+        
+        self.__tasks[name] = task
+        if self.__connect_kwargs is None:
+            if self.__bot.is_leader:
+                self.__start_task(name)
+        else:
+            self.__wakeup.set()
+    def create_task(self, name: str, coro: t.Coroutine) -> asyncio.Task | None:
+        '''Spawn a job on behalf of a registered task. The job is cancelled once this process stops running the task.
+
+        Parameters
+        ----------
+        name : str
+            The name the task is registered with.
+        coro : t.Coroutine
+            The job.
+
+        Returns
+        -------
+        asyncio.Task | None
+            The job's task, or `None` if this process doesn't run the task anymore, in which case `coro` is closed.
+        '''
+        if name not in self.__held:
+            coro.close()
+            return None
+        
+        job = self.__bot.create_task(coro)
+        jobs = self.__spawned.setdefault(name, set())
+        jobs.add(job)
+        job.add_done_callback(jobs.discard)
+        return job
+    def start(self, **connect_kwargs) -> None:
+        '''Start coordinating. The arguments are passed into `asyncpg.connect()`.'''
+        if self.is_running:
+            return
+        
+        # Tasks started while there was no database are now coordinated.
+        for name in list(self.__held):
+            self.__stop_task(name)
+        self.__connect_kwargs = connect_kwargs
+        self.__task = asyncio.get_running_loop().create_task(self.__run())
+    def stop(self) -> None:
+        if self.__task is not None:
+            self.__task.cancel()
+            self.__task = None
+        for name in list(self.__held):
+            self.__stop_task(name)
+
+    def __start_task(self, name: str) -> None:
+        task = self.__tasks[name]
+        # pylint: disable=protected-access
+        # `Task.cancel()` leaves the task flagged as stopped, which would end a restarted task right away.
+        task._stopped = False
+        # pylint: enable=protected-access
+        task.start()
+        self.__held.add(name)
+        logger.info("This process now runs task '%s'.", name)
+    def __stop_task(self, name: str) -> None:
+        task = self.__tasks[name]
+        task.cancel()
+        # pylint: disable=protected-access
+        if task in tasks.Task._tasks:
+            tasks.Task._tasks.remove(task)
+        # pylint: enable=protected-access
+        for job in self.__spawned.pop(name, ()):
+            job.cancel()
+        self.__held.discard(name)
+        logger.info("This process no longer runs task '%s'.", name)
+
+    async def __run(self) -> None:
+        while True:
+            conn: asyncpg.Connection | None = None
+            try:
+                conn = await asyncpg.connect(**self.__connect_kwargs)
+                while True:
+                    for name in self.__tasks:
+                        if name not in self.__held and await conn.fetchval("SELECT pg_try_advisory_lock($1);", TaskCoordinator.lock_key(name)):
+                            self.__start_task(name)
+                    
+                    if self.__held:
+                        # Doubles as a liveness check of the connection holding the locks.
+                        await asyncio.wait_for(conn.execute("SELECT 1;"), timeout = self.poll_interval)
+                    
+                    self.__wakeup.clear()
+                    try:
+                        await asyncio.wait_for(self.__wakeup.wait(), timeout = self.poll_interval)
+                    except asyncio.TimeoutError:
+                        pass
+            except (OSError, asyncio.TimeoutError, asyncpg.PostgresError, asyncpg.InterfaceError) as e:
+                logger.warning("Lost the task coordination connection: %s. Reconnecting in %.0fs.", e, self.reconnect_delay)
+            finally:
+                # The locks go away with the connection, so another process may take over these tasks.
+                for name in list(self.__held):
+                    self.__stop_task(name)
+                if conn is not None:
+                    conn.terminate()
+            await asyncio.sleep(self.reconnect_delay)
+
+class _RestTimedContext:
+    '''Attribute the time spent responding to the REST category of the running command's sample.'''
+
+    __slots__ = ()
+
+    async def respond(self, *args, **kwargs) -> lightbulb.ResponseProxy:
+        with rest_timer():
+            return await super().respond(*args, **kwargs)
+    async def edit_last_response(self, *args, **kwargs) -> hikari.Message | None:
+        with rest_timer():
+            return await super().edit_last_response(*args, **kwargs)
+    async def delete_last_response(self) -> None:
+        with rest_timer():
+            await super().delete_last_response()
+
+class ProfiledPrefixContext(_RestTimedContext, lightbulb.PrefixContext):
+    '''A `lightbulb.PrefixContext` whose responses are profiled.'''
+
+    __slots__ = ()
+
+class ProfiledSlashContext(_RestTimedContext, lightbulb.SlashContext):
+    '''A `lightbulb.SlashContext` whose responses are profiled.'''
+
+    __slots__ = ()
+
+@dataclass(slots = True)
+class BlockingReport:
+    '''A place in the code that was caught blocking the event loop.'''
+
+    location: str
+    count: int = 0
+    max_stall: float = 0
+    last_stack: str = ""
+    last_seen: dt.datetime | None = None
+
+class LoopLagMonitor:
+    '''A watchdog measuring the event loop's scheduling lag and catching synchronous code that blocks it.
+
+    A heartbeat task sleeps for `interval` seconds and records how late it wakes up. A separate thread watches this heartbeat;
+    if the loop hasn't beaten for longer than `threshold`, it captures the stack of the loop's thread, which is whatever is blocking it.
+    Each capture is counted against the innermost frame that belongs to the bot's code.
+    '''
+
+    __ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+    def __init__(self, interval: float = 0.5, threshold: float = 0.25, *, history: int = 240, max_offenders: int = 128) -> None:
+        '''
+        Parameters
+        ----------
+        interval : float, optional
+            How often the heartbeat runs, in seconds, by default 0.5.
+        threshold : float, optional
+            How late the heartbeat must be to be reported as blocking, in seconds, by default 0.25.
+        history : int, optional
+            The amount of latest lag samples to keep, by default 240 (2 minutes with the default interval).
+        max_offenders : int, optional
+            The maximum amount of distinct blocking locations to keep, by default 128.
+        '''
+        self.interval = interval
+        self.threshold = threshold
+        self.max_offenders = max_offenders
+        self.lag_samples: collections.deque[float] = collections.deque(maxlen = history)
+        self.stalls: int = 0
+
+        self.__offenders: dict[str, BlockingReport] = {}
+        self.__lock = threading.Lock()
+        self.__heartbeat: float = time.monotonic()
+        # The heartbeat of the latest stall caught by the watcher, so each stall is reported once.
+        self.__reported_beat: float | None = None
+        self.__loop_thread_id: int | None = None
+        self.__task: asyncio.Task | None = None
+        self.__thread: threading.Thread | None = None
+        self.__stopping = threading.Event()
+
+    @property
+    def is_running(self) -> bool:
+        return self.__task is not None and not self.__task.done()
+    def start(self) -> None:
+        '''Start monitoring the running event loop. Does nothing if the monitor is already running.'''
+        if self.is_running:
+            return
+        if self.__thread is not None:
+            # Never run two watchers at once.
+            self.__thread.join()
+        
+        self.__loop_thread_id = threading.get_ident()
+        self.__heartbeat = time.monotonic()
+        self.__stopping.clear()
+        self.__task = asyncio.get_running_loop().create_task(self.__beat())
+        self.__thread = threading.Thread(target = self.__watch, name = "LoopLagMonitor", daemon = True)
+        self.__thread.start()
+    def stop(self) -> None:
+        '''Stop monitoring.'''
+        self.__stopping.set()
+        if self.__task is not None:
+            self.__task.cancel()
+            self.__task = None
+        if self.__thread is not None:
+            # The watcher checks the flag every `threshold / 2` seconds. If it's still busy, `start()` waits for it instead.
+            self.__thread.join(timeout = self.threshold)
+            if not self.__thread.is_alive():
+                self.__thread = None
+    
+    async def __beat(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = max(loop.time() - expected, 0)
+            with self.__lock:
+                caught = self.__reported_beat == self.__heartbeat
+                self.__heartbeat = time.monotonic()
+            self.lag_samples.append(lag)
+            # Stalls caught by the watcher are already logged along with their stack.
+            if lag > self.threshold and not caught:
+                logger.warning("Event loop lagged for %.3fs.", lag)
+    def __watch(self) -> None:
+        while not self.__stopping.wait(self.threshold / 2):
+            # The heartbeat can't move while the lock is held, so the stall is either caught here or logged by the heartbeat, never both.
+            with self.__lock:
+                beat = self.__heartbeat
+                stalled = time.monotonic() - beat - self.interval
+                # Only capture once per stall.
+                if stalled < self.threshold or self.__reported_beat == beat:
+                    continue
+                
+                frame = sys._current_frames().get(self.__loop_thread_id) # pylint: disable=protected-access
+                if frame is None:
+                    continue
+                self.__reported_beat = beat
+                stack = traceback.extract_stack(frame)
+            self.__report(stack, stalled)
+    def __report(self, stack: traceback.StackSummary, stalled: float) -> None:
+        location = None
+        for frame in reversed(stack):
+            if frame.filename.startswith(LoopLagMonitor.__ROOT):
+                location = f"{os.path.relpath(frame.filename, LoopLagMonitor.__ROOT)}:{frame.lineno} in {frame.name}"
+                break
+        if location is None:
+            innermost = stack[-1]
+            location = f"{innermost.filename}:{innermost.lineno} in {innermost.name}"
+        
+        formatted = ''.join(stack.format())
+        with self.__lock:
+            self.stalls += 1
+            report = self.__offenders.get(location)
+            if report is None:
+                if len(self.__offenders) >= self.max_offenders:
+                    # Forget the least seen location.
+                    del self.__offenders[min(self.__offenders.values(), key = lambda r: r.count).location]
+                report = BlockingReport(location)
+                self.__offenders[location] = report
+            
+            report.count += 1
+            report.max_stall = max(report.max_stall, stalled)
+            report.last_stack = formatted
+            report.last_seen = dt.datetime.now().astimezone()
+        
+        logger.warning("Event loop blocked for at least %.3fs at %s. Stack:\n%s", stalled, location, formatted)
+
+    def offenders(self, n: int = 10) -> list[BlockingReport]:
+        '''Return the `n` most frequent blocking locations.'''
+        with self.__lock:
+            return sorted(self.__offenders.values(), key = lambda r: r.count, reverse = True)[:n]
+    @property
+    def current_lag(self) -> float:
+        '''The latest lag sample in seconds, or `0` if there's none.'''
+        return self.lag_samples[-1] if self.lag_samples else 0
+    @property
+    def mean_lag(self) -> float:
+        '''The average lag in seconds over the kept samples, or `0` if there's none.'''
+        return sum(self.lag_samples) / len(self.lag_samples) if self.lag_samples else 0
+    @property
+    def max_lag(self) -> float:
+        '''The highest lag in seconds over the kept samples, or `0` if there's none.'''
+        return max(self.lag_samples, default = 0)
+    def reset(self) -> None:
+        '''Drop all recorded lag samples and blocking reports.'''
+        with self.__lock:
+            self.lag_samples.clear()
+            self.stalls = 0
+            self.__offenders = {}
+
+@dataclass(slots = True)
+class HostSample:
+    '''One reading of `HostMetricsSampler`.'''
+
+    timestamp: float
+    cpu_percent: float
+    ram_used: int
+    ram_total: int
+    swap_used: int
+    swap_total: int
+    rss: int
+    connections: int
+    loop_lag: float
+    pool_used: int
+    pool_size: int
+    gateway_latency: float
+
+class HostMetricsSampler:
+    '''Periodically record the host and bot metrics into a fixed-size ring buffer.
+
+    The `psutil` calls run in a thread so they never block the event loop. Since the CPU usage is measured between
+    two samples, it's an average over `interval` instead of an instantaneous reading.
+    '''
+
+    SPARKLINE_BLOCKS = "▁▂▃▄▅▆▇█"
+
+    def __init__(self, bot: "MichaelBot", interval: float = 10.0, *, history: int = 360) -> None:
+        '''
+        Parameters
+        ----------
+        bot : MichaelBot
+            The bot to read the event loop lag, database pool and gateway latency from.
+        interval : float, optional
+            How often to sample, in seconds, by default 10.
+        history : int, optional
+            The amount of latest samples to keep, by default 360 (1 hour with the default interval).
+        '''
+        self.interval = interval
+        self.samples: collections.deque[HostSample] = collections.deque(maxlen = history)
+        # These don't change while the bot is running.
+        self.physical_cores: int | None = psutil.cpu_count(logical = False)
+        self.logical_cores: int | None = psutil.cpu_count(logical = True)
+        self.boot_time: float = psutil.boot_time()
+        self.cpu_freq = psutil.cpu_freq()
+
+        self.__bot = bot
+        self.__process = psutil.Process()
+        self.__task: asyncio.Task | None = None
+
+    @property
+    def is_running(self) -> bool:
+        return self.__task is not None and not self.__task.done()
+    def start(self) -> None:
+        '''Start sampling. Does nothing if the sampler is already running.'''
+        if self.is_running:
+            return
+        
+        # The first call always returns 0, but it starts the measurement for the next one.
+        psutil.cpu_percent(interval = None)
+        self.__task = asyncio.get_running_loop().create_task(self.__run())
+    def stop(self) -> None:
+        if self.__task is not None:
+            self.__task.cancel()
+            self.__task = None
+    
+    async def __run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                self.samples.append(await self.sample())
+            except psutil.Error as e:
+                logger.warning("Unable to sample host metrics: %s", e)
+    def __read_host(self) -> tuple:
+        ram = psutil.virtual_memory()
+        swap = psutil.swap_memory()
+        # psutil 6 renamed `connections()` to `net_connections()`.
+        connections = getattr(self.__process, "net_connections", None) or self.__process.connections
+        return (
+            psutil.cpu_percent(interval = None),
+            ram.used, ram.total, swap.used, swap.total,
+            self.__process.memory_info().rss,
+            len(connections(kind = "inet")),
+        )
+    async def sample(self) -> HostSample:
+        '''Take a sample now. This doesn't add it to the buffer.'''
+        cpu_percent, ram_used, ram_total, swap_used, swap_total, rss, connections = await asyncio.to_thread(self.__read_host)
+        
+        pool = self.__bot.pool
+        pool_size = pool.get_size() if pool is not None else 0
+        pool_used = pool_size - pool.get_idle_size() if pool is not None else 0
+        latency = self.__bot.heartbeat_latency
+        return HostSample(
+            timestamp = time.time(),
+            cpu_percent = cpu_percent,
+            ram_used = ram_used,
+            ram_total = ram_total,
+            swap_used = swap_used,
+            swap_total = swap_total,
+            rss = rss,
+            connections = connections,
+            loop_lag = self.__bot.loop_monitor.current_lag,
+            pool_used = pool_used,
+            pool_size = pool_size,
+            gateway_latency = latency if not math.isnan(latency) else 0.0,
+        )
+
+    @property
+    def latest(self) -> HostSample | None:
+        return self.samples[-1] if self.samples else None
+    def values(self, metric: str, window: int | None = None) -> list[float]:
+        '''Return the latest `window` values of a `HostSample` field, from oldest to newest. `None` returns all of them.'''
+        samples = list(self.samples) if window is None else list(self.samples)[-window:]
+        return [getattr(sample, metric) for sample in samples]
+    def average(self, metric: str, window: int | None = None) -> float:
+        '''Return the average of the latest `window` values of a `HostSample` field, or `0` if there's no sample.'''
+        values = self.values(metric, window)
+        return sum(values) / len(values) if values else 0
+    def sparkline(self, metric: str, width: int = 20) -> str:
+        '''Draw the latest values of a `HostSample` field as a line of block characters.
+
+        Each character averages consecutive samples so the whole history fits in `width` characters.
+        '''
+        values = self.values(metric)
+        if not values:
+            return ''
+        
+        bucket_size = math.ceil(len(values) / width)
+        points = [sum(values[i:i + bucket_size]) / len(values[i:i + bucket_size]) for i in range(0, len(values), bucket_size)]
+        low, high = min(points), max(points)
+        if high - low < 1e-9:
+            return HostMetricsSampler.SPARKLINE_BLOCKS[0] * len(points)
+        
+        scale = len(HostMetricsSampler.SPARKLINE_BLOCKS) - 1
+        return ''.join(HostMetricsSampler.SPARKLINE_BLOCKS[round((point - low) / (high - low) * scale)] for point in points)
+    def to_dict(self) -> dict:
+        '''Return the sampler's settings and every kept sample, ready to be dumped as JSON.'''
+        return {
+            "interval": self.interval,
+            "history": self.samples.maxlen,
+            "physical_cores": self.physical_cores,
+            "logical_cores": self.logical_cores,
+            "boot_time": self.boot_time,
+            "samples": [asdict(sample) for sample in self.samples],
+        }
 
 class MichaelBot(lightbulb.BotApp):
     '''A subclass of `lightbulb.BotApp`. This allows syntax highlight on many custom attributes.'''
@@ -482,6 +2525,7 @@ class MichaelBot(lightbulb.BotApp):
     __slots__ = (
         "info", 
         "secrets",
+        "is_leader",
         "online_at",
         "logging",
         "pool",
@@ -490,9 +2534,20 @@ class MichaelBot(lightbulb.BotApp):
         "log_cache",
         "user_cache",
         "item_cache",
+        "equipment_cache",
+        "inventory_cache",
+        "guild_stats",
+        "interaction_router",
         "custom_command_concurrency_session",
+        "query_stats",
+        "command_profiler",
+        "loop_monitor",
+        "cache_invalidator",
+        "task_coordinator",
+        "host_metrics",
         "lavalink",
         "node_extra",
+        "track_cache",
     )
     def __init__(self, 
         token, 
@@ -513,13 +2568,17 @@ class MichaelBot(lightbulb.BotApp):
             The bot info. Store the one in `config.json`.
         secrets : dict
             The bot's secrets such as token, database info, etc.
+        is_leader : bool, optional
+            Whether this process syncs slash commands, which only needs to happen in one process. Default to `True`,
+            which is what a single process bot wants. Background tasks are spread through `task_coordinator` instead.
         '''
         self.info: dict = kwargs.pop("info")
         self.secrets: dict = kwargs.pop("secrets")
+        self.is_leader: bool = kwargs.pop("is_leader", True)
         
         self.online_at: dt.datetime = None
 
-        self.pool: asyncpg.Pool | None = None
+        self.pool: ProfiledPool | None = None
         self.aio_session: aiohttp.ClientSession | None = None
 
         # Store some db info. This allows read-only operation much cheaper.
@@ -527,13 +2586,28 @@ class MichaelBot(lightbulb.BotApp):
         self.log_cache = LogCache()
         self.user_cache = UserCache()
         self.item_cache = ItemCache()
+        self.equipment_cache = EquipmentCache()
+        self.inventory_cache = InventoryCache()
+        psql.add_inventory_hook(self.inventory_cache.invalidate)
+        self.cache_invalidator = CacheInvalidationListener(self)
+        self.task_coordinator = TaskCoordinator(self)
+        # This one is for hikari's cache, not the db.
+        self.guild_stats = GuildStatsCache()
 
         self.custom_command_concurrency_session = CommandActiveSessionManager()
 
+        self.query_stats = QueryStatsCollector()
+        psql.add_query_hook(self.query_stats.record)
+        self.command_profiler = CommandProfiler()
+        psql.add_query_hook(_record_sample_db)
+        self.loop_monitor = LoopLagMonitor()
+        self.host_metrics = HostMetricsSampler(self)
+
         self.lavalink: lavaplayer.LavalinkClient | None = None
         # Currently lavaplayer doesn't support adding attr to lavaplayer.objects.Node
         # so we'll make a dictionary to manually track additional info.
         self.node_extra: dict[int, NodeExtra] = {}
+        self.track_cache = TrackCache()
 
         launch_options = self.info.get("launch_options")
         log_level = "INFO"
@@ -561,6 +2635,80 @@ class MichaelBot(lightbulb.BotApp):
             logs = log_level if bool(log_level) else None,
             **kwargs
         )
+
+        # utils.nav depends on utils.helpers, which depends on this module.
+        from utils.nav.router import InteractionRouter
+        self.interaction_router = InteractionRouter(self)
+    
+    async def get_prefix_context(self, event: hikari.MessageCreateEvent, cls: type[lightbulb.PrefixContext] = ProfiledPrefixContext) -> lightbulb.PrefixContext | None:
+        return await super().get_prefix_context(event, cls)
+    async def get_slash_context(self, event: hikari.InteractionCreateEvent, command: lightbulb.SlashCommand, cls: type[lightbulb.SlashContext] = ProfiledSlashContext) -> lightbulb.SlashContext:
+        return await super().get_slash_context(event, command, cls)
+    async def process_prefix_commands(self, context: lightbulb.PrefixContext) -> None:
+        # Expose the context to everything running under this command (ie. the query hooks).
+        # The sample is finished in the command completion/error listeners.
+        context_token = current_context.set(context)
+        sample_token = current_sample.set(self.command_profiler.start(context) if context.command is not None else None)
+        try:
+            await super().process_prefix_commands(context)
+        finally:
+            current_sample.reset(sample_token)
+            current_context.reset(context_token)
+    async def invoke_application_command(self, context: lightbulb.ApplicationContext) -> None:
+        context_token = current_context.set(context)
+        sample_token = current_sample.set(self.command_profiler.start(context))
+        try:
+            await super().invoke_application_command(context)
+        finally:
+            current_sample.reset(sample_token)
+            current_context.reset(context_token)
+    
+    def create_aio_session(self) -> aiohttp.ClientSession:
+        '''Create the http client using the `http` settings in `config.json`.
+
+        All settings are optional:
+        - `connection_limit`: The maximum amount of simultaneous connections. Default to 100.
+        - `connection_limit_per_host`: The maximum amount of simultaneous connections to one host. Default to 10.
+        - `dns_cache_ttl`: How long DNS lookups are cached, in seconds. Default to 300.
+        - `timeout`: The total timeout of a request, in seconds. Default to 10.
+        - `connect_timeout`: The timeout to get a connection, in seconds. Default to 5.
+        '''
+        settings: dict = self.info.get("http") or {}
+        connector = aiohttp.TCPConnector(
+            limit = settings.get("connection_limit", 100),
+            limit_per_host = settings.get("connection_limit_per_host", 10),
+            ttl_dns_cache = settings.get("dns_cache_ttl", 300),
+        )
+        timeout = aiohttp.ClientTimeout(
+            total = settings.get("timeout", 10),
+            connect = settings.get("connect_timeout", 5),
+        )
+        return aiohttp.ClientSession(connector = connector, timeout = timeout)
+    
+    async def _manage_application_commands(self, event: hikari.StartedEvent) -> None:
+        if self.is_leader:
+            await super()._manage_application_commands(event)
+            return
+        
+        # Commands are looked up by name when invoked, so only one process needs to sync them with Discord.
+        if self.application is None:
+            self.application = await self.rest.fetch_application()
+        await self.dispatch(lightbulb.LightbulbStartedEvent(app = self))
+    
+    def load_extensions(self, *extensions: str) -> None:
+        super().load_extensions(*extensions)
+        self.__on_commands_changed()
+    def unload_extensions(self, *extensions: str) -> None:
+        super().unload_extensions(*extensions)
+        self.__on_commands_changed()
+    def reload_extensions(self, *extensions: str) -> None:
+        super().reload_extensions(*extensions)
+        self.__on_commands_changed()
+    def __on_commands_changed(self) -> None:
+        # The help command keeps a compiled index of the commands (see `categories/help.py`).
+        invalidate = getattr(self.help_command, "invalidate", None)
+        if invalidate is not None:
+            invalidate()
     
     def get_slash_command(self, name: str) -> lightbulb.SlashCommand | None:
         '''Get the slash command with the given name, or `None` if none was found.
@@ -1,4 +1,5 @@
 from utils.nav.confirm import ConfirmView
 from utils.nav.menu import ComplexView, MenuButton, MenuComponent
 from utils.nav.modal import ModalWithCallback
-from utils.nav.navigator import ButtonNavigator, ItemListBuilder, run_view
+from utils.nav.navigator import ButtonNavigator, ItemListBuilder, PageSource, run_view
+from utils.nav.router import InteractionRouter, InteractionSession, TimerWheel
@@ -8,7 +8,7 @@ import lightbulb
 import miru
 
 from utils import helpers
-from utils.nav.navigator import run_view, timeout_button
+from utils.nav.navigator import PageSource, run_view, timeout_button
 
 PageLike = t.TypeVar("PageLike", str, hikari.Embed)
 
@@ -23,18 +23,18 @@ class MenuComponent:
 
     The child nodes can be accessed using dictionary notation IF there are child nodes.
     '''
-    def __init__(self, content: PageLike, options: dict[MenuButton, MenuComponent] | list = None):
+    def __init__(self, content: PageLike, options: dict[MenuButton, MenuComponent] | list | PageSource = None):
         '''
         Create a node that stores the content and optionally, its options.
-        The `options` can be a list, which will set the content to `None` regardless of what is passed.
+        The `options` can be a list (or a `PageSource`), which will set the content to `None` regardless of what is passed.
         Passing a list also seal you from performing any operations on this node.
         It is recommended to not pass a `dict` through `options`, but instead, use `.add_options()`.
         '''
         self.content = content
-        self.options : dict[MenuButton, MenuComponent] | list = options
+        self.options : dict[MenuButton, MenuComponent] | list | PageSource = options
         self.__parent__ : MenuComponent | None = None
 
-        if isinstance(self.options, list):
+        if isinstance(self.options, (list, PageSource)):
             self.content = None
     
     def add_option(self, key: MenuButton, content: PageLike) -> MenuComponent:
@@ -64,7 +64,7 @@ class MenuComponent:
             There is already a similar key registered.
         '''
         
-        if isinstance(self.options, list):
+        if isinstance(self.options, (list, PageSource)):
             raise KeyError("Cannot add more options.")
         
         if self.options is None:
@@ -98,22 +98,22 @@ class MenuComponent:
         
         if self.options is None:
             self.options = {}
-        elif isinstance(self.options, list):
+        elif isinstance(self.options, (list, PageSource)):
             raise KeyError("Cannot add more options.")
         
         for key in options:
             self.options[key] = MenuComponent(options[key])
             self.options[key].__parent__ = self
     
-    def add_list_options(self, key: str, contents: list[PageLike]) -> MenuComponent:
+    def add_list_options(self, key: str, contents: t.Sequence[PageLike]) -> MenuComponent:
         '''Append a fake node to this node. Return the newly added node to do whatever you want.
 
         Parameters
         ----------
         key : str
             The button for the new option.
-        contents : list[PageLike]
-            A list of content for the new option.
+        contents : t.Sequence[PageLike]
+            A list of content for the new option. This can also be a `PageSource`.
 
         Returns
         -------
@@ -128,7 +128,7 @@ class MenuComponent:
 
         if self.options is None:
             self.options = {}
-        elif isinstance(self.options, list):
+        elif isinstance(self.options, (list, PageSource)):
             raise KeyError("Cannot add more options.")
         
         component = None
@@ -390,16 +390,18 @@ class ComplexView(miru.View):
         if isinstance(self.menu.options, dict):
             for button in self.menu.options:
                 self.add_item(button)
-        elif isinstance(self.menu.options, list):
+        elif isinstance(self.menu.options, (list, PageSource)):
             # TODO: Might optimize this so it wouldn't reset the buttons.
             self.add_item(FirstMenuButton())
             self.add_item(PrevMenuButton())
             self.add_item(NextMenuButton())
             self.add_item(LastMenuButton())
 
-            for index, item in enumerate(self.menu.options):
-                if isinstance(item, hikari.Embed):
-                    item.set_footer(f"Page {index + 1}/{len(self.menu.options)}")
+            # Lazy pages set their own footer when they're formatted.
+            if not isinstance(self.menu.options, PageSource):
+                for index, item in enumerate(self.menu.options):
+                    if isinstance(item, hikari.Embed):
+                        item.set_footer(f"Page {index + 1}/{len(self.menu.options)}")
         
         if self.menu.__parent__ is None:
             self.add_item(StopMenuButton())
@@ -422,7 +424,7 @@ class ComplexView(miru.View):
         content = self.menu.content
         
         # If view is in a list menu. Can also check if menu.content is None instead.
-        if isinstance(self.menu.options, list):
+        if isinstance(self.menu.options, (list, PageSource)):
             content = self.menu.options[self.current_page]
         
         if self.message:
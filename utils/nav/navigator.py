@@ -1,5 +1,7 @@
 '''Contains common forms of menu navigator.'''
 
+import collections
+import math
 import typing as t
 
 import hikari
@@ -97,8 +99,8 @@ class ButtonNavigator(nav.NavigatorView):
 
         Parameters
         ----------
-        pages : list[str | hikari.Embed]
-            A list of content to be displayed.
+        pages : t.Sequence[str | hikari.Embed]
+            A list of content to be displayed, or a `PageSource` to format the pages only when they're displayed.
         buttons : list[nav.NavButton], optional
             A list of buttons to display. It is safe to ignore this parameter for most use cases.
         timeout : float, optional
@@ -112,9 +114,11 @@ class ButtonNavigator(nav.NavigatorView):
         self._author_ids: t.Sequence[int] | None = kwargs.pop("authors", None)
         super().__init__(*args, **kwargs)
 
-        for index, item in enumerate(self.pages):
-            if isinstance(item, hikari.Embed):
-                item.set_footer(f"Page {index + 1}/{len(self.pages)}")
+        # Lazy pages set their own footer when they're formatted.
+        if not isinstance(self.pages, PageSource):
+            for index, item in enumerate(self.pages):
+                if isinstance(item, hikari.Embed):
+                    item.set_footer(f"Page {index + 1}/{len(self.pages)}")
     
     def get_default_buttons(self) -> t.Sequence[nav.NavButton]:
         '''
@@ -151,18 +155,19 @@ class ButtonNavigator(nav.NavigatorView):
 
 class ItemListBuilder:
     '''A builder to fit a list of item into a navigator appropriately. (This is experimental and can be removed at any time).'''
-    def __init__(self, items: list[T], max_item_per_page: int):
+    def __init__(self, items: t.Iterable[T], max_item_per_page: int):
         '''Construct the builder.
 
         Parameters
         ----------
-        items : list[T]
+        items : t.Iterable[T]
             A list of items.
         max_item_per_page : int
             The max amount of item to display before moving to a new page.
         '''
 
-        self.items = items
+        # Pages are sliced by index, so iterables such as `dict.values()` are materialized once.
+        self.items = items if isinstance(items, t.Sequence) else list(items)
         self.max_item = max_item_per_page
 
         self.page_start_formatter: t.Callable[[int, T], hikari.Embed] = None
@@ -209,7 +214,72 @@ class ItemListBuilder:
         '''
         self.page_end_formatter = callback
     
-    def build(self, *, page_type = ButtonNavigator, authors: t.Sequence[int] = None):
+    def build_page(self, page_index: int) -> hikari.Embed:
+        '''Format a single page.
+
+        Parameters
+        ----------
+        page_index : int
+            The page's index, starting from 0.
+
+        Returns
+        -------
+        hikari.Embed
+            The formatted page.
+
+        Raises
+        ------
+        IndexError
+            The page doesn't exist.
+        '''
+
+        start = page_index * self.max_item
+        if page_index < 0 or start >= len(self.items):
+            raise IndexError("Page index out of range.")
+        
+        embed: hikari.Embed = None
+        for index in range(start, min(start + self.max_item, len(self.items))):
+            item = self.items[index]
+            if embed is None:
+                embed = self.page_start_formatter(index, item)
+            
+            self.entry_formatter(embed, index, item)
+        
+        self.page_end_formatter(embed, index, item)
+        return embed
+    def page_count(self) -> int:
+        '''Return the amount of pages the items will fit into.'''
+
+        return math.ceil(len(self.items) / self.max_item)
+    
+    def build_pages(self, *, lazy: bool = False) -> t.Sequence[hikari.Embed]:
+        '''Return the pages without putting them into a navigator.
+
+        Parameters
+        ----------
+        lazy : bool, optional
+            Whether to only format a page when it's accessed, by default False. See `build()`.
+
+        Returns
+        -------
+        t.Sequence[hikari.Embed]
+            A list of pages, or a `PageSource` if `lazy` is `True`.
+
+        Raises
+        ------
+        NotImplementedError
+            `page_start_formatter` is empty or both `entry_formatter` and `page_end_formatter` are empty.
+        '''
+
+        if self.page_start_formatter is None or (self.entry_formatter is None and self.page_end_formatter is None):
+            raise NotImplementedError("Not enough formatters are defined.")
+        if self.entry_formatter is None:
+            self.entry_formatter = lambda embed, index, item: None
+
+        if lazy:
+            return PageSource(self.page_count(), self.build_page)
+        return [self.build_page(page_index) for page_index in range(self.page_count())]
+    def build(self, *, page_type = ButtonNavigator, authors: t.Sequence[int] = None, lazy: bool = False):
         '''Start the formatting process and return an object of `page_type`.
 
         Warnings
@@ -222,6 +292,9 @@ class ItemListBuilder:
             The type of navigator to use, by default ButtonNavigator. This must have a `pages` argument accepting a list of `hikari.Embed` and a `authors` argument accepting a list of ids.
         authors : t.Sequence[int], optional
             The ids of people that are allowed to interact with the navigator. Default to `None`.
+        lazy : bool, optional
+            Whether to only format a page when it's displayed, by default False. If `True`, the formatters are called later on,
+            so anything they use must still be valid while the navigator is running.
 
         Returns
         -------
@@ -234,26 +307,55 @@ class ItemListBuilder:
             `page_start_formatter` is empty or both `entry_formatter` and `page_end_formatter` are empty.
         '''
 
-        if self.page_start_formatter is None or (self.entry_formatter is None and self.page_end_formatter is None):
-            raise NotImplementedError("Not enough formatters are defined.")
+        return page_type(pages = self.build_pages(lazy = lazy), authors = authors)
 
-        embeds: list[hikari.Embed] = []
-        embed: hikari.Embed = None
-        for index, item in enumerate(self.items):
-            if embed is None:
-                embed = self.page_start_formatter(index, item)
-            
-            self.entry_formatter(embed, index, item)
+class PageSource(t.Sequence[hikari.Embed | str]):
+    '''A sequence of pages that are only formatted when they're accessed.
 
-            if index % self.max_item == self.max_item - 1:
-                self.page_end_formatter(embed, index, item)
-                
-                embeds.append(embed)
-                embed = None
-        
-        if embed is not None:
-            # TODO: Fix undefined-loop-variable
-            self.page_end_formatter(embed, index, item)
-            embeds.append(embed)
+    The most recently accessed pages are kept, so going back and forth between nearby pages doesn't format them again,
+    while the memory stays proportional to `cache_size` no matter how many pages there are.
+
+    This is meant to be passed into a navigator (or a `MenuComponent`) in place of a list of pages.
+    '''
+    def __init__(self, page_count: int, formatter: t.Callable[[int], hikari.Embed | str], *, cache_size: int = 8):
+        '''Construct the page source.
 
-        return page_type(pages = embeds, authors = authors)
+        Parameters
+        ----------
+        page_count : int
+            The amount of pages.
+        formatter : t.Callable[[int], hikari.Embed | str]
+            The callback to format a page. It must accept the page's index (starting from 0) and return the page.
+        cache_size : int, optional
+            The max amount of formatted pages to keep. Default to 8.
+        '''
+        self.page_count = page_count
+        self.formatter = formatter
+        self.cache_size = max(cache_size, 1)
+
+        self.__pages: collections.OrderedDict[int, hikari.Embed | str] = collections.OrderedDict()
+    
+    def __len__(self) -> int:
+        return self.page_count
+    def __getitem__(self, index: int) -> hikari.Embed | str:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        
+        if index < 0:
+            index += self.page_count
+        if not 0 <= index < self.page_count:
+            raise IndexError("Page index out of range.")
+        
+        page = self.__pages.get(index)
+        if page is not None:
+            self.__pages.move_to_end(index)
+            return page
+        
+        page = self.formatter(index)
+        if isinstance(page, hikari.Embed):
+            page.set_footer(f"Page {index + 1}/{self.page_count}")
+        
+        self.__pages[index] = page
+        if len(self.__pages) > self.cache_size:
+            self.__pages.popitem(last = False)
+        return page
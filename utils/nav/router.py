@@ -0,0 +1,320 @@
+'''Route component interactions straight to the menu that owns them.
+
+Interactive menus used to loop on `bot.wait_for(hikari.InteractionCreateEvent, predicate = ...)`, which makes hikari
+run every open menu's predicate against every interaction. `InteractionRouter` instead keeps one listener and a table
+keyed by message id, so an interaction is handed to its session with a single dictionary lookup. Timeouts of all sessions
+share one `TimerWheel` instead of each waiter arming its own timer.
+
+Example
+-------
+```py
+msg = await (await ctx.respond("Pick one", components = view.build())).message()
+with bot.interaction_router.listen(msg, user_id = ctx.author.id) as session:
+    while True:
+        try:
+            interaction = await session.wait(timeout = 120)
+        except asyncio.TimeoutError:
+            await msg.edit(components = None)
+            break
+        ...
+```
+'''
+
+from __future__ import annotations
+
+import asyncio
+import collections
+import math
+import typing as t
+
+import hikari
+
+__all__ = (
+    "InteractionRouter",
+    "InteractionSession",
+    "TimerHandle",
+    "TimerWheel",
+)
+
+# Discord invalidates an interaction that isn't responded within 3 seconds.
+# Anything buffered for longer than this is useless to hand out.
+_INTERACTION_RESPONSE_WINDOW = 2.5
+
+class TimerHandle:
+    '''A handle to a callback scheduled on a `TimerWheel`.'''
+
+    __slots__ = ("_callback", "_rounds", "_bucket")
+
+    def __init__(self, callback: t.Callable[[], None], rounds: int, bucket: set[TimerHandle]) -> None:
+        self._callback = callback
+        self._rounds = rounds
+        self._bucket: set[TimerHandle] | None = bucket
+
+    @property
+    def cancelled(self) -> bool:
+        return self._bucket is None
+
+    def cancel(self) -> None:
+        '''Cancel the callback. Does nothing if it is already fired or cancelled.'''
+        if self._bucket is not None:
+            self._bucket.discard(self)
+            self._bucket = None
+
+class TimerWheel:
+    '''A hashed timer wheel.
+
+    Scheduling and cancelling are both O(1). A single background task advances the wheel once every `resolution` seconds
+    and only runs while there's something scheduled, so callbacks fire with up to `resolution` seconds of slack.
+    This is plenty for menu timeouts, which are measured in minutes.
+    '''
+
+    __slots__ = ("__resolution", "__buckets", "__cursor", "__ticker")
+
+    def __init__(self, *, resolution: float = 1.0, slots: int = 128) -> None:
+        '''
+        Parameters
+        ----------
+        resolution : float
+            The length of a tick in seconds.
+        slots : int
+            The number of buckets in the wheel. Delays longer than `resolution * slots` go around the wheel multiple times.
+        '''
+        if resolution <= 0 or slots <= 0:
+            raise ValueError("resolution and slots must be positive.")
+
+        self.__resolution = resolution
+        self.__buckets: list[set[TimerHandle]] = [set() for _ in range(slots)]
+        self.__cursor = 0
+        self.__ticker: asyncio.Task | None = None
+
+    def __len__(self) -> int:
+        return sum(len(bucket) for bucket in self.__buckets)
+
+    def schedule(self, delay: float, callback: t.Callable[[], None]) -> TimerHandle:
+        '''Call `callback` after roughly `delay` seconds.
+
+        This must be called within a running event loop.
+
+        Parameters
+        ----------
+        delay : float
+            The delay in seconds.
+        callback : Callable[[], None]
+            A synchronous callback. Exceptions raised from it are reported to the event loop's exception handler.
+
+        Returns
+        -------
+        TimerHandle
+            The handle to cancel the callback.
+        '''
+        ticks = max(1, math.ceil(delay / self.__resolution))
+        rounds, offset = divmod(ticks - 1, len(self.__buckets))
+        bucket = self.__buckets[(self.__cursor + offset + 1) % len(self.__buckets)]
+        handle = TimerHandle(callback, rounds, bucket)
+        bucket.add(handle)
+
+        if self.__ticker is None or self.__ticker.done():
+            self.__ticker = asyncio.get_running_loop().create_task(self.__run())
+        return handle
+
+    def __advance(self) -> None:
+        self.__cursor = (self.__cursor + 1) % len(self.__buckets)
+        bucket = self.__buckets[self.__cursor]
+
+        expired: list[TimerHandle] = []
+        for handle in bucket:
+            if handle._rounds > 0:
+                handle._rounds -= 1
+            else:
+                expired.append(handle)
+
+        for handle in expired:
+            handle.cancel()
+            try:
+                handle._callback()
+            except Exception as e:
+                asyncio.get_running_loop().call_exception_handler({
+                    "message": "Exception in TimerWheel callback.",
+                    "exception": e,
+                })
+
+    async def __run(self) -> None:
+        loop = asyncio.get_running_loop()
+        next_tick = loop.time() + self.__resolution
+        while any(self.__buckets):
+            await asyncio.sleep(max(0, next_tick - loop.time()))
+            # Catch up if the loop was blocked for more than a tick.
+            while next_tick <= loop.time():
+                self.__advance()
+                next_tick += self.__resolution
+
+class InteractionSession:
+    '''An open menu that receives the component interactions of one message.
+
+    Create this through `InteractionRouter.listen()`. The session is registered until `close()` is called, so prefer
+    using it as a context manager.
+    '''
+
+    __slots__ = ("__router", "__message_id", "__user_id", "__predicate", "__pending", "__waiter", "__closed")
+
+    def __init__(self,
+        router: InteractionRouter,
+        message_id: int,
+        user_id: int | None,
+        predicate: t.Callable[[hikari.ComponentInteraction], bool] | None
+    ) -> None:
+        self.__router = router
+        self.__message_id = message_id
+        self.__user_id = user_id
+        self.__predicate = predicate
+        # Interactions that arrive while nobody is waiting (ie. while the previous one is being processed).
+        self.__pending: collections.deque[tuple[float, hikari.ComponentInteraction]] = collections.deque()
+        self.__waiter: asyncio.Future | None = None
+        self.__closed = False
+
+    def __enter__(self) -> InteractionSession:
+        return self
+    def __exit__(self, *_) -> None:
+        self.close()
+
+    @property
+    def message_id(self) -> int:
+        return self.__message_id
+    @property
+    def user_id(self) -> int | None:
+        return self.__user_id
+    @property
+    def closed(self) -> bool:
+        return self.__closed
+
+    def _feed(self, interaction: hikari.ComponentInteraction) -> None:
+        if self.__user_id is not None and interaction.user.id != self.__user_id:
+            return
+        if self.__predicate is not None and not self.__predicate(interaction):
+            return
+
+        if self.__waiter is not None and not self.__waiter.done():
+            self.__waiter.set_result(interaction)
+        else:
+            self.__pending.append((asyncio.get_running_loop().time(), interaction))
+
+    async def wait(self, timeout: float | None = None) -> hikari.ComponentInteraction:
+        '''Wait for the next interaction on this message.
+
+        Parameters
+        ----------
+        timeout : float | None
+            The maximum amount of seconds to wait. `None` waits forever.
+
+        Returns
+        -------
+        hikari.ComponentInteraction
+            The interaction.
+
+        Raises
+        ------
+        asyncio.TimeoutError
+            Nothing arrived in time, or the session was closed while waiting.
+        RuntimeError
+            The session is already closed.
+        '''
+        if self.__closed:
+            raise RuntimeError("This session is already closed.")
+
+        loop = asyncio.get_running_loop()
+        while self.__pending:
+            received_at, interaction = self.__pending.popleft()
+            if loop.time() - received_at < _INTERACTION_RESPONSE_WINDOW:
+                return interaction
+
+        waiter = loop.create_future()
+        self.__waiter = waiter
+        handle = None
+        if timeout is not None:
+            handle = self.__router.timers.schedule(timeout, lambda: waiter.done() or waiter.set_exception(asyncio.TimeoutError()))
+        try:
+            return await waiter
+        finally:
+            self.__waiter = None
+            if handle is not None:
+                handle.cancel()
+
+    def close(self) -> None:
+        '''Stop receiving interactions. Any pending `wait()` raises `asyncio.TimeoutError`.'''
+        if self.__closed:
+            return
+
+        self.__closed = True
+        self.__pending.clear()
+        self.__router._unregister(self)
+        if self.__waiter is not None and not self.__waiter.done():
+            self.__waiter.set_exception(asyncio.TimeoutError())
+
+class InteractionRouter:
+    '''Dispatch component interactions to the session listening on their message.'''
+
+    __slots__ = ("__sessions", "timers")
+
+    def __init__(self, app: hikari.GatewayBotAware, *, resolution: float = 1.0) -> None:
+        '''
+        Parameters
+        ----------
+        app : hikari.GatewayBotAware
+            The bot to listen to.
+        resolution : float
+            The timeout precision in seconds.
+        '''
+        self.__sessions: dict[int, InteractionSession] = {}
+        self.timers = TimerWheel(resolution = resolution)
+        app.event_manager.subscribe(hikari.InteractionCreateEvent, self.__on_interaction)
+
+    def __len__(self) -> int:
+        return len(self.__sessions)
+
+    def listen(self,
+        message: hikari.SnowflakeishOr[hikari.PartialMessage],
+        *,
+        user_id: hikari.SnowflakeishOr[hikari.PartialUser] | None = None,
+        predicate: t.Callable[[hikari.ComponentInteraction], bool] | None = None
+    ) -> InteractionSession:
+        '''Open a session that receives the component interactions of a message.
+
+        Parameters
+        ----------
+        message : hikari.SnowflakeishOr[hikari.PartialMessage]
+            The message that has the components.
+        user_id : hikari.SnowflakeishOr[hikari.PartialUser] | None
+            Only accept interactions from this user. `None` accepts everyone.
+        predicate : Callable[[hikari.ComponentInteraction], bool] | None
+            An additional filter, only run against this message's interactions.
+
+        Returns
+        -------
+        InteractionSession
+            The session.
+
+        Raises
+        ------
+        RuntimeError
+            Another session is already listening to this message.
+        '''
+        message_id = int(message)
+        if message_id in self.__sessions:
+            raise RuntimeError(f"Message {message_id} already has a session listening to it.")
+
+        session = InteractionSession(self, message_id, int(user_id) if user_id is not None else None, predicate)
+        self.__sessions[message_id] = session
+        return session
+
+    def _unregister(self, session: InteractionSession) -> None:
+        if self.__sessions.get(session.message_id) is session:
+            del self.__sessions[session.message_id]
+
+    async def __on_interaction(self, event: hikari.InteractionCreateEvent) -> None:
+        interaction = event.interaction
+        if not isinstance(interaction, hikari.ComponentInteraction):
+            return
+
+        session = self.__sessions.get(interaction.message.id)
+        if session is not None:
+            session._feed(interaction)
@@ -60,14 +60,15 @@ async with pool.acquire() as conn:
 
 from dataclasses import asdict
 
+from utils.psql._base import HookedConnection, QueryHook, add_query_hook, remove_query_hook
 from utils.psql.active_trade import ActiveTrade
 from utils.psql.badge import Badge
-from utils.psql.equipment import Equipment
+from utils.psql.equipment import Equipment, ItemTraits
 from utils.psql.exception import *
 from utils.psql.extra_inventory import ExtraInventory
 from utils.psql.guild import Guild
 from utils.psql.guildlog import GuildLog
-from utils.psql.inventory import Inventory
+from utils.psql.inventory import Inventory, InventoryHook, add_inventory_hook, remove_inventory_hook
 from utils.psql.item import Item
 from utils.psql.reminder import Reminders
 from utils.psql.user import User
@@ -1,5 +1,6 @@
 import dataclasses
 import logging
+import time
 import typing as t
 
 import asyncpg
@@ -14,18 +15,115 @@ __all__ = (
     #"asyncpg",
 
     "logger",
+    "QueryHook",
+    "add_query_hook",
+    "remove_query_hook",
+    "HookedConnection",
     "record_to_type",
     "insert_into_query",
     "update_query",
+    "update_where_query",
     "_get_all",
     "_get_one",
     "run_and_return_count",
+    "run_many",
     "BaseSQLObject"
 )
 
 logger = logging.getLogger("MichaelBot")
 T = t.TypeVar('T')
 
+# Every generated query shape is built once and stored here.
+# Because the text is then stable, asyncpg's per-connection statement cache can prepare it once and reuse it afterwards.
+_STATEMENT_REGISTRY: dict[tuple, str] = {}
+
+QueryHook = t.Callable[[str, float, int], None]
+'''A callback receiving `(query, elapsed_seconds, row_count)` after every query run through this module.'''
+_QUERY_HOOKS: list[QueryHook] = []
+
+def add_query_hook(hook: QueryHook, /) -> None:
+    '''Register a callback to be called after every query run through the helpers of this module.
+
+    The hook is called synchronously right after the query finishes, so it must be cheap and must not raise.
+
+    Parameters
+    ----------
+    hook : QueryHook
+        A callable accepting the query text, the time it took in seconds, and the number of rows returned or affected.
+    '''
+    if hook not in _QUERY_HOOKS:
+        _QUERY_HOOKS.append(hook)
+
+def remove_query_hook(hook: QueryHook, /) -> None:
+    '''Unregister a callback previously registered via `add_query_hook()`. Does nothing if it's not registered.'''
+    if hook in _QUERY_HOOKS:
+        _QUERY_HOOKS.remove(hook)
+
+def _notify_query(query: str, started: float, row_count: int) -> None:
+    elapsed = time.perf_counter() - started
+    for hook in _QUERY_HOOKS:
+        hook(query, elapsed, row_count)
+
+class _HookedTransaction:
+    '''Wrap an `asyncpg.transaction.Transaction` to run the connection's pending callbacks once it ends.'''
+
+    __slots__ = ("__conn", "__transaction")
+
+    def __init__(self, conn: "HookedConnection", transaction) -> None:
+        self.__conn = conn
+        self.__transaction = transaction
+
+    async def __aenter__(self) -> None:
+        await self.__transaction.__aenter__()
+    async def __aexit__(self, *exc_info) -> None:
+        try:
+            await self.__transaction.__aexit__(*exc_info)
+        finally:
+            self.__conn._run_after_transaction()
+    async def start(self) -> None:
+        await self.__transaction.start()
+    async def commit(self) -> None:
+        try:
+            await self.__transaction.commit()
+        finally:
+            self.__conn._run_after_transaction()
+    async def rollback(self) -> None:
+        try:
+            await self.__transaction.rollback()
+        finally:
+            self.__conn._run_after_transaction()
+
+class HookedConnection(asyncpg.Connection):
+    '''An `asyncpg.Connection` that can run callbacks once its outermost transaction ends.
+
+    Use it as the pool's `connection_class`. Transactions must be opened with `transaction()` for the callbacks to run.
+    '''
+
+    __slots__ = ("__after_transaction",)
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.__after_transaction: dict[tuple[t.Callable, tuple], None] = {}
+
+    def transaction(self, **kwargs):
+        return _HookedTransaction(self, super().transaction(**kwargs))
+    def call_after_transaction(self, callback: t.Callable[..., None], *args) -> None:
+        '''Call `callback(*args)` once the current transaction is committed or rolled back, or right away if there's no transaction.
+
+        The same callback with the same arguments is only called once per transaction. Like hooks, it must be cheap and must not raise.
+        '''
+        if not self.is_in_transaction():
+            callback(*args)
+            return
+        self.__after_transaction[(callback, args)] = None
+    def _run_after_transaction(self) -> None:
+        if self.is_in_transaction():
+            return
+        
+        pending, self.__after_transaction = self.__after_transaction, {}
+        for callback, args in pending:
+            callback(*args)
+
 def record_to_type(record: asyncpg.Record, /, result_type: type[T] = dict) -> T | dict | None:
     '''Convert a `asyncpg.Record` into a `dict` or `None` if the object is already `None`.
 
@@ -76,6 +174,8 @@ async def legacy_insert_into(conn, table_name: str, *args):
 def insert_into_query(table_name: str, len_col: int) -> str:
     '''Return the query to insert into a table that has `len_col` columns.
 
+    The query is built once per `(table_name, len_col)` and reused afterwards.
+
     Parameters
     ----------
     table_name : str
@@ -88,12 +188,14 @@ def insert_into_query(table_name: str, len_col: int) -> str:
     str
         An INSERT SQL statement with query formatter ready to use in `.execute()`
     '''
-    arg_str = "("
-    for index in range(len_col):
-        arg_str += f"${index + 1}, "
-    arg_str = arg_str[:-2] + ')'
+    key = ("INSERT", table_name, len_col)
+    query = _STATEMENT_REGISTRY.get(key)
+    if query is None:
+        arg_str = ", ".join(f"${index + 1}" for index in range(len_col))
+        query = f"INSERT INTO {table_name} VALUES ({arg_str});"
+        _STATEMENT_REGISTRY[key] = query
 
-    return f"INSERT INTO {table_name} VALUES {arg_str};"
+    return query
 
 def update_query(table_name: str, columns: t.Sequence[str]) -> tuple[str, int]:
     '''Return an incomplete SQL statement to update columns in a table.
@@ -114,14 +216,48 @@ def update_query(table_name: str, columns: t.Sequence[str]) -> tuple[str, int]:
         An incomplete UPDATE statement and the number to be used in any next parameters (ie. 6 to be used as `($6)`)
     '''
 
-    params = []
-    last_index = 0
-    for index, column in enumerate(columns):
-        params.append(f"{column} = (${index + 1})")
-        last_index = index + 1
-    arg_str = ', '.join(params)
+    columns = tuple(columns)
+    key = ("UPDATE", table_name, columns)
+    query = _STATEMENT_REGISTRY.get(key)
+    if query is None:
+        arg_str = ', '.join(f"{column} = (${index + 1})" for index, column in enumerate(columns))
+        query = f"UPDATE {table_name} SET {arg_str} "
+        _STATEMENT_REGISTRY[key] = query
+
+    return (query, len(columns) + 1)
+
+def update_where_query(table_name: str, columns: t.Sequence[str], where_columns: t.Sequence[str]) -> str:
+    '''Return a complete SQL statement to update columns in a table, filtered by equality on `where_columns`.
+
+    The returning query will have the format of `UPDATE table SET col1 = ($1), ... WHERE key1 = ($n) AND ...;`.
+    This is the full version of `update_query()` and is what the `update_column()` of each class should use.
+
+    Parameters
+    ----------
+    table_name : str
+        The table to update.
+    columns : t.Sequence[str]
+        The columns to update. Their values come first in the parameter list.
+    where_columns : t.Sequence[str]
+        The columns to match. Their values come after the values of `columns`.
+
+    Returns
+    -------
+    str
+        A complete UPDATE statement with query formatter ready to use in `.execute()`
+    '''
+
+    columns = tuple(columns)
+    where_columns = tuple(where_columns)
+    key = ("UPDATE WHERE", table_name, columns, where_columns)
+    query = _STATEMENT_REGISTRY.get(key)
+    if query is None:
+        query, index = update_query(table_name, columns)
+        where_str = " AND ".join(f"{column} = (${index + offset})" for offset, column in enumerate(where_columns))
+        query += f"WHERE {where_str};"
+        _STATEMENT_REGISTRY[key] = query
 
-    return (f"UPDATE {table_name} SET {arg_str} ", last_index + 1)
+    return query
 
 async def _get_all(conn: asyncpg.Connection, query: str, *args, where: t.Callable[[T], bool] = lambda r: True, result_type: type[T] = dict) -> list[T]:
     '''Run a `SELECT` statement and return a list of objects.
@@ -148,7 +284,10 @@ async def _get_all(conn: asyncpg.Connection, query: str, *args, where: t.Callabl
         A list of `result_type` or empty list.
     '''
 
+    started = time.perf_counter()
     result = await conn.fetch(query, *args)
+    _notify_query(query, started, len(result))
+
     records: list[result_type] = []
     record_obj = None
     for record in result:
@@ -182,7 +321,10 @@ async def _get_one(conn: asyncpg.Connection, query: str, *constraints, result_ty
         A `result_type` or `None` if no object is found.
     '''
     
+    started = time.perf_counter()
     record = await conn.fetchrow(query, *constraints)
+    _notify_query(query, started, 0 if record is None else 1)
+
     return record_to_type(record, result_type)
 
 async def run_and_return_count(conn: asyncpg.Connection, query: str, *args, **kwargs) -> int | None:
@@ -206,17 +348,41 @@ async def run_and_return_count(conn: asyncpg.Connection, query: str, *args, **kw
     t.Optional[int]
         The number of rows affected. If the operation doesn't return the row count, `None` is returned.
     '''
-    logger.debug(query)
-    params = ' '.join([str(p) for p in args])
-    logger.debug(params)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(query)
+        logger.debug(' '.join([str(p) for p in args]))
+    started = time.perf_counter()
     status = await conn.execute(query, *args, **kwargs)
     
     # INSERT returns "INSERT oid count".
     try:
-        count = int(status.split()[-1])
-        return count
+        count = int(status.rpartition(' ')[2])
     except ValueError:
-        return None
+        count = None
+    
+    _notify_query(query, started, count or 0)
+    return count
+
+async def run_many(conn: asyncpg.Connection, query: str, args: t.Iterable[t.Sequence], **kwargs) -> None:
+    '''Execute an SQL operation once for every set of arguments.
+
+    This is a thin wrapper around `conn.executemany()` so bulk operations are also reported to the query hooks.
+
+    Parameters
+    ----------
+    conn : asyncpg.Connection
+        The connection to execute.
+    query : str
+        The statement to run.
+    args : t.Iterable[t.Sequence]
+        The arguments for each execution.
+    **kwargs: dict
+        The arguments to pass into `conn.executemany()`
+    '''
+    args = list(args)
+    started = time.perf_counter()
+    await conn.executemany(query, args, **kwargs)
+    _notify_query(query, started, len(args))
 
 @dataclasses.dataclass(slots = True)
 class BaseSQLObject:
@@ -98,8 +98,7 @@ class Badge(BaseSQLObject):
             return 0
         _id = kwargs["id"]
 
-        query, index = update_query(Badge._tbl_name, column_value_pair.keys())
-        query += f"WHERE id = (${index});"
+        query = update_where_query(Badge._tbl_name, column_value_pair.keys(), ("id",))
         return await run_and_return_count(conn, query, *(column_value_pair.values()), _id)
     @classmethod
     async def update(cls, conn: asyncpg.Connection, badge: t.Self) -> int:
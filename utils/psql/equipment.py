@@ -8,6 +8,22 @@ from utils.psql.inventory import Inventory
 from utils.psql.item import Item
 
 
+@dataclasses.dataclass(slots = True, frozen = True)
+class ItemTraits:
+    '''Represent the precomputed classification of an item. See `Equipment.load_item_traits()`.'''
+
+    eq_type: str | None = None
+    durability: int | None = None
+    craftable: bool = False
+    brewable: bool = False
+
+    @property
+    def is_equipment(self) -> bool:
+        return self.eq_type is not None
+    @property
+    def is_potion(self) -> bool:
+        return self.eq_type == "_potion"
+
 @dataclasses.dataclass(slots = True)
 class Equipment(BaseSQLObject):
     '''Represent an entry in the `UserEquipment` table along with possible operations related to the table.'''
@@ -20,6 +36,7 @@ class Equipment(BaseSQLObject):
     _tbl_name: t.ClassVar[str] = "UserEquipment"
     _PREVENT_UPDATE: t.ClassVar[tuple[str]] = ("user_id", "item_id", "eq_type")
     __EQUIPMENT_TYPE = ("_sword", "_pickaxe", "_axe", "_potion")
+    __item_traits: t.ClassVar[dict[str, ItemTraits]] = {}
 
     @classmethod
     async def fetch_all_where(cls, conn: asyncpg.Connection, *, as_dict: bool = False, where: t.Callable[[t.Self], bool] = lambda r: True) -> list[t.Self] | list[dict] | list[None]:
@@ -91,10 +108,22 @@ class Equipment(BaseSQLObject):
         return await _get_one(conn, query, _user_id, _eq_type, result_type = Equipment if not as_dict else dict)
     @staticmethod
     async def fetch_user_equipments(conn: asyncpg.Connection, user_id: int, *, as_dict: bool = False) -> list[t.Self] | list[dict] | list[None]:
-        return await Equipment.fetch_all_where(conn, where = lambda r: r.user_id == user_id, as_dict = as_dict)
+        '''Fetch all equipments of a user.'''
+
+        query = """
+            SELECT * FROM UserEquipment
+            WHERE user_id = ($1);
+        """
+        return await _get_all(conn, query, user_id, result_type = Equipment if not as_dict else dict)
     @staticmethod
     async def fetch_user_potions(conn: asyncpg.Connection, user_id: int, *, as_dict: bool = False) -> list[t.Self] | list[dict] | list[None]:
-        return await Equipment.fetch_all_where(conn, where = lambda r: Equipment.is_potion(r.item_id) and r.user_id == user_id, as_dict = as_dict)
+        '''Fetch all potions of a user.'''
+
+        query = """
+            SELECT * FROM UserEquipment
+            WHERE user_id = ($1) AND eq_type = '_potion';
+        """
+        return await _get_all(conn, query, user_id, result_type = Equipment if not as_dict else dict)
     @staticmethod
     async def transfer_from_inventory(conn: asyncpg.Connection, inventory: Inventory) -> int:
         '''Transfer an equipment from the inventory.
@@ -121,17 +150,17 @@ class Equipment(BaseSQLObject):
         asyncpg.UniqueViolationError
             The unique constraint on `(user_id, eq_type)` is violated.
         '''
-        is_equipment = False
-        for eq_type in Equipment.__EQUIPMENT_TYPE:
-            if eq_type in inventory.item_id:
-                is_equipment = True
-                item = await Item.fetch_one(conn, id = inventory.item_id)
-                equipment = Equipment(inventory.user_id, inventory.item_id, eq_type, item.durability)
-                break
-        
-        if not is_equipment:
+        traits = Equipment.get_item_traits(inventory.item_id)
+        if not traits.is_equipment:
             return 0
         
+        durability = traits.durability
+        if durability is None:
+            # The item traits are not loaded yet, so fall back to the catalog.
+            item = await Item.fetch_one(conn, id = inventory.item_id)
+            durability = item.durability
+        equipment = Equipment(inventory.user_id, inventory.item_id, traits.eq_type, durability)
+
         async with conn.transaction():
             status = await Inventory.remove(conn, inventory.user_id, inventory.item_id)
             if status == 0:
@@ -169,6 +198,30 @@ class Equipment(BaseSQLObject):
 
         return await run_and_return_count(conn, query, _user_id, _item_id)
     @staticmethod
+    async def delete_user_equipments(conn: asyncpg.Connection, user_id: int, *, exclude: t.Sequence[str] = ()) -> int:
+        '''Delete all equipments of a user in one statement.
+
+        Parameters
+        ----------
+        conn : asyncpg.Connection
+            The connection to use.
+        user_id : int
+            The user's id.
+        exclude : t.Sequence[str], optional
+            The items' id to keep. Default to none.
+
+        Returns
+        -------
+        int
+            The amount of entries deleted.
+        '''
+        query = """
+            DELETE FROM UserEquipment
+            WHERE user_id = ($1) AND NOT (item_id = ANY(($2)::TEXT[]));
+        """
+
+        return await run_and_return_count(conn, query, user_id, list(exclude))
+    @staticmethod
     async def delete_entries(conn: asyncpg.Connection, equipments: list[t.Self]):
         async with conn.transaction():
             for equipment in equipments:
@@ -209,8 +262,7 @@ class Equipment(BaseSQLObject):
         _user_id = kwargs["user_id"]
         _item_id = kwargs["item_id"]
 
-        query, index = update_query(Equipment._tbl_name, column_value_pair.keys())
-        query += f"WHERE user_id = (${index}) AND item_id = (${index + 1});"
+        query = update_where_query(Equipment._tbl_name, column_value_pair.keys(), ("user_id", "item_id"))
         return await run_and_return_count(conn, query, *(column_value_pair.values()), _user_id, _item_id)
     @staticmethod
     async def update_durability(conn: asyncpg.Connection, user_id: int, item_id: str, new_durability: int) -> int:
@@ -220,6 +272,97 @@ class Equipment(BaseSQLObject):
             return await Equipment.delete(conn, user_id = user_id, item_id = item_id)
         return await Equipment.update_column(conn, {"remain_durability": new_durability}, user_id = user_id, item_id = item_id)
     @staticmethod
+    async def consume_durability(conn: asyncpg.Connection, user_id: int, item_ids: t.Sequence[str]) -> dict[str, int]:
+        '''Decrease the durability of multiple equipments by 1 and remove the ones that broke, all in one statement.
+
+        Parameters
+        ----------
+        conn : asyncpg.Connection
+            The connection to use.
+        user_id : int
+            The user's id.
+        item_ids : t.Sequence[str]
+            The equipments' id to use.
+
+        Returns
+        -------
+        dict[str, int]
+            The remaining durability of each equipment found. Equipments with 0 remaining broke and are no longer in the table.
+        '''
+        if not item_ids:
+            return {}
+
+        # Both sub-statements see the same snapshot, so they must target disjoint rows.
+        query = """
+            WITH used AS (
+                SELECT DISTINCT unnest(($2)::TEXT[]) AS item_id
+            ), broken AS (
+                DELETE FROM UserEquipment AS e
+                USING used
+                WHERE e.user_id = ($1) AND e.item_id = used.item_id AND e.remain_durability <= 1
+                RETURNING e.item_id, 0 AS remain_durability
+            ), worn AS (
+                UPDATE UserEquipment AS e
+                SET remain_durability = e.remain_durability - 1
+                FROM used
+                WHERE e.user_id = ($1) AND e.item_id = used.item_id AND e.remain_durability > 1
+                RETURNING e.item_id, e.remain_durability
+            )
+            SELECT * FROM broken
+            UNION ALL
+            SELECT * FROM worn;
+        """
+
+        records = await _get_all(conn, query, user_id, list(item_ids), result_type = dict)
+        return {record["item_id"]: record["remain_durability"] for record in records}
+    @staticmethod
+    def load_item_traits(items: t.Iterable[Item], *, craftable: t.Callable[[str], bool] = lambda _: False, brewable: t.Callable[[str], bool] = lambda _: False) -> None:
+        '''Precompute the classification of every item in the catalog.
+
+        This should be called once the catalog is loaded. Afterwards, all the classification functions of this class are simple lookups,
+        and `transfer_from_inventory()` no longer needs to query the catalog.
+
+        Parameters
+        ----------
+        items : t.Iterable[Item]
+            The whole catalog.
+        craftable : t.Callable[[str], bool], optional
+            A function to check if an item has a crafting recipe. By default, no item is craftable.
+        brewable : t.Callable[[str], bool], optional
+            A function to check if an item has a brewing recipe. By default, no item is brewable.
+        '''
+        item_traits = {}
+        for item in items:
+            eq_type = Equipment.__scan_equipment_type(item.id)
+            item_traits[item.id] = ItemTraits(eq_type, item.durability if eq_type else None, craftable(item.id), brewable(item.id))
+        Equipment.__item_traits = item_traits
+    @staticmethod
+    def get_item_traits(item_id: str) -> ItemTraits:
+        '''Return the precomputed classification of an item.
+
+        If the item is not in the catalog (or the catalog is not loaded yet), only the equipment type is computed.
+
+        Parameters
+        ----------
+        item_id : str
+            The item's id.
+
+        Returns
+        -------
+        ItemTraits
+            The item's classification.
+        '''
+        traits = Equipment.__item_traits.get(item_id)
+        if traits is None:
+            return ItemTraits(Equipment.__scan_equipment_type(item_id))
+        return traits
+    @staticmethod
+    def __scan_equipment_type(item_id: str) -> str | None:
+        for eq_type in Equipment.__EQUIPMENT_TYPE:
+            if eq_type in item_id:
+                return eq_type
+        return None
+    @staticmethod
     def is_equipment(item_id: str) -> bool:
         '''Check if the item is an equipment or not.
 
@@ -233,16 +376,14 @@ class Equipment(BaseSQLObject):
         bool
             Whether the item is an equipment or not.
         '''
-        for eq_type in Equipment.__EQUIPMENT_TYPE:
-            if eq_type in item_id:
-                return True
-        return False
+        return Equipment.get_item_traits(item_id).is_equipment
     @staticmethod
     def is_true_equipment(item_id: str) -> bool:
-        return Equipment.is_equipment(item_id) and not Equipment.is_potion(item_id)
+        traits = Equipment.get_item_traits(item_id)
+        return traits.is_equipment and not traits.is_potion
     @staticmethod
     def is_potion(item_id: str) -> bool:
-        return "_potion" in item_id
+        return Equipment.get_item_traits(item_id).is_potion
     @staticmethod
     def get_equipment_type(item_id: str) -> str | None:
         '''Return the equipment type of the equipment.
@@ -257,7 +398,4 @@ class Equipment(BaseSQLObject):
         str | None
             The equipment type of the equipment, or `None` if it is not an equipment.
         '''
-        if not Equipment.is_equipment(item_id):
-            return None
-        
-        return '_' + item_id.split('_')[-1]
+        return Equipment.get_item_traits(item_id).eq_type
@@ -58,9 +58,14 @@ class ExtraInventory(BaseSQLObject):
         return await _get_one(conn, query, _user_id, _item_id, result_type = ExtraInventory if not as_dict else dict)
     @staticmethod
     async def get_user_inventory(conn, user_id: int, *, as_dict: bool = False) -> list[t.Self] | list[dict] | list[None]:
-        '''Get all entries in the table that belongs to a user.'''
+        '''Get all entries in the table that belongs to a user, sorted by amount in descending order.'''
 
-        return await ExtraInventory.fetch_all_where(conn, where = lambda r: r.user_id == user_id, as_dict = as_dict)
+        query = """
+            SELECT * FROM UserExtraInventory
+            WHERE user_id = ($1)
+            ORDER BY amount DESC;
+        """
+        return await _get_all(conn, query, user_id, result_type = ExtraInventory if not as_dict else dict)
     @classmethod
     async def delete(cls, conn: asyncpg.Connection, **kwargs) -> int:
         '''Delete an entry from the table.
@@ -128,8 +133,7 @@ class ExtraInventory(BaseSQLObject):
         _user_id = kwargs["user_id"]
         _item_id = kwargs["item_id"]
 
-        query, index = update_query(ExtraInventory._tbl_name, column_value_pair.keys())
-        query += f"WHERE user_id = (${index}) AND item_id = (${index + 1});"
+        query = update_where_query(ExtraInventory._tbl_name, column_value_pair.keys(), ("user_id", "item_id"))
         return await run_and_return_count(conn, query, *(column_value_pair.values()), _user_id, _item_id)
     @staticmethod
     async def add(conn: asyncpg.Connection, user_id: int, item_id: str, amount: int = 1) -> int:
@@ -135,7 +135,7 @@ class GuildLogSetting(BaseSQLObject):
         all_settings = await LogSetting.fetch_all_setting_names(conn)
         query = insert_into_query(cls._tbl_name, len(cls.__slots__))
         _entries = [(guild_id, setting, default_value) for setting in all_settings]
-        await conn.executemany(query, _entries)
+        await run_many(conn, query, _entries)
     @classmethod
     async def delete_guild_settings(cls, conn: asyncpg.Connection, guild_id: int) -> int:
         '''Delete all log settings in a guild.
@@ -196,8 +196,7 @@ class GuildLogSetting(BaseSQLObject):
         _guild_id = kwargs["guild_id"]
         _setting_name = kwargs["setting_name"]
 
-        query, index = update_query(GuildLogSetting._tbl_name, column_value_pair.keys())
-        query += f"WHERE guild_id = (${index}) AND setting_name = (${index + 1});"
+        query = update_where_query(GuildLogSetting._tbl_name, column_value_pair.keys(), ("guild_id", "setting_name"))
         return await run_and_return_count(conn, query, *(column_value_pair.values()), _guild_id, _setting_name)
     @classmethod
     async def update(cls, conn: asyncpg.Connection, glog_setting: t.Self) -> int:
@@ -243,11 +242,10 @@ class GuildLogSetting(BaseSQLObject):
         if not glog_settings:
             return
         
-        prepare_query, index = update_query(cls._tbl_name, ["is_enabled"])
-        prepare_query += f"WHERE guild_id = (${index}) AND setting_name = (${index + 1});"
+        prepare_query = update_where_query(cls._tbl_name, ["is_enabled"], ("guild_id", "setting_name"))
 
         _args = [(setting.is_enabled, setting.guild_id, setting.setting_name) for setting in glog_settings]
-        await conn.executemany(prepare_query, _args)
+        await run_many(conn, prepare_query, _args)
 
 @dataclasses.dataclass(slots = True)
 class GuildLog(BaseSQLObject):
@@ -409,8 +407,7 @@ class GuildLog(BaseSQLObject):
             return 0
         _guild_id = kwargs["guild_id"]
 
-        query, index = update_query(GuildLog._tbl_name, column_value_pair.keys())
-        query += f"WHERE guild_id = (${index});"
+        query = update_where_query(GuildLog._tbl_name, column_value_pair.keys(), ("guild_id",))
         return await run_and_return_count(conn, query, *(column_value_pair.values()), _guild_id)
     @classmethod
     async def update(cls, conn: asyncpg.Connection, obj: t.Self) -> int:
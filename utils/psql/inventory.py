@@ -5,6 +5,38 @@ import asyncpg
 
 from utils.psql._base import *
 
+InventoryHook = t.Callable[[int], None]
+'''A callback receiving the id of the user whose inventory was just modified through `Inventory`.'''
+_INVENTORY_HOOKS: list[InventoryHook] = []
+
+def add_inventory_hook(hook: InventoryHook, /) -> None:
+    '''Register a callback to be called whenever a user's inventory is modified via `Inventory`.
+
+    The hook is called synchronously right after the statement runs, so it must be cheap and must not raise. If the statement runs within
+    a transaction on a `HookedConnection`, the hook is called again once the transaction ends, since a concurrent read might have seen
+    the rows from before the commit in between.
+
+    Parameters
+    ----------
+    hook : InventoryHook
+        A callable accepting the user's id.
+    '''
+    if hook not in _INVENTORY_HOOKS:
+        _INVENTORY_HOOKS.append(hook)
+
+def remove_inventory_hook(hook: InventoryHook, /) -> None:
+    '''Unregister a callback previously registered via `add_inventory_hook()`. Does nothing if it's not registered.'''
+    if hook in _INVENTORY_HOOKS:
+        _INVENTORY_HOOKS.remove(hook)
+
+def _run_inventory_hooks(user_id: int) -> None:
+    for hook in _INVENTORY_HOOKS:
+        hook(user_id)
+def _notify_inventory(conn: asyncpg.Connection, user_id: int) -> None:
+    _run_inventory_hooks(user_id)
+    # Pool connections are proxies, so check for the method instead of the class.
+    if hasattr(conn, "call_after_transaction") and conn.is_in_transaction():
+        conn.call_after_transaction(_run_inventory_hooks, user_id)
 
 @dataclasses.dataclass(slots = True)
 class Inventory(BaseSQLObject):
@@ -57,9 +89,14 @@ class Inventory(BaseSQLObject):
         return await _get_one(conn, query, _user_id, _item_id, result_type = Inventory if not as_dict else dict)
     @staticmethod
     async def get_user_inventory(conn, user_id: int, *, as_dict: bool = False) -> list[t.Self] | list[dict] | list[None]:
-        '''Get all entries in the table that belongs to a user.'''
+        '''Get all entries in the table that belongs to a user, sorted by amount in descending order.'''
 
-        return await Inventory.fetch_all_where(conn, where = lambda r: r.user_id == user_id, as_dict = as_dict)
+        query = """
+            SELECT * FROM UserInventory
+            WHERE user_id = ($1)
+            ORDER BY amount DESC;
+        """
+        return await _get_all(conn, query, user_id, result_type = Inventory if not as_dict else dict)
     @classmethod
     async def delete(cls, conn: asyncpg.Connection, **kwargs) -> int:
         '''Delete an entry from the table.
@@ -88,7 +125,9 @@ class Inventory(BaseSQLObject):
             WHERE user_id = ($1) AND item_id = ($2);
         """
 
-        return await run_and_return_count(conn, query, _user_id, _item_id)
+        status = await run_and_return_count(conn, query, _user_id, _item_id)
+        _notify_inventory(conn, _user_id)
+        return status
     @classmethod
     async def update_column(cls, conn: asyncpg.Connection, column_value_pair: dict[str, t.Any], **kwargs) -> int:
         '''Update specified columns with new value.
@@ -126,9 +165,15 @@ class Inventory(BaseSQLObject):
         _user_id = kwargs["user_id"]
         _item_id = kwargs["item_id"]
 
-        query, index = update_query(Inventory._tbl_name, column_value_pair.keys())
-        query += f"WHERE user_id = (${index}) AND item_id = (${index + 1});"
-        return await run_and_return_count(conn, query, *(column_value_pair.values()), _user_id, _item_id)
+        query = update_where_query(Inventory._tbl_name, column_value_pair.keys(), ("user_id", "item_id"))
+        status = await run_and_return_count(conn, query, *(column_value_pair.values()), _user_id, _item_id)
+        _notify_inventory(conn, _user_id)
+        return status
+    @classmethod
+    async def insert_one(cls, conn: asyncpg.Connection, obj: t.Self) -> int:
+        status = await super(Inventory, cls).insert_one(conn, obj)
+        _notify_inventory(conn, obj.user_id)
+        return status
     @staticmethod
     async def add(conn: asyncpg.Connection, user_id: int, item_id: str, amount: int = 1) -> int:
         '''Add item into the user's inventory.
@@ -190,6 +235,63 @@ class Inventory(BaseSQLObject):
             return await Inventory.delete(conn, user_id = user_id, item_id = item_id)
         else:
             return await Inventory.update_column(conn, {"amount": existed.amount - amount}, user_id = user_id, item_id = item_id)
+    @staticmethod
+    async def remove_portion(conn: asyncpg.Connection, user_id: int, portion: float, *, extra: int = 0, exclude: t.Sequence[str] = ()) -> int:
+        '''Remove a portion of every item in the user's inventory, then remove the entries that are left empty.
+
+        Each entry loses `floor(amount * portion) + extra` items (capped at its amount). This is done in a constant amount of statements
+        no matter how many items the user has.
+
+        Parameters
+        ----------
+        conn : asyncpg.Connection
+            The connection to use.
+        user_id : int
+            The user's id.
+        portion : float
+            The portion of each entry to remove, between 0 and 1.
+        extra : int, optional
+            The amount of items to remove from each entry on top of the portion. Default to 0.
+        exclude : t.Sequence[str], optional
+            The items' id to leave untouched. Default to none.
+
+        Returns
+        -------
+        int
+            The number of entries affected.
+        '''
+        query = """
+            UPDATE UserInventory
+            SET amount = GREATEST(amount - (FLOOR(amount * ($2::FLOAT8))::INT + ($3)), 0)
+            WHERE user_id = ($1) AND NOT (item_id = ANY(($4)::TEXT[]));
+        """
+        async with conn.transaction():
+            count = await run_and_return_count(conn, query, user_id, portion, extra, list(exclude))
+            await Inventory.remove_empty(conn, user_id)
+        return count
+    @staticmethod
+    async def remove_empty(conn: asyncpg.Connection, user_id: int) -> int:
+        '''Remove all entries with no item left in the user's inventory.
+
+        Parameters
+        ----------
+        conn : asyncpg.Connection
+            The connection to use.
+        user_id : int
+            The user's id.
+
+        Returns
+        -------
+        int
+            The number of entries deleted.
+        '''
+        query = """
+            DELETE FROM UserInventory
+            WHERE user_id = ($1) AND amount = 0;
+        """
+        status = await run_and_return_count(conn, query, user_id)
+        _notify_inventory(conn, user_id)
+        return status
     @classmethod
     async def update(cls, conn: asyncpg.Connection, inventory: t.Self) -> int:
         '''Update an entry based on the provided object, or insert if it's not found.
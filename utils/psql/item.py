@@ -112,8 +112,7 @@ class Item(BaseSQLObject):
             return 0
         _id = kwargs["id"]
 
-        query, index = update_query(Item._tbl_name, column_value_pair.keys())
-        query += f"WHERE id = (${index});"
+        query = update_where_query(Item._tbl_name, column_value_pair.keys(), ("id",))
         return await run_and_return_count(conn, query, *(column_value_pair.values()), _id)
     @classmethod
     async def update(cls, conn: asyncpg.Connection, item: t.Self) -> int:
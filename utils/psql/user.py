@@ -130,8 +130,7 @@ class User(BaseSQLObject):
             return 0
         _id = kwargs["id"]
 
-        query, index = update_query(User._tbl_name, column_value_pair.keys())
-        query += f"WHERE id = (${index});"
+        query = update_where_query(User._tbl_name, column_value_pair.keys(), ("id",))
         return await run_and_return_count(conn, query, *(column_value_pair.values()), _id)
     @staticmethod
     async def update_balance(conn: asyncpg.Connection, id: int, new_balance: int) -> int:
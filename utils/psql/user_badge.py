@@ -121,8 +121,7 @@ class UserBadge(BaseSQLObject):
         _user_id = kwargs["user_id"]
         _badge_id = kwargs["badge_id"]
         
-        query, index = update_query(UserBadge._tbl_name, column_value_pair.keys())
-        query += f"WHERE user_id = (${index}) AND badge_id = (${index + 1});"
+        query = update_where_query(UserBadge._tbl_name, column_value_pair.keys(), ("user_id", "badge_id"))
         return await run_and_return_count(conn, query, *(column_value_pair.values()), _user_id, _badge_id)
     @classmethod
     async def update(conn: asyncpg.Connection, ubadge: t.Self) -> int:
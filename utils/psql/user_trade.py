@@ -93,8 +93,7 @@ class UserTrade(BaseSQLObject):
         _trade_id = kwargs["trade_id"]
         _trade_type = kwargs["trade_type"]
 
-        query, index = update_query(UserTrade._tbl_name, column_value_pair.keys())
-        query += f"WHERE user_id = (${index}) AND trade_id = (${index + 1}) AND trade_type = (${index + 2});"
+        query = update_where_query(UserTrade._tbl_name, column_value_pair.keys(), ("user_id", "trade_id", "trade_type"))
         return await run_and_return_count(conn, query, *(column_value_pair.values()), _user_id, _trade_id, _trade_type)
     @classmethod
     async def update(cls, conn: asyncpg.Connection, user_trade: t.Self):